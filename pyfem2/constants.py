@@ -37,7 +37,10 @@ TENSOR = 'Tensor'
 
 # SOLVERS
 NEWTON = 'Newton'
+MODIFIED_NEWTON = 'Modified Newton'
+BFGS = 'BFGS'
 RIKS = 'Riks'
+AUTO = 'auto'
 
 # FIELD POSITIONS
 NODE = 'Node'
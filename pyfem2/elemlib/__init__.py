@@ -9,25 +9,30 @@ from .beam import *
 from .element import Element as _Element
 from numpy import array as _array
 class LinknD2(_Element):
+    __slots__ = ()
     nodes = 2
     edges = _array([])
 
 class Tria3(_Element):
+    __slots__ = ()
     nodes = 3
     dimensions = 2
     edges = _array([[0,1], [1,2], [2,0]])
 
 class Tria6(_Element):
+    __slots__ = ()
     nodes = 6
     dimensions = 2
     edges = _array([[0,1,3], [1,2,4], [2,0,5]])
 
 class Quad4(_Element):
+    __slots__ = ()
     nodes = 4
     dimensions = 2
     edges = _array([[0,1], [1,2], [2,3], [3,0]])
 
 class Quad8(_Element):
+    __slots__ = ()
     nodes = 8
     dimensions = 2
     edges = _array([[0, 1, 4], [1, 2, 5], [2, 3, 6], [3, 0, 7]])
@@ -23,6 +23,7 @@ class PlaneBeamColumn(Element):
         Requires area 'A' and 'Izz'
 
     """
+    __slots__ = ()
     nodes = 2
     dimensions = 2
     signature = [(1,1,0,0,0,1,0),
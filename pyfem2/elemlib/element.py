@@ -5,6 +5,15 @@ from ..utilities import *
 # ------------------------- BASE ELEMENT CLASS ------------------------------ #
 # --------------------------------------------------------------------------- #
 class Element(object):
+    """Base element class.
+
+    Element data are not stored on the element.  An element is a view of
+    the ``index``th element of an ``ElementBlockData``, from which its label,
+    nodes, nodal coordinates, material and fabrication properties are read.
+
+    """
+    __slots__ = ('block', 'index')
+
     ndir = None
     nshr = None
     nodes = None
@@ -14,28 +23,48 @@ class Element(object):
     integration = None
     edges = []
 
+    # THE ELEMENT KINEMATICS ARE LINEAR: THE ELEMENT STIFFNESS DEPENDS ON THE
+    # DOFS ONLY THROUGH THE MATERIAL
+    linear = True
+
     def __init__(self, label, elenod, elecoord, elemat, **elefab):
+        # A BLOCK OF ONE ELEMENT
+        self.block = ElementBlockData(type(self), [label], [elenod],
+                                      [elecoord], elemat, **elefab)
+        self.index = 0
 
-        self.label = label
-        self.inodes = asarray(elenod)
-        self.xc = asarray(elecoord)
-        self.material = elemat
+    @classmethod
+    def view(cls, block, index):
+        """The ``index``th element of element block data ``block``"""
+        el = cls.__new__(cls)
+        el.block, el.index = block, index
+        return el
 
-        if self.elefab is None:
-            if elefab:
-                raise UserInputError('Element takes no element '
-                                     'fabrication properties')
-        else:
-            unknown = [key for key in elefab if key not in self.elefab]
-            if unknown:
-                raise UserInputError('Unrecognized element fabrication '
-                                     'properties: {0}'.format(','.join(unknown)))
-            for (name, default) in self.elefab.items():
-                p = elefab.get(name, default)
-                if p is None:
-                    raise UserInputError('Missing required fabrication '
-                                         'property {0}'.format(name))
-                setattr(self, name, p)
+    @property
+    def label(self):
+        return self.block.labels[self.index]
+
+    @property
+    def inodes(self):
+        return self.block.elecon[self.index]
+
+    @property
+    def xc(self):
+        return self.block.coord[self.index]
+
+    @property
+    def material(self):
+        return self.block.material
+
+    def __getattr__(self, name):
+        # ELEMENT FABRICATION PROPERTIES
+        if name in Element.__slots__ or name.startswith('__'):
+            raise AttributeError(name)
+        try:
+            return self.block.elefab[name][self.index]
+        except KeyError:
+            raise AttributeError('{0!r} object has no attribute '
+                                 '{1!r}'.format(type(self).__name__, name))
 
     def response(self, *args):
         raise NotImplementedError
@@ -47,3 +76,130 @@ class Element(object):
     @classmethod
     def variables(cls):
         return None
+
+# --------------------------------------------------------------------------- #
+# ------------------------- ELEMENT BLOCK STORAGE --------------------------- #
+# --------------------------------------------------------------------------- #
+class ElementBlockData(object):
+    """Struct of arrays storage of the elements of an element block, all of
+    one type and material
+
+    Parameters
+    ----------
+    eletyp : object
+        The element type (uninstantiated class)
+    labels : ndarray of int
+        labels[e] is the label of the eth element
+    elecon : ndarray of int
+        elecon[e] are the internal node IDs of the eth element
+    coord : ndarray of float
+        coord[e] are the (nodes, dimensions) nodal coordinates of the eth
+        element
+    material : Material
+        The material of the elements
+    elefab : dict
+        Element fabrication properties, each a scalar shared by all elements
+        or an array of one value per element
+
+    Notes
+    -----
+    ``self[e]`` is an element view of the eth element, an instance of
+    ``eletyp`` through which its response is computed.
+
+    Fabrication properties are stored as arrays of length ``numele``,
+    ``self.elefab[name][e]`` being the value for the eth element.  Scalar
+    properties are broadcast without being copied.
+
+    """
+    def __init__(self, eletyp, labels, elecon, coord, material, **elefab):
+        self.eletyp = eletyp
+        self.labels = asarray(labels)
+        self.elecon = asarray(elecon, dtype=int)
+        self.coord = asarray(coord, dtype=float)
+        self.material = material
+        self.numele = len(self.labels)
+
+        self.elefab = {}
+        if eletyp.elefab is None:
+            if elefab:
+                raise UserInputError('Element takes no element '
+                                     'fabrication properties')
+            return
+        unknown = [key for key in elefab if key not in eletyp.elefab]
+        if unknown:
+            raise UserInputError('Unrecognized element fabrication '
+                                 'properties: {0}'.format(','.join(unknown)))
+        for (name, default) in eletyp.elefab.items():
+            p = elefab.get(name, default)
+            if p is None:
+                raise UserInputError('Missing required fabrication '
+                                     'property {0}'.format(name))
+            p = asarray(p)
+            if p.ndim == 0:
+                p = broadcast_to(p, (self.numele,))
+            elif p.shape[0] != self.numele:
+                raise UserInputError('Fabrication property {0} must be a '
+                                     'scalar or have one value per '
+                                     'element'.format(name))
+            self.elefab[name] = p
+
+    def __len__(self):
+        return self.numele
+
+    def __getitem__(self, e):
+        return self.eletyp.view(self, e)
+
+    def __iter__(self):
+        for e in range(self.numele):
+            yield self[e]
+
+class ElementArray(object):
+    """The elements of a finite element model, stored element block by
+    element block.
+
+    ``self[iel]`` is a view of the element with internal ID ``iel``, or None
+    if no element block data has been assigned to it.  Indexing with an
+    array of IDs returns an object array of views.
+
+    """
+    def __init__(self, numele):
+        self.numele = numele
+        self.blocks = []
+        self.blkid = -ones(numele, dtype=int)
+        self.blkidx = zeros(numele, dtype=int)
+
+    def assign(self, ielems, data):
+        """Assign element block data ``data`` to the elements ``ielems``,
+        ielems[e] being the internal ID of data[e]"""
+        ielems = asarray(ielems, dtype=int)
+        # REASSIGNING THE SAME ELEMENTS REPLACES THEIR DATA
+        b = self.blkid[ielems[0]] if len(ielems) else -1
+        if (b >= 0 and all(self.blkid[ielems] == b) and
+            count_nonzero(self.blkid == b) == len(ielems)):
+            self.blocks[b] = data
+        else:
+            self.blocks.append(data)
+            b = len(self.blocks) - 1
+        self.blkid[ielems] = b
+        self.blkidx[ielems] = arange(len(ielems))
+
+    @property
+    def unassigned(self):
+        """Internal IDs of elements without element block data"""
+        return where(self.blkid < 0)[0]
+
+    def __len__(self):
+        return self.numele
+
+    def __getitem__(self, iel):
+        if isinstance(iel, (int, integer)):
+            b = self.blkid[iel]
+            return None if b < 0 else self.blocks[b][self.blkidx[iel]]
+        ielems = arange(self.numele)[iel]
+        elements = empty(len(ielems), dtype=object)
+        elements[:] = [self[i] for i in ielems]
+        return elements
+
+    def __iter__(self):
+        for iel in range(self.numele):
+            yield self[iel]
@@ -7,6 +7,7 @@ from .isoplib import CHTIsoParametricElement as BaseElement
 # ------------------------ HEAT TRANSFER ELEMENT ---------------------------- #
 # --------------------------------------------------------------------------- #
 class PlaneDiffussiveHeatTransferTria3(BaseElement):
+    __slots__ = ()
     nodes = 3
     signature = [(0,0,0,0,0,0,1),  # 3 NODE 2D HEAT TRANSFER
                  (0,0,0,0,0,0,1),
@@ -7,6 +7,7 @@ from ..element import Element
 # ------------------------ HEAT TRANSFER ELEMENT ---------------------------- #
 # --------------------------------------------------------------------------- #
 class CHTIsoParametricElement(Element):
+    __slots__ = ()
     edges = []
     nodes = None
     gaussp = None
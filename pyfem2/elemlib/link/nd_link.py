@@ -22,6 +22,7 @@ class ND2NodeLinkElement(Element):
         Requires area 'A'
 
     """
+    __slots__ = ()
     nodes = 2
     elefab = {'A': 1.}
 
@@ -4,6 +4,7 @@ from .isop2_4 import CSDIsoParametricQuad4 as BaseElement
 # --------------------- BILINEAR PLANE STRAIN ELEMENT ----------------------- #
 # --------------------------------------------------------------------------- #
 class AxiSymmetricQuad4(BaseElement):
+    __slots__ = ()
     ndir = 3
     nshr = 1
     integration = 4
@@ -11,12 +12,10 @@ class AxiSymmetricQuad4(BaseElement):
     gaussw = ones(4)
     gaussp = array([[-1., -1.], [ 1., -1.], [-1.,  1.], [ 1.,  1.]]) / sqrt(3.)
     @property
-    def formulation(self):
-        return self.axisymmetric
-    @formulation.setter
-    def formulation(self, arg):
-        assert arg in (0, 1, 2)
-        self.axisymmetric = arg
+    def axisymmetric(self):
+        # THE FORMULATION FABRICATION PROPERTY
+        assert self.formulation in (0, 1, 2)
+        return self.formulation
     def bmatrix(self, dN, N, xi, *args):
         rp = dot(N, self.xc[:,0])
         B = zeros((4, 8))
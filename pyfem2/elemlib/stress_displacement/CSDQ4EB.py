@@ -6,9 +6,11 @@ from .isop2_4 import CSDIsoParametricQuad4 as BaseElement
 # ---------------------- MEAN DILATATIONAL FORUMULA ------------------------- #
 # --------------------------------------------------------------------------- #
 class PlaneStrainQuad4BBar(BaseElement):
+    __slots__ = ()
     ndir = 3
     nshr = 1
     integration = 4
+    mean_dilatation = True
     gaussw = ones(4)
     gaussp = array([[-1., -1.], [ 1., -1.], [-1.,  1.], [ 1.,  1.]]) / sqrt(3.)
     def bmatrix(self, dN, *args):
@@ -21,10 +23,10 @@ class PlaneStrainQuad4BBar(BaseElement):
 
         dNb = zeros((2,4))
         jac = zeros(self.integration)
+        dNg = self.shape_tables()['gauss'][1]
         for p in range(self.integration):
             # COMPUTE THE INTEGRALS OVER THE VOLUME
-            xi = self.gaussp[p]
-            dNdxi = self.shapegrad(xi)
+            dNdxi = dNg[p]
             dxdxi = dot(dNdxi, xc)
             jac[p] = det(dxdxi)
             dxidx = inv(dxdxi)
@@ -4,6 +4,7 @@ from .isop2_4 import CSDIsoParametricQuad4 as BaseElement
 # --------------------- BILINEAR PLANE STRAIN ELEMENT ----------------------- #
 # --------------------------------------------------------------------------- #
 class PlaneStrainQuad4(BaseElement):
+    __slots__ = ()
     ndir = 3
     nshr = 1
     integration = 4
@@ -5,6 +5,7 @@ from .isop2_4 import CSDIsoParametricQuad4 as BaseElement
 # -------------------------- REDUCED INTEGRATION ---------------------------- #
 # --------------------------------------------------------------------------- #
 class PlaneStrainQuad4Reduced(BaseElement):
+    __slots__ = ()
     ndir = 3
     nshr = 1
     integration = 1
@@ -5,6 +5,7 @@ from .isop2_4 import CSDIsoParametricQuad4 as BaseElement
 # --------------------- SELECTIVE REDUCED INTEGRATION ----------------------- #
 # --------------------------------------------------------------------------- #
 class PlaneStrainQuad4SelectiveReduced(BaseElement):
+    __slots__ = ()
     ndir = 3
     nshr = 1
     integration = 4
@@ -4,6 +4,7 @@ from .isop2_4 import CSDIsoParametricQuad4 as BaseElement
 # --------------------- BILINEAR PLANE STRESS ELEMENT ----------------------- #
 # --------------------------------------------------------------------------- #
 class PlaneStressQuad4(BaseElement):
+    __slots__ = ()
     ndir = 2
     nshr = 1
     integration = 4
@@ -6,6 +6,7 @@ from .isop2_4 import CSDIsoParametricQuad4 as BaseElement
 # -------------------------- INCOMPATIBLE MODES ----------------------------- #
 # --------------------------------------------------------------------------- #
 class PlaneStressQuad4Incompat(BaseElement):
+    __slots__ = ()
     ndir = 2
     nshr = 1
     incompatible_modes = True
@@ -19,8 +20,9 @@ class PlaneStressQuad4Incompat(BaseElement):
         B[1, 1::2] = B[2, 0::2] = dN[1, :]
         return B
 
-    def gmatrix(self, xi):
-        """Assemble and return the G matrix"""
+    def gmatrix(self, xi, J):
+        """Assemble and return the G matrix at the gauss point ``xi`` where
+        the Jacobian determinant is ``J``"""
         # ALGORITHM IN
         # THE FINITE ELEMENT METHOD: ITS BASIS AND FUNDAMENTALS
         # BY OLEK C ZIENKIEWICZ, ROBERT L TAYLOR, J.Z. ZHU
@@ -29,7 +31,7 @@ class PlaneStressQuad4Incompat(BaseElement):
 
         # JACOBIAN AT ELEMENT CENTROID
         # COMPUTE THE SHAPE FUNCTION AT THE CENTROID
-        dN0dxi = self.shapegrad(self.cp)
+        dN0dxi = self.shape_tables()['centroid'][1][0]
 
         # COMPUTE THE DEFORMATION GRADIENT AT CENTROID
         # AND THE JACOBIAN
@@ -37,11 +39,6 @@ class PlaneStressQuad4Incompat(BaseElement):
         dxidx0 = inv(dx0dxi)
         J0 = det(dx0dxi)
 
-        # COMPUTE THE JACOBIAN OF THE ELEMENT
-        dNdxi = self.shapegrad(xi)
-        dxdxi = dot(dNdxi, xc)
-        J = det(dxdxi)
-
         # COMPUTE DNDXI ASSOCIATED WITH THE INCOMPATIBLE MODES AND THEN FROM IT
         # AND THE JACOBIANS COMPUTED ABOVE COMPUTE DNDX
         # N = [1 - xi**2, 1 - eta**2]
@@ -7,9 +7,11 @@ from .isop2_8 import CSDIsoParametricQuad8 as BaseElement
 # --------------------------------------------------------------------------- #
 c = -sqrt(3./5.)
 class PlaneStrainQuad8BBar(BaseElement):
+    __slots__ = ()
     ndir = 3
     nshr = 1
     integration = 9
+    mean_dilatation = True
     gaussp = array([[c,  c], [0,  c], [-c,  c],
                     [c,  0], [0,  0], [-c,  0],
                     [c, -c], [0, -c], [-c, -c]])
@@ -27,10 +29,10 @@ class PlaneStrainQuad8BBar(BaseElement):
 
         dNb = zeros((2,8))
         jac = zeros(self.integration)
+        dNg = self.shape_tables()['gauss'][1]
         for p in range(self.integration):
             # COMPUTE THE INTEGRALS OVER THE VOLUME
-            xi = self.gaussp[p]
-            dNdxi = self.shapegrad(xi)
+            dNdxi = dNg[p]
             dxdxi = dot(dNdxi, xc)
             jac[p] = det(dxdxi)
             dxidx = inv(dxdxi)
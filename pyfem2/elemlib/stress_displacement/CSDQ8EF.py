@@ -5,6 +5,7 @@ from .isop2_8 import CSDIsoParametricQuad8 as BaseElement
 # --------------------------------------------------------------------------- #
 c = -sqrt(3./5.)
 class PlaneStrainQuad8(BaseElement):
+    __slots__ = ()
     ndir = 3
     nshr = 1
     integration = 9
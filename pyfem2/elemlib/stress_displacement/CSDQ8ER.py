@@ -5,6 +5,7 @@ from .isop2_8 import CSDIsoParametricQuad8 as BaseElement
 # -------------------------- REDUCED INTEGRATION ---------------------------- #
 # --------------------------------------------------------------------------- #
 class PlaneStrainQuad8Reduced(BaseElement):
+    __slots__ = ()
     ndir = 3
     nshr = 1
     integration = 4
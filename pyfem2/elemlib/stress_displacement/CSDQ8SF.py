@@ -5,6 +5,7 @@ from .isop2_8 import CSDIsoParametricQuad8 as BaseElement
 # --------------------------------------------------------------------------- #
 c = -sqrt(3./5.)
 class PlaneStressQuad8(BaseElement):
+    __slots__ = ()
     ndir = 2
     nshr = 1
     integration = 9
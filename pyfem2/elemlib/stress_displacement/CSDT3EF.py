@@ -4,6 +4,7 @@ from .isop2_3 import CSDIsoParametricTria3 as BaseElement
 # --------------------- TRIANGLE ISOPARAMETRIC ELEMENTS --------------------- #
 # --------------------------------------------------------------------------- #
 class PlaneStrainTria3(BaseElement):
+    __slots__ = ()
     ndir = 3
     nshr = 1
     integration = 3
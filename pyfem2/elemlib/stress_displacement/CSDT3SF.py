@@ -1,6 +1,7 @@
 from numpy import *
 from .isop2_3 import CSDIsoParametricTria3 as BaseElement
 class PlaneStressTria3(BaseElement):
+    __slots__ = ()
     ndir = 2
     nshr = 1
     integration = 3
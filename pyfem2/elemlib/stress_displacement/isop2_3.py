@@ -20,6 +20,7 @@ class CSDIsoParametricTria3(BaseElement):
               [2]
 
     """
+    __slots__ = ()
     nodes = 3
     dimensions = 2
     elefab = {'t':1.}
@@ -40,7 +41,8 @@ class CSDIsoParametricTria3(BaseElement):
     def volume(self):
         return self.t * self.area
 
-    def shape(self, xi, edge=None):
+    @classmethod
+    def shape(cls, xi, edge=None):
         if edge is not None:
             # EVALUATE SHAPE FUNCTION ON EDGE
             if   edge == 0: xi = [1.-xi/sqrt(2.), xi/sqrt(2.)]
@@ -49,5 +51,6 @@ class CSDIsoParametricTria3(BaseElement):
         Ne = array([xi[0], xi[1], 1. - xi[0] - xi[1]])
         return Ne
 
-    def shapegrad(self, xi):
+    @classmethod
+    def shapegrad(cls, xi):
         return array([[1., 0., -1.], [0., 1., -1.]])
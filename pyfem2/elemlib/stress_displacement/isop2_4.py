@@ -20,6 +20,7 @@ class CSDIsoParametricQuad4(BaseElement):
               [0]
 
     """
+    __slots__ = ()
     nodes = 4
     dimensions = 2
     elefab = {'t':1.}
@@ -41,7 +42,8 @@ class CSDIsoParametricQuad4(BaseElement):
     def volume(self):
         return self.t * self.area
 
-    def shape(self, xi, edge=None):
+    @classmethod
+    def shape(cls, xi, edge=None):
         if edge is not None:
             # EVALUATE SHAPE FUNCTION ON SPECIFIC EDGE
             xi = array([[xi,-1.],[1.,xi],[xi,1.],[-1.,xi]][edge])
@@ -51,7 +53,8 @@ class CSDIsoParametricQuad4(BaseElement):
                    (1. - xi[0]) * (1. + xi[1])]) / 4.
         return N
 
-    def shapegrad(self, xi):
+    @classmethod
+    def shapegrad(cls, xi):
         dN = array([[-1. + xi[1],  1. - xi[1], 1. + xi[1], -1. - xi[1]],
                     [-1. + xi[0], -1. - xi[0], 1. + xi[0],  1. - xi[0]]]) / 4.
         return dN
@@ -20,6 +20,7 @@ class CSDIsoParametricQuad8(CSDIsoParametricElement):
                [0]
 
     """
+    __slots__ = ()
     nodes = 8
     dimensions = 2
     elefab = {'t':1.}
@@ -43,7 +44,8 @@ class CSDIsoParametricQuad8(CSDIsoParametricElement):
     def volume(self):
         return self.t * self.area
 
-    def shape(self, xi, edge=None):
+    @classmethod
+    def shape(cls, xi, edge=None):
         if edge is not None:
             # EVALUATE SHAPE FUNCTION ON SPECIFIC EDGE
             xi = array([[xi,-1.],[1.,xi],[xi,1.],[-1.,xi]][edge])
@@ -61,7 +63,8 @@ class CSDIsoParametricQuad8(CSDIsoParametricElement):
         N[7] =  0.5 * (1. - x) * (1. - y * y)
         return N
 
-    def shapegrad(self, xi):
+    @classmethod
+    def shapegrad(cls, xi):
         x, y = xi[:2]
         dN = zeros((2, 8))
         dN[0,0] =  0.25 * (1. - y) * (2. * x + y)
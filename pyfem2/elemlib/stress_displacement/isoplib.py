@@ -1,6 +1,7 @@
 import logging
 from numpy import *
 from numpy.linalg import det, inv
+import numpy.linalg as la
 
 from ...constants import *
 from ...utilities import *
@@ -8,6 +9,7 @@ from ..element import Element
 
 class CSDIsoParametricElement(Element):
     """Base class for isoparametric stress-displacement elements"""
+    __slots__ = ()
     gaussp = None
     gaussw = None
     integration = None
@@ -15,6 +17,7 @@ class CSDIsoParametricElement(Element):
     incompatible_modes = None
     hourglass_control = None
     selective_reduced = None
+    mean_dilatation = None
 
     @classmethod
     def variables(self):
@@ -24,12 +27,74 @@ class CSDIsoParametricElement(Element):
                      ('V', SYMTENSOR, 1))
         return variables
 
-    def shape(self, *args):
+    @classmethod
+    def shape(cls, *args):
         raise NotImplementedError
 
-    def shapegrad(self, *args):
+    @classmethod
+    def shapegrad(cls, *args):
         raise NotImplementedError
 
+    @classmethod
+    def shape_tables(cls):
+        """Shape functions and their derivatives with respect to the natural
+        coordinates at the fixed points of the element type
+
+        Returns
+        -------
+        tables : dict
+            tables[key] = (N, dNdxi) where N[p] and dNdxi[p] are the shape
+            functions and their gradient at the pth point of the gauss
+            ('gauss'), hourglass ('hglass'), selective reduced integration
+            ('sri') points and the centroid ('centroid').
+            tables['edges'][edge] = (N, dNdxi, w) where N[p] are the shape
+            functions at the pth gauss point of edge ``edge``, dNdxi[p] the
+            derivatives of the edge shape functions with respect to the
+            edge coordinate and w[p] the weight.
+
+        Notes
+        -----
+        The tables depend only on the element type and are computed on first
+        use and stored on the class.
+
+        """
+        tables = cls.__dict__.get('_shape_tables')
+        if tables is not None:
+            return tables
+
+        tables = {}
+        points = (('gauss', cls.gaussp),
+                  ('hglass', getattr(cls, 'hglassp', None)),
+                  ('sri', getattr(cls, 'srip', None)),
+                  ('centroid', [cls.cp]))
+        for (key, xp) in points:
+            if xp is None:
+                continue
+            N = array([cls.shape(xi) for xi in xp])
+            dNdxi = array([cls.shapegrad(xi) for xi in xp])
+            tables[key] = (N, dNdxi)
+
+        if cls.dimensions == 2:
+            tables['edges'] = []
+            for (edge, edgenod) in enumerate(cls.edges):
+                if len(edgenod) == 2:
+                    # LINEAR SIDE
+                    gp = array([-1./sqrt(3.), 1./sqrt(3.)])
+                    gw = ones(2)
+                    dNdxi = array([[-.5, .5] for xi in gp])
+                elif len(edgenod) == 3:
+                    # QUADRATIC SIDE
+                    gp = array([-sqrt(3./5.), 0, sqrt(3./5.)])
+                    gw = array([0.5555555556, 0.8888888889, 0.5555555556])
+                    dNdxi = array([[-.5 + xi, .5 + xi, -2. * xi] for xi in gp])
+                else:
+                    raise ValueError('UNKNOWN ELEMENT EDGE ORDER')
+                N = array([cls.shape(xi, edge=edge) for xi in gp])
+                tables['edges'].append((N, dNdxi, gw))
+
+        cls._shape_tables = tables
+        return tables
+
     def gmatrix(self, *args):
         return NotImplementedError
 
@@ -102,13 +167,15 @@ class CSDIsoParametricElement(Element):
 
     def response(self, u, du, time, dtime, kstep, kframe, svars, dltyp, dload,
                  predef, procedure, nlgeom, cflag, step_type):
-        """Assemble the element stiffness and rhs"""
+        """Assemble the element stiffness and rhs.  The mass returned for
+        MASS_ONLY and MASS_AND_RHS is lumped, the (numdof,) row sums of the
+        consistent mass."""
 
         xc = self.xc  # + u.reshape(self.xc.shape)
 
         compute_stiff = cflag in (STIFF_AND_RHS, STIFF_ONLY)
         compute_force = cflag in (STIFF_AND_RHS, RHS_ONLY, MASS_AND_RHS)
-        compute_mass = cflag in (MASS_AND_RHS,)
+        compute_mass = cflag in (MASS_AND_RHS, MASS_ONLY)
 
         n = self.numdof
         if compute_stiff:
@@ -120,7 +187,7 @@ class CSDIsoParametricElement(Element):
                 Kii = zeros((self.dimensions*m1, self.dimensions*m1))
 
         if compute_mass:
-            Me = zeros((n, n))
+            Me = zeros(n)
 
         if compute_force:
             xforce = zeros(n)
@@ -134,6 +201,9 @@ class CSDIsoParametricElement(Element):
         m = len(v) * ntens
         a1, a2, a3 = [v.index(x) for x in ('E', 'DE', 'S')]
 
+        # SHAPE FUNCTIONS AND GRADIENTS AT THE GAUSS POINTS
+        N, dN = self.shape_tables()['gauss']
+
         # COMPUTE INTEGRATION POINT DATA
         bload = [dload[i] for (i, typ) in enumerate(dltyp) if typ==DLOAD]
         for p in range(self.integration):
@@ -143,10 +213,10 @@ class CSDIsoParametricElement(Element):
 
             # SHAPE FUNCTION AND GRADIENT
             xi = self.gaussp[p]
-            Ne = self.shape(xi)
+            Ne = N[p]
 
             # SHAPE FUNCTION DERIVATIVE AT GAUSS POINTS
-            dNdxi = self.shapegrad(xi)
+            dNdxi = dN[p]
 
             # JACOBIAN TO NATURAL COORDINATES
             dxdxi = dot(dNdxi, xc)
@@ -228,7 +298,7 @@ class CSDIsoParametricElement(Element):
             #E = .5 * (dot(F.T, F) - I3x3)
 
             # STORE THE UPDATED VARIABLES
-            svars[1,ij+a1*ntens:ij+(a1+1)*ntens] += de  # STRAIN
+            svars[1,ij+a1*ntens:ij+(a1+1)*ntens] = e + de  # STRAIN
             svars[1,ij+a2*ntens:ij+(a2+1)*ntens] = de  # STRAIN INCREMENT
             svars[1,ij+a3*ntens:ij+(a3+1)*ntens] = s  # STRESS
 
@@ -236,7 +306,7 @@ class CSDIsoParametricElement(Element):
                 # ADD CONTRIBUTION OF FUNCTION CALL TO INTEGRAL
                 if self.incompatible_modes:
                     # INCOMPATIBLE MODES
-                    G = self.gmatrix(xi)
+                    G = self.gmatrix(xi, J)
                     Kci += dot(dot(B.T, D), G) * J * self.gaussw[p]
                     Kii += dot(dot(G.T, D), G) * J * self.gaussw[p]
                 elif self.selective_reduced:
@@ -260,9 +330,11 @@ class CSDIsoParametricElement(Element):
                         Ke += c / rp * dot(Pe.T, (dot(Dh, B) - dot(Db, B)))
 
             if compute_mass:
-                # ADD CONTRIBUTION OF FUNCTION CALL TO INTEGRAL
+                # ADD CONTRIBUTION OF FUNCTION CALL TO INTEGRAL.  THE ROW SUMS
+                # OF P.T P ARE P.T TIMES THE ROW SUMS OF P
                 Pe = self.pmatrix(Ne)
-                Me += J * self.gaussw[p] * self.material.density * dot(Pe.T, Pe)
+                Me += (J * self.gaussw[p] * self.material.density *
+                       dot(Pe.T, Pe.sum(axis=1)))
 
             if compute_force:
                 Pe = self.pmatrix(Ne)
@@ -320,38 +392,185 @@ class CSDIsoParametricElement(Element):
         elif cflag == MASS_AND_RHS:
             return Me, xforce, eresid
 
-    def surface_force(self, edge, qe):
+    def supports_block_response(self):
+        """Whether ``block_response`` can be used for the element block that
+        this element belongs to"""
+        if (self.incompatible_modes or self.hourglass_control or
+            self.selective_reduced or self.mean_dilatation or
+            self.axisymmetric):
+            return False
+        return hasattr(self.material.model, 'block_response')
+
+    def bmatrix_block(self, dNdx):
+        """Assemble the B matrices for stacked shape function derivatives
+        ``dNdx`` of shape (..., dimensions, nodes)"""
+        ntens = self.ndir + self.nshr
+        B = zeros(dNdx.shape[:-2] + (ntens, self.numdof))
+        B[...,0,0::2] = B[...,ntens-1,1::2] = dNdx[...,0,:]
+        B[...,1,1::2] = B[...,ntens-1,0::2] = dNdx[...,1,:]
+        return B
+
+    def block_geometry(self, xc):
+        """Jacobian determinants times the gauss weights and B matrices of
+        many elements at once
+
+        Parameters
+        ----------
+        xc : ndarray
+            xc[e] are the nodal coordinates of the eth element
+
+        Returns
+        -------
+        c : ndarray
+            c[e,p] is the Jacobian determinant times the weight of the pth
+            gauss point of the eth element
+        B : ndarray
+            B[e,p] is the B matrix at the pth gauss point of the eth element
+
+        """
+        # SHAPE FUNCTION GRADIENTS AT THE GAUSS POINTS
+        dNdxi = self.shape_tables()['gauss'][1]
+
+        # JACOBIANS, THEIR DETERMINANTS AND INVERSES
+        dxdxi = einsum('pia,eaj->epij', dNdxi, xc)
+        J = la.det(dxdxi)
+        dxidx = la.inv(dxdxi)
+        c = J * self.gaussw
+
+        # SHAPE FUNCTION DERIVATIVES WRT GLOBAL X AND B MATRICES
+        dNdx = einsum('epij,pja->epia', dxidx, dNdxi)
+        return c, self.bmatrix_block(dNdx)
+
+    def block_response(self, xc, u, du, time, dtime, kstep, kframe, svars,
+                       bload, predef, procedure, nlgeom, cflag, step_type,
+                       geometry=None):
+        """Vectorized element stiffness and rhs of many elements at once
+
+        Parameters
+        ----------
+        xc : ndarray
+            xc[e] are the nodal coordinates of the eth element
+        u, du : ndarray
+            u[e] and du[e] are the element DOFs of the eth element
+        svars : ndarray
+            svars[:,e] are the state variables of the eth element.  svars[1]
+            is updated in place.
+        bload : ndarray or None
+            bload[e] is the total body force acting on the eth element
+        geometry : tuple, optional
+            (c, B) of the elements as returned by ``block_geometry``.  If
+            not given it is computed from ``xc``
+
+        Returns
+        -------
+        Same as ``response``, but each array has an additional leading
+        dimension of length equal to the number of elements.
+
+        Notes
+        -----
+        ``self`` is any element of the block.  Only its class data and
+        material are used, so every element passed must share both.  The
+        element loop and integration point loop of ``response`` are replaced
+        by stacked arrays of shape (nel, ngauss, ...).
+
+        """
+        compute_stiff = cflag in (STIFF_AND_RHS, STIFF_ONLY)
+        compute_force = cflag in (STIFF_AND_RHS, RHS_ONLY, MASS_AND_RHS)
+        compute_mass = cflag in (MASS_AND_RHS, MASS_ONLY)
+
+        nel = xc.shape[0]
+        ntens = self.ndir + self.nshr
+        ngauss = self.integration
+
+        # SHAPE FUNCTIONS AT THE GAUSS POINTS, JACOBIANS AND B MATRICES
+        N = self.shape_tables()['gauss'][0]
+        if geometry is None:
+            geometry = self.block_geometry(xc)
+        c, B = geometry
+
+        # STRAIN INCREMENT
+        de = einsum('epkn,en->epk', B, du)
+
+        # MATERIAL RESPONSE
+        v = [x[0] for x in self.variables()]
+        a1, a2, a3 = [v.index(x) for x in ('E', 'DE', 'S')]
+        sv0 = svars[0].reshape(nel, ngauss, len(v), ntens)
+        sv1 = svars[1].reshape(nel, ngauss, len(v), ntens)
+        temp = einsum('pa,ea->ep', N, predef[0,0])
+        dtemp = einsum('pa,ea->ep', N, predef[1,0])
+        F0 = F = eye(ntens)
+        xv = zeros((nel, ngauss, 1))
+        s = array(sv0[:,:,a3])
+        s, xv, D = self.material.block_response(
+            s, xv, sv0[:,:,a1], de, time, dtime, temp, dtemp, None, None,
+            self.ndir, self.nshr, ntens, xc, F0, F, None, kstep, kframe)
+
+        # STORE THE UPDATED VARIABLES
+        sv1[:,:,a1] = sv0[:,:,a1] + de
+        sv1[:,:,a2] = de
+        sv1[:,:,a3] = s
+        svars[1] = sv1.reshape(nel, -1)
+
+        if cflag == LP_OUTPUT:
+            return
 
-        edgenod = self.edges[edge]
-        xb = self.xc[edgenod]
+        n = self.numdof
+        if compute_stiff:
+            # KE = SUM OVER THE GAUSS POINTS OF C B^T D B, AS ONE BATCHED
+            # PRODUCT OF THE (N, NGAUSS*NTENS) STACKED C B^T WITH D B
+            DB = matmul(D, B).reshape(nel, -1, n)
+            cB = (c[:,:,newaxis,newaxis] * B).reshape(nel, -1, n)
+            Ke = matmul(cB.transpose(0, 2, 1), DB)
 
-        if self.dimensions == 2:
-            if len(xb) == 2:
-                # LINEAR SIDE
-                gw = ones(2)
-                gp = array([-1./sqrt(3.), 1./sqrt(3.)])
-                Jac = lambda xi: sqrt((xb[1,1]-xb[0,1])**2+(xb[1,0]-xb[0,0])**2)/2.
+        if cflag == STIFF_ONLY:
+            return Ke
 
-            elif len(xb) == 3:
-                # QUADRATIC SIDE
-                gp = array([-sqrt(3./5.), 0, sqrt(3./5.)])
-                gw = array([0.5555555556, 0.8888888889, 0.5555555556])
-                def Jac(xi):
-                    dxdxi = dot([[-.5 + xi, .5 + xi, -2. * xi]], xb)
-                    return sqrt(dxdxi[0, 0] ** 2 + dxdxi[0, 1] ** 2)
+        if compute_mass:
+            # P.T P IS THE KRONECKER PRODUCT OF N N.T WITH THE IDENTITY, ITS
+            # ROW SUMS ARE THOSE OF N N.T REPEATED FOR EACH COMPONENT
+            nd = self.dimensions
+            Me = einsum('ep,pa,pb->ea', c, N, N) * self.material.density
+            Me = repeat(Me, nd, axis=1)
 
-            else:
-                raise ValueError('UNKNOWN ELEMENT EDGE ORDER')
+        if cflag == MASS_ONLY:
+            return Me
+
+        xforce = zeros((nel, n))
+        if compute_force and bload is not None:
+            xforce += einsum('ep,pa,ei->eai', c, N, bload).reshape(nel, n)
 
+        if step_type == GENERAL:
+            eresid = einsum('ep,epk,epkn->en', c, s, B)
         else:
+            eresid = zeros((nel, n))
+
+        if cflag == STIFF_AND_RHS:
+            return Ke, xforce, eresid
+
+        elif cflag == RHS_ONLY:
+            return xforce, eresid
+
+        elif cflag == MASS_AND_RHS:
+            return Me, xforce, eresid
+
+    def surface_force(self, edge, qe):
+
+        if self.dimensions != 2:
             raise ValueError('3D SURFACE FORCE NOT IMPLEMENTED')
 
+        # SHAPE FUNCTIONS AT THE GAUSS POINTS OF THE EDGE AND THE EDGE
+        # JACOBIAN |DX/DXI|
+        N, dNdxi, gw = self.shape_tables()['edges'][edge]
+        xb = self.xc[self.edges[edge]]
+        dxdxi = dot(dNdxi, xb)
+        Jac = sqrt(dxdxi[:,0] ** 2 + dxdxi[:,1] ** 2)
+
         Fe = zeros(self.numdof)
-        for (p, xi) in enumerate(gp):
+        for p in range(len(gw)):
             # FORM GAUSS POINT ON SPECIFIC EDGE
-            Ne = self.shape(xi, edge=edge)
+            Ne = N[p]
             Pe = self.pmatrix(Ne)
-            c = Jac(xi) * gw[p]
+            c = Jac[p] * gw[p]
             if self.axisymmetric == 1:
                 rp = dot(Ne, self.xc[:,0])
                 c *= rp
@@ -365,14 +584,15 @@ class CSDIsoParametricElement(Element):
         xc = self.xc
         n = self.numdof
         Khg = zeros((n, n))
+        N, dN = self.shape_tables()['hglass']
         for p in range(len(self.hglassp)):
 
             # SHAPE FUNCTION DERIVATIVE AT HOURGLASS GAUSS POINTS
             xi = array(self.hglassp[p])
-            dNdxi = self.shapegrad(xi)
+            dNdxi = dN[p]
 
             # JACOBIAN TO NATURAL COORDINATES
-            Ne = self.shape(xi)
+            Ne = N[p]
             dxdxi = dot(dNdxi, xc)
             dxidx = inv(dxdxi)
             dNdx = dot(dxidx, dNdxi)
@@ -414,12 +634,13 @@ class CSDIsoParametricElement(Element):
         # EVALUATE MATERIAL MODEL AT ELEMENT CENTROID
         xi = self.cp
         xc = self.xc
+        tables = self.shape_tables()
 
         # SHAPE FUNCTION AND GRADIENT
-        Ne = self.shape(xi)
+        Ne = tables['centroid'][0][0]
 
         # SHAPE FUNCTION DERIVATIVE AT GAUSS POINTS
-        dNdxi = self.shapegrad(xi)
+        dNdxi = tables['centroid'][1][0]
 
         # JACOBIAN TO NATURAL COORDINATES
         dxdxi = dot(dNdxi, xc)
@@ -454,14 +675,15 @@ class CSDIsoParametricElement(Element):
         D1, D2 = iso_dev_split(self.ndir, self.nshr, self.dimensions, D)
 
         # GAUSS INTEGRATION
+        N, dN = tables['sri']
         for p in range(len(self.srip)):
             xi = self.srip[p]
             w = self.sriw[p]
-            dNdxi = self.shapegrad(xi)
+            dNdxi = dN[p]
             dxdxi = dot(dNdxi, xc)
             dxidx = inv(dxdxi)
             J = det(dxdxi)
-            Ne = self.shape(xi)
+            Ne = N[p]
             dNdx = dot(dxidx, dNdxi)
             B = self.bmatrix(dNdx, Ne, xi)
             Ksri += J * w * dot(dot(B.T, D1), B)
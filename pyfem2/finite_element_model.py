@@ -1,5 +1,7 @@
 import os
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from numpy import *
 import numpy.linalg as la
 
@@ -8,9 +10,21 @@ from .constants import *
 from .mesh import *
 from .step import StepRepository
 from .material import Material
+from .linear_solvers import linear_solver, ElementOperator
+from .elemlib.element import ElementArray, ElementBlockData
 
 __all__ = ['FiniteElementModel']
 
+# MODEL INHERITED BY FORKED ASSEMBLY WORKER PROCESSES
+_worker_model = None
+
+def _init_worker(model):
+    global _worker_model
+    _worker_model = model
+
+def _block_response(*args):
+    return _worker_model._block_response(*args)
+
 class FiniteElementModel(object):
     """
     The base finite element class
@@ -22,8 +36,9 @@ class FiniteElementModel(object):
     implemented in class' derived from this one.
 
     """
-    def __init__(self, mesh=None, jobid=None):
+    def __init__(self, mesh=None, jobid=None, renumber=None):
         self.jobid = jobid or 'Job-1'
+        self.renumber = renumber
         self.dimensions = None
         self.materials = {}
         self.initial_temp = []
@@ -31,6 +46,19 @@ class FiniteElementModel(object):
         self.fh = None
         self.steps = None
         self._setup = False
+        self._pool = None
+        self._pool_key = None
+        self._threads = None
+        self._wave_speed = None
+        self._linear = None
+        self._factored = {}
+        self._revision = 0
+        self._cached_revision = None
+        self._blkcolors = None
+        self._blknzmap = None
+        self._blkbandmap = None
+        self._geometry = None
+        self._geometry_dtype = None
 
         self._mesh = None
         if mesh is not None:
@@ -64,7 +92,7 @@ class FiniteElementModel(object):
         self._mesh = mesh
         self.dimensions = self.mesh.dimensions
         self.numele = self.mesh.numele
-        self.elements = empty(self.numele, dtype=object)
+        self.elements = ElementArray(self.numele)
         self.numnod = self.mesh.numnod
         self._setup = False
 
@@ -140,7 +168,7 @@ class FiniteElementModel(object):
 
     @property
     def orphaned_elements(self):
-        return [iel for (iel, el) in enumerate(self.elements) if el is None]
+        return list(self.elements.unassigned)
 
     def setup(self):
 
@@ -154,43 +182,158 @@ class FiniteElementModel(object):
 
         # CHECK VALIDITY OF ELEMENTS
         self._check_element_validity()
+        self._revision += 1
 
-        # NODE FREEDOM ASSOCIATION TABLE
-        active_dof = [None] * MDOF
+        # NODE FREEDOM ASSOCIATION TABLE, THE UNION OF THE SIGNATURES OF THE
+        # ELEMENTS CONNECTED TO EACH NODE
         self.nodfat = zeros((self.numnod, MDOF), dtype=int)
-        for el in self.elements:
-            for (i, node) in enumerate(el.inodes):
-                nfs = el.signature[i]
-                nf = [max(nfs[j], self.nodfat[node,j]) for j in range(MDOF)]
-                self.nodfat[node] = nf
-                for (j, k) in enumerate(nfs):
-                    if k:
-                        active_dof[j] = j
-        self.active_dof = array([x for x in active_dof if x is not None])
+        for eb in self.mesh.eleblx:
+            elecon = asarray(eb.elecon, dtype=int)
+            signature = self._block_signature(eb)
+            for (i, nfs) in enumerate(signature):
+                # REPEATED NODES ALL TAKE THE SAME VALUE
+                nodes = elecon[:,i]
+                self.nodfat[nodes] = maximum(self.nodfat[nodes], nfs)
+        self.active_dof = where(self.nodfat.any(axis=0))[0]
 
         # TOTAL NUMBER OF DEGREES OF FREEDOM
-        self.numdof = sum(count_digits(p) for p in self.nodfat)
+        self.numdof = int(count_nonzero(self.nodfat))
 
-        # NODE FREEDOM MAP TABLE
+        # NODE FREEDOM MAP TABLE.  THE DOFS OF EACH NODE ARE NUMBERED
+        # CONSECUTIVELY, NODE BY NODE IN THE ORDER GIVEN BY _node_ordering.
+        # _DOFOFFSET[I,J] IS THE POSITION OF DOF J AMONG THE DOFS OF NODE I
+        order = self._node_ordering()
+        ndof = count_nonzero(self.nodfat, axis=1)
         self.nodfmt = zeros(self.numnod, dtype=int)
-        self._dofmap = {}
-        dof = 0
-        nodfmt = [0]
-        for i in range(self.numnod):
-            for (j, k) in enumerate(self.nodfat[i]):
-                if not k: continue
-                self._dofmap[i,j] = dof
-                dof += 1
-            nodfmt.append(dof)
-        self.nodfmt = array(nodfmt[:-1], dtype=int)
-
-        # ELEMENT FREEDOM TABLE
+        self.nodfmt[order] = concatenate(([0], cumsum(ndof[order])[:-1]))
+        self._dofoffset = cumsum(self.nodfat > 0, axis=1) - 1
+
+        # ELEMENT FREEDOM TABLE, ONE (NEL, N) ARRAY PER ELEMENT BLOCK
         self.eftab = self._element_freedom_table()
 
+        # PER ELEMENT BLOCK ARRAYS FOR VECTORIZED ASSEMBLY
+        self._element_block_tables()
+
         self._setup = True
 
     def dofmap(self, inode, dof):
-        return self._dofmap.get((inode,dof))
+        """The global DOF of freedom ``dof`` of node ``inode``, or None"""
+        if not self.nodfat[inode,dof]:
+            return None
+        return int(self.nodfmt[inode] + self._dofoffset[inode,dof])
+
+    def _dof_labels(self):
+        """The node and freedom label of each global DOF"""
+        nodes, labels = nonzero(self.nodfat)
+        dofs = self.nodfmt[nodes] + self._dofoffset[nodes,labels]
+        node, label = zeros((2, self.numdof), dtype=int)
+        node[dofs], label[dofs] = nodes, labels
+        return node, label
+
+    def _block_signature(self, eb):
+        """The (nodes, MDOF) node freedom signature of the elements of
+        element block ``eb``"""
+        el = self.elements[self.mesh.elemap[eb.labels[0]]]
+        return asarray(el.signature, dtype=int)
+
+    def _block_ielems(self, eb):
+        """The internal element IDs of the elements of element block ``eb``,
+        in block order"""
+        if eb.ielems is not None:
+            return asarray(eb.ielems, dtype=int)
+        return array([self.mesh.elemap[xel] for xel in eb.labels], dtype=int)
+
+    def _node_ordering(self):
+        """The order in which the DOFs of the nodes are numbered
+
+        Nodes are numbered in internal node order, unless ``renumber`` is
+        'rcm' (reverse Cuthill-McKee, reduces the bandwidth) or 'mindegree'
+        (minimum degree, reduces the fill of a direct factorization), in
+        which case the nodes are reordered using the node adjacency graph of
+        the element connectivity.  The bandwidth and profile of the global
+        stiffness before and after reordering are logged.
+
+        """
+        order = arange(self.numnod)
+        if self.renumber is None:
+            return order
+
+        renumber = self.renumber.lower()
+        if renumber == 'rcm':
+            order = self._rcm_ordering()
+        elif renumber == 'mindegree':
+            order = minimum_degree_ordering(*self._node_graph())
+        else:
+            raise UserInputError('UNKNOWN DOF RENUMBERING '
+                                 '{0!r}'.format(self.renumber))
+
+        b0, p0 = self._band_profile(arange(self.numnod))
+        b1, p1 = self._band_profile(order)
+        logging.info('DOF RENUMBERING ({0}): BANDWIDTH {1} -> {2}, '
+                     'PROFILE {3} -> {4}'.format(renumber.upper(), b0, b1,
+                                                 p0, p1))
+        return asarray(order, dtype=int)
+
+    def _node_graph(self):
+        """The node adjacency graph, nodes sharing an element are adjacent.
+        The neighbors of node i are indices[indptr[i]:indptr[i+1]]."""
+        rows, cols = [], []
+        for eb in self.mesh.eleblx:
+            elecon = asarray(eb.elecon, dtype=int)
+            n = elecon.shape[1]
+            rows.append(repeat(elecon, n, axis=1).ravel())
+            cols.append(tile(elecon, (1, n)).ravel())
+        graph = unique(concatenate(rows) * self.numnod + concatenate(cols))
+        i, j = graph // self.numnod, graph % self.numnod
+        offdiag = i != j
+        i, j = i[offdiag], j[offdiag]
+        indptr = concatenate(([0], cumsum(bincount(i, minlength=self.numnod))))
+        return indptr, j
+
+    def _rcm_ordering(self, graph=None):
+        """Reverse Cuthill-McKee ordering of the nodes.  ``graph`` is the
+        node graph, if already computed by ``_node_graph``"""
+        if scisparse is None:
+            raise UserInputError('RCM RENUMBERING REQUIRES SCIPY')
+        from scipy.sparse.csgraph import reverse_cuthill_mckee
+        indptr, indices = graph if graph is not None else self._node_graph()
+        G = scisparse.csr_matrix((ones(len(indices)), indices, indptr),
+                                 shape=(self.numnod, self.numnod))
+        return reverse_cuthill_mckee(G, symmetric_mode=True)
+
+    def _nonzeros(self, graph=None):
+        """Number of nonzeros of the global stiffness, counted from the node
+        graph without forming the sparsity pattern.  Every DOF of a node is
+        taken as coupled to every DOF of its neighbors, so the count is exact
+        unless elements with different DOFs share a node."""
+        indptr, indices = graph if graph is not None else self._node_graph()
+        ndof = count_nonzero(self.nodfat, axis=1)
+        i = repeat(arange(self.numnod), diff(indptr))
+        return int(dot(ndof, ndof) + dot(ndof[i], ndof[indices]))
+
+    def _band_profile(self, order):
+        """Half bandwidth and profile of the global stiffness when the DOFs
+        of the nodes are numbered in the order ``order``"""
+        ndof = count_nonzero(self.nodfat, axis=1)
+        first = zeros(self.numnod, dtype=int)
+        first[order] = concatenate(([0], cumsum(ndof[order])[:-1]))
+        last = first + ndof - 1
+        # LOWEST DOF COUPLED TO EACH NODE
+        lowest = first.copy()
+        bandwidth = 0
+        for eb in self.mesh.eleblx:
+            elecon = asarray(eb.elecon, dtype=int)
+            emin = first[elecon].min(axis=1)
+            bandwidth = max(bandwidth,
+                            (last[elecon].max(axis=1) - emin).max())
+            minimum.at(lowest, elecon, emin[:,newaxis])
+        # EACH ROW OF THE LOWER PROFILE SPANS FROM THE LOWEST COUPLED DOF
+        profile = int(sum(ndof * (first - lowest) + ndof * (ndof - 1) // 2))
+        return int(bandwidth), profile
+
+    def bandwidth(self):
+        """Half bandwidth and profile of the global stiffness"""
+        return self._band_profile(argsort(self.nodfmt, kind='stable'))
 
     def _check_element_validity(self):
         pass
@@ -273,47 +416,492 @@ class FiniteElementModel(object):
         else:
             temp = None
 
-        for n in range(self.numnod):
-            ix, ui, ri = 0, 0, 0
-            for j in range(MDOF):
-                if self.nodfat[n,j] > 0:
-                    ii = self.nodfmt[n] + ix
-                    if j in (X,Y,Z):
-                        u[n,ui] = dofs[ii]
-                        ui += 1
-                    elif j in (TX,TY,TZ):
-                        r[n,ri] = dofs[ii]
-                        ri += 1
-                    else:
-                        temp[n] = dofs[ii]
-                    ix += 1
+        # THE DISPLACEMENTS (ROTATIONS) OF EACH NODE FILL THE COLUMNS OF U
+        # (R) IN ORDER
+        dofmap = self.nodfmt[:,newaxis] + self._dofoffset
+        for (labels, a) in (((X,Y,Z), u), ((TX,TY,TZ), r)):
+            present = self.nodfat[:,labels] > 0
+            col = cumsum(present, axis=1) - 1
+            n, k = nonzero(present)
+            a[n,col[n,k]] = dofs[dofmap[n,array(labels)[k]]]
+        if temp is not None:
+            n = nonzero(self.nodfat[:,T])[0]
+            temp[n] = dofs[dofmap[n,T]]
         return u, r, temp
 
     def _element_freedom_table(self):
+        """The element freedom table of each element block, an (nel, n)
+        array of the global DOFs of the elements, n being the number of
+        element DOFs"""
         eftab = []
-        for el in self.elements:
-            eft = zeros(sum(count_digits(nfs) for nfs in el.signature), dtype=int)
-            k, count = 0, 0
-            for (i, inode) in enumerate(el.inodes):
-                ix, sx = 0, zeros(MDOF, dtype=int)
-                nfs1 = self.nodfat[inode]
-                for j in range(MDOF):
-                    if nfs1[j] > 0:
-                        sx[j] = ix
-                        ix += 1
-                nfs2 = el.signature[i]
-                for j in range(MDOF):
-                    if nfs2[j] > 0:
-                        if nfs1[j] > 0:
-                            eft[k] = self.nodfmt[inode] + sx[j]
-                            count += 1
-                        k += 1
-            if all(eft==0.):
+        for eb in self.mesh.eleblx:
+            elecon = asarray(eb.elecon, dtype=int)
+            # ELEMENT DOFS ARE ORDERED NODE BY NODE
+            a, j = nonzero(self._block_signature(eb))
+            nodes = elecon[:,a]
+            eft = self.nodfmt[nodes] + self._dofoffset[nodes,j]
+            zero = where(~eft.any(axis=1))[0]
+            if len(zero):
                 raise UserInputError('ZERO ENTRY IN EFTAB FOR '
-                                     'ELEMENT {0}'.format(el.label))
+                                     'ELEMENT {0}'.format(eb.labels[zero[0]]))
             eftab.append(eft)
         return eftab
 
+    def _element_block_tables(self):
+        """Stack the element data of each element block.
+
+        Sets ``_blkielx[ieb]`` (internal element IDs of the block, in block
+        order), ``_blkeft[ieb]`` (the (nel, n) element freedom table of the
+        block), ``_blkxc[ieb]`` (the (nel, nodes, dimensions) nodal
+        coordinates), and ``_blkvec[ieb]``, which is True if the block can be
+        assembled by the element type's vectorized ``block_response``.
+
+        """
+        self._blkielx, self._blkeft, self._blkxc, self._blkvec = [], [], [], []
+        for (ieb, eb) in enumerate(self.mesh.eleblx):
+            ielems = self._block_ielems(eb)
+            self._blkielx.append(ielems)
+            self._blkeft.append(self.eftab[ieb])
+
+            # THE ELEMENTS OF A BLOCK SHARE A TYPE AND MATERIAL AND THEIR
+            # COORDINATES ARE STORED STACKED IN THE BLOCK DATA
+            el = self.elements[ielems[0]]
+            self._blkxc.append(el.block.coord)
+            vec = (hasattr(el, 'block_response') and
+                   el.supports_block_response())
+            self._blkvec.append(vec)
+
+    def _element_colors(self):
+        """Greedy coloring of the elements of each element block such that no
+        two elements of the same color share a degree of freedom.  Computed
+        on the first assembly with more than one thread.
+
+        Sets ``_blkcolors[ieb]``, the list of colors of block ``ieb``, each
+        an array of (block local) element indices in increasing order.
+
+        """
+        self._blkcolors = []
+        for eft in self._blkeft:
+            # AN ELEMENT SHARES ITS N DOFS WITH AT MOST N*(V-1) OTHERS, V THE
+            # LARGEST NUMBER OF ELEMENTS TOUCHING A DOF, SO THE GREEDY
+            # COLORING USES AT MOST N*(V-1)+1 COLORS.
+            # USED[C, I] IS TRUE IF DOF I IS TOUCHED BY AN ELEMENT OF COLOR C
+            valence = bincount(eft.ravel(), minlength=self.numdof).max()
+            used = zeros((eft.shape[1] * (valence - 1) + 1, self.numdof),
+                         dtype=bool)
+            color = empty(len(eft), dtype=int)
+            for (e, dofs) in enumerate(eft):
+                c = where(~used[:,dofs].any(axis=1))[0][0]
+                used[c, dofs] = True
+                color[e] = c
+            self._blkcolors.append([where(color == c)[0]
+                                    for c in range(color.max() + 1)])
+
+    def _sparsity_pattern(self):
+        """Compute the CSR sparsity pattern of the global stiffness from the
+        element freedom table.  Computed on the first sparse assembly.
+
+        Sets ``_nzindptr`` and ``_nzindices`` (the CSR structure),
+        ``_nzdata`` (the data array reused by ``assemble``) and
+        ``_blknzmap``, where ``_blknzmap[ieb][e]`` are the positions in the
+        data array of the entries of the flattened stiffness of the eth
+        element of block ``ieb``.
+
+        """
+        N = self.numdof
+        keys = []
+        for eft in self._blkeft:
+            n = eft.shape[1]
+            eft = eft.astype(int64)
+            ki = repeat(eft, n, axis=1)
+            kj = tile(eft, (1, n))
+            keys.append((ki * N + kj).ravel())
+
+        # UNIQUE (ROW, COLUMN) PAIRS SORTED BY ROW THEN COLUMN ARE THE CSR
+        # NONZEROS.  THE INVERSE INDEX MAPS ELEMENT ENTRIES TO NONZERO SLOTS
+        nz, inverse = unique(concatenate(keys), return_inverse=True)
+        itype = int32 if len(nz) < iinfo(int32).max else int64
+        self._nzindices = (nz % N).astype(itype)
+        self._nzindptr = zeros(N+1, dtype=itype)
+        cumsum(bincount(nz // N, minlength=N), out=self._nzindptr[1:])
+        self._nzdata = zeros(len(nz))
+
+        self._blknzmap = []
+        start = 0
+        for (ielems, k) in zip(self._blkielx, keys):
+            self._blknzmap.append(
+                inverse[start:start+len(k)].reshape(len(ielems), -1))
+            start += len(k)
+
+    def _band_pattern(self):
+        """Compute the positions of the element stiffnesses in the upper band
+        storage of the global stiffness
+
+        Sets ``_bandwidth`` (the half bandwidth) and ``_blkbandmap``, where
+        ``_blkbandmap[ieb][e]`` are the positions in the flattened (u+1, N)
+        band of the entries of the flattened stiffness of the eth element of
+        block ``ieb``.  Entries below the diagonal are mapped to the position
+        (u+1)*N, one past the end of the band, and discarded.
+
+        """
+        N = self.numdof
+        u = max([(eft.max(axis=1) - eft.min(axis=1)).max()
+                 for eft in self._blkeft])
+        self._bandwidth = int(u)
+        self._blkbandmap = []
+        for eft in self._blkeft:
+            eft = eft.astype(int64)
+            i, j = eft[:,:,newaxis], eft[:,newaxis,:]
+            a = where(i <= j, (u + i - j) * N + j, (u + 1) * N)
+            self._blkbandmap.append(a.reshape(len(eft), -1))
+
+    def geometry_cache_size(self, dtype=float64):
+        """Estimated memory, in bytes, of the geometry cache of
+        ``cache_geometry`` with values of type ``dtype``"""
+        size = 0.
+        for eb in self.mesh.eleblx:
+            el = self.elements[self._block_ielems(eb)[0]]
+            if not (hasattr(el, 'block_geometry') and
+                    el.supports_block_response()):
+                continue
+            # J*W AND B AT EVERY GAUSS POINT
+            ntens = el.ndir + el.nshr
+            size += eb.numele * el.integration * (1. + ntens * el.numdof)
+        return size * array(0, dtype=dtype).itemsize
+
+    def cache_geometry(self, enable=True, dtype=float64, memory_limit=None):
+        """Cache the element geometry of small strain analyses
+
+        Parameters
+        ----------
+        enable : bool, optional {True}
+            Enable (or disable) the cache
+        dtype : numpy dtype, optional {float64}
+            The type of the cached values.  float32 halves the memory at the
+            cost of the precision of the element stiffnesses.
+        memory_limit : float, optional
+            Memory budget in bytes [default: the available physical memory]
+
+        Returns
+        -------
+        estimate : float
+            Estimated memory of the cache, in bytes
+
+        Notes
+        -----
+        When ``nlgeom`` is False, the Jacobian determinants and B matrices
+        at the gauss points depend only on the reference nodal coordinates.
+        With the cache enabled, J times the gauss weight and B are computed
+        for every element and gauss point of each element block on its first
+        small strain assembly and kept, so that later assemblies go straight
+        to the material response and B^T D B.  Only element blocks assembled
+        by the vectorized ``block_response`` are cached.
+
+        """
+        self._geometry = None
+        self._geometry_dtype = None
+        if not enable:
+            return 0.
+
+        if memory_limit is None:
+            memory_limit = available_memory()
+        dtype = array(0, dtype=dtype).dtype
+        estimate = self.geometry_cache_size(dtype)
+        if estimate > memory_limit:
+            raise UserInputError('GEOMETRY CACHE OF {0:.1f} MB EXCEEDS THE '
+                                 'MEMORY LIMIT OF {1:.1f} MB'.format(
+                                     estimate / 1e6, memory_limit / 1e6))
+        logging.info('GEOMETRY CACHE ({0}): {1:.1f} MB'.format(
+            dtype.name.upper(), estimate / 1e6))
+        self._geometry = [None] * len(self.mesh.eleblx)
+        self._geometry_dtype = dtype
+        return estimate
+
+    @property
+    def geometry_cached(self):
+        """Whether the geometry cache of ``cache_geometry`` is enabled"""
+        return self._geometry is not None
+
+    def _block_geometry(self, ieb, ix=None):
+        """The cached (c, B) of the elements ``ix`` of element block
+        ``ieb``, or None if it is not cached"""
+        if self._geometry is None or self._geometry[ieb] is None:
+            return None
+        c, B = self._geometry[ieb]
+        if ix is None:
+            return c, B
+        if len(ix) and ix[-1] - ix[0] + 1 == len(ix):
+            # CONSECUTIVE ELEMENTS, SLICE IN PLACE OF A COPY
+            ix = slice(ix[0], ix[-1] + 1)
+        return c[ix], B[ix]
+
+    def select_solver(self, memory_limit=None):
+        """Choose the storage of the global stiffness and the linear solver
+
+        Parameters
+        ----------
+        memory_limit : float, optional
+            Memory budget in bytes [default: the available physical memory]
+
+        Returns
+        -------
+        settings : dict
+            The step attributes ``sparse``, ``banded``, ``matrix_free``, and
+            ``solver_options`` of the choice
+        estimate : float
+            Estimated peak memory of the choice, in bytes
+
+        Notes
+        -----
+        The memory and operation count of each backend are estimated from
+        N, the number of nonzeros, the half bandwidth, and the profile after
+        reverse Cuthill-McKee ordering, which bounds the fill of the sparse
+        LU factors.  The nonzeros and profile are counted on the node graph
+        and the bandwidth on the element freedom table, the sparsity pattern
+        itself is not formed.  The direct backend (dense, banded, or sparse)
+        with the fewest operations that fits is chosen.  If none fits, conjugate
+        gradients with the AMG preconditioner on the sparse stiffness, and
+        finally matrix free conjugate gradients, are tried.
+
+        """
+        if memory_limit is None:
+            memory_limit = available_memory()
+
+        N = float(self.numdof)
+        graph = self._node_graph()
+        nnz = float(self._nonzeros(graph))
+        u = float(max([(eft.max(axis=1) - eft.min(axis=1)).max()
+                       for eft in self._blkeft]))
+        ke = float(sum([eft.shape[0] * eft.shape[1] ** 2
+                        for eft in self._blkeft]))
+
+        # (NAME, MEMORY, OPERATIONS, SETTINGS) OF EACH BACKEND.  EVERY BACKEND
+        # HOLDS THE STACKED ELEMENT STIFFNESSES OF A BLOCK WHILE ASSEMBLING.
+        # THE DENSE AND BAND STIFFNESS ARE HELD TWICE (WITH AND WITHOUT
+        # BOUNDARY CONDITIONS) BESIDES THEIR FACTOR, THE SPARSE STIFFNESS
+        # THREE TIMES (THE FREE DOF EXTRACTION AND CONVERSION TO CSC)
+        direct = [('DENSE', 24. * N ** 2 + 16. * ke, N ** 3 / 3., {})]
+        iterative = []
+        if scisparse is not None:
+            fill = 2. * self._band_profile(self._rcm_ordering(graph))[1] + N
+            direct.append(('BANDED', 24. * (u + 1) * N + 24. * ke,
+                           N * (u + 1) ** 2, {'banded': True}))
+            direct.append(('SPARSE', 36. * nnz + 12. * fill + 16. * ke,
+                           fill ** 2 / N, {'sparse': True}))
+            iterative.append(('SPARSE CG/AMG', 60. * nnz + 16. * ke + 80. * N,
+                              200. * nnz,
+                              {'sparse': True, 'solver_options':
+                               {'method': 'cg', 'preconditioner': 'amg'}}))
+        iterative.append(('MATRIX FREE CG', 16. * ke + 80. * N, 0.,
+                          {'matrix_free': True, 'solver_options':
+                           {'method': 'cg', 'preconditioner': 'jacobi'}}))
+
+        fits = [x for x in direct if x[1] <= memory_limit]
+        if fits:
+            choice = min(fits, key=lambda x: x[2])
+        else:
+            fits = [x for x in iterative if x[1] <= memory_limit]
+            if not fits:
+                raise UserInputError('NO LINEAR SOLVER FITS IN THE MEMORY '
+                                     'LIMIT OF {0:.1f} MB'.format(
+                                         memory_limit / 1e6))
+            choice = fits[0]
+
+        name, estimate, ops, options = choice
+        settings = {'sparse': False, 'banded': False, 'matrix_free': False,
+                    'solver_options': None}
+        settings.update(options)
+        msg = ', '.join(['{0} {1:.1f} MB'.format(x[0], x[1] / 1e6)
+                         for x in direct + iterative])
+        logging.info('SELECTED {0} SOLVER, {1} DOFS, MEMORY LIMIT {2:.1f} MB '
+                     '({3})'.format(name, self.numdof, memory_limit / 1e6,
+                                    msg))
+        return settings, estimate
+
+    def _block_loads(self, ielems, dltyp, dload):
+        """Sum the body loads on the elements ``ielems`` and collect their
+        surface loads.
+
+        Returns
+        -------
+        bload : ndarray or None
+            bload[e] is the total body load on element ielems[e]
+        sload : list
+            (e, iedge, components) for each surface load
+
+        """
+        bload, sload = None, []
+        loaded = where(fromiter(map(len, dltyp[ielems]), int, len(ielems)))[0]
+        for e in loaded:
+            iel = ielems[e]
+            for (i, typ) in enumerate(dltyp[iel]):
+                if typ == DLOAD:
+                    if bload is None:
+                        bload = zeros((len(ielems), self.dimensions))
+                    bload[e] += dload[iel][i]
+                elif typ == SLOAD:
+                    sload.append((e, dload[iel][i][0], dload[iel][i][1:]))
+                else:
+                    logging.warn('UNRECOGNIZED DLOAD FLAG')
+        return bload, sload
+
+    def _svars_index(self, svtab, ielems):
+        """Indices in to the state variable array of the elements ``ielems``,
+        which must all be of the same type"""
+        if not isinstance(svtab[ielems[0]], slice):
+            return zeros((len(ielems), 0), dtype=int)
+        starts = fromiter((svtab[i].start for i in ielems), int, len(ielems))
+        m = svtab[ielems[0]].stop - starts[0]
+        return starts[:,newaxis] + arange(m)
+
+    def svars_index(self, svtab):
+        """The indices in to the state variable array of the elements of
+        each element block, for the ``svx`` argument of ``assemble``.  They
+        depend only on ``svtab``, so steps that assemble many times can
+        compute them once"""
+        return [self._svars_index(svtab, ielems) for ielems in self._blkielx]
+
+    def _svars_view(self, svars, svx):
+        """View of shape (2, nel, m) of the state variables indexed by
+        ``svx``, or None if they are not stored contiguously and in order"""
+        if not svx.size or any(diff(svx[:,0]) != svx.shape[1]):
+            return None
+        return svars[:,svx[0,0]:svx[-1,-1]+1].reshape(2, svx.shape[0], -1)
+
+    def _block_response(self, ieb, ix, u, du, svars, dltyp, dload, predef,
+                        time, dtime, istep, iframe, procedure, nlgeom, cflag,
+                        step_type):
+        """Compute the responses of the elements ``ix`` (block local indices)
+        of element block ``ieb``
+
+        All array arguments are already gathered for the elements of the
+        chunk: ``u[e]`` are the element DOFs of element ``ix[e]``,
+        ``svars[:,e]`` its state variables, etc.
+
+        Returns
+        -------
+        response : tuple
+            (Ae, xforce, eresid) stacked over the elements of the chunk, where
+            Ae is the element stiffness or the lumped (row summed) mass that
+            the element returns, xforce the external force and eresid the
+            residual.  Quantities not requested by cflag are None.
+        sv1 : ndarray
+            The updated state variables svars[1]
+
+        """
+        ielems = self._blkielx[ieb][ix]
+        if self._blkvec[ieb]:
+            # EVALUATE THE WHOLE CHUNK AT ONCE
+            el = self.elements[ielems[0]]
+            bload, sload = None, []
+            if dltyp is not None:
+                bload, sload = self._block_loads(arange(len(ielems)), dltyp,
+                                                 dload)
+            geometry = None if nlgeom else self._block_geometry(ieb, ix)
+            response = el.block_response(
+                self._blkxc[ieb][ix], u, du, time, dtime, istep,
+                iframe, svars, bload, predef, procedure, nlgeom, cflag,
+                step_type, geometry=geometry)
+        else:
+            sload = []
+            response = []
+            for (e, iel) in enumerate(ielems):
+                dltyp_e, dload_e = [], []
+                if dltyp is not None:
+                    dltyp_e, dload_e = dltyp[e], dload[e]
+                r = self.elements[iel].response(
+                    u[e], du[e], time, dtime, istep, iframe, svars[:,e],
+                    dltyp_e, dload_e, predef[:,:,e], procedure, nlgeom,
+                    cflag, step_type)
+                response.append(r)
+            if cflag in (STIFF_ONLY, MASS_ONLY):
+                response = array(response)
+            elif cflag != LP_OUTPUT:
+                response = [array(x) for x in zip(*response)]
+
+        Ae = xforce = eresid = None
+        if cflag in (STIFF_AND_RHS, MASS_AND_RHS):
+            Ae, xforce, eresid = response
+        elif cflag in (STIFF_ONLY, MASS_ONLY):
+            Ae = response
+        elif cflag == RHS_ONLY:
+            xforce, eresid = response
+
+        if xforce is not None:
+            for (e, iedge, components) in sload:
+                el = self.elements[ielems[e]]
+                xforce[e] += el.surface_force(iedge, components)
+
+        return (Ae, xforce, eresid), svars[1]
+
+    def _color_response(self, ieb, ix, x, args, svx, svars, A, fext, fint,
+                        sparse, matrix_free=False, banded=False):
+        """Compute the responses of the elements ``ix`` of element block
+        ``ieb`` and add them to the global arrays in place.  The elements must
+        all be of one color, so that no two of them share a DOF and fancy
+        indexed updates may be used in place of ``add.at``"""
+        (Ae, xforce, eresid), sv1 = self._block_response(ieb, ix, *(x + args))
+        eft = self._blkeft[ieb][ix]
+        svars[1,svx[ix]] = sv1
+        if xforce is not None:
+            fext[eft] += xforce
+            fint[eft] += eresid
+        if Ae is None:
+            return
+        if Ae.ndim == 2:
+            # LUMPED MASS
+            A[eft] += Ae
+        elif matrix_free:
+            A[ieb][ix] = Ae
+        elif banded:
+            A[self._blkbandmap[ieb][ix]] += Ae.reshape(len(ix), -1)
+        elif sparse:
+            A[self._blknzmap[ieb][ix]] += Ae.reshape(len(ix), -1)
+        else:
+            A[eft[:,:,newaxis], eft[:,newaxis,:]] += Ae
+
+    def _thread_pool(self, threads):
+        """The pool of threads used by ``assemble``"""
+        if self._threads is not None and self._threads._max_workers == threads:
+            return self._threads
+        if self._threads is not None:
+            self._threads.shutdown()
+        self._threads = ThreadPoolExecutor(threads)
+        return self._threads
+
+    def _process_pool(self, workers):
+        """The pool of worker processes used by ``assemble``.  Workers are
+        forked from this process, so that they inherit the mesh and elements
+        without them being pickled.  They hold the model as it was when they
+        were forked, so the pool is replaced whenever the materials, element
+        properties or the geometry cache change"""
+        geometry = None
+        if self._geometry is not None:
+            geometry = (self._geometry_dtype,
+                        tuple(g is not None for g in self._geometry))
+        key = (workers, self._check_revision(), geometry)
+        if self._pool is not None and self._pool_key == key:
+            return self._pool
+        if self._pool is not None:
+            self._pool.shutdown()
+        try:
+            context = multiprocessing.get_context('fork')
+        except ValueError:
+            raise UserInputError('PARALLEL ASSEMBLY REQUIRES FORK')
+        self._pool = ProcessPoolExecutor(workers, mp_context=context,
+                                         initializer=_init_worker,
+                                         initargs=(self,))
+        self._pool_key = key
+        return self._pool
+
+    def close(self):
+        """Shut down the worker processes and threads started by
+        ``assemble``.  Steps call this at the end of their run"""
+        for pool in (self._pool, self._threads):
+            if pool is not None:
+                pool.shutdown()
+        self._pool = self._pool_key = self._threads = None
+
     def snapshot(self, step=None):
 
         if step is None:
@@ -332,7 +920,8 @@ class FiniteElementModel(object):
     def assemble(self, u, du, Q, svtab, svars, dltyp, dload, predef,
                  procedure, step_type, time=array([0.,0.]), dtime=1., period=1.,
                  istep=1, iframe=1, nlgeom=False, ninc=None,
-                 cflag=STIFF_AND_RHS, disp=0):
+                 cflag=STIFF_AND_RHS, disp=0, sparse=False, workers=None,
+                 threads=None, matrix_free=False, banded=False, svx=None):
         """
         Assembles the global system of equations
 
@@ -346,9 +935,10 @@ class FiniteElementModel(object):
             svtab[iel] are the indices for state variables for element iel
         svars : ndarray
             svtab[:,svtab[iel]] are the state variables for element iel
-        dltyp : ndarray
-            Distributed load type specifier
-        dload : ndarray
+        dltyp : ndarray or None
+            Distributed load type specifier, None if there are no
+            distributed loads
+        dload : ndarray or None
             Distributed loads
         predef : ndarray
             Predefined fields
@@ -369,15 +959,32 @@ class FiniteElementModel(object):
         ninc : int, opitional {None}
             Current increment
         cflag : symbolic constant, optional {STIFF_AND_RHS}
+        sparse : bool, optional {False}
+            Assemble the global stiffness in compressed sparse row format
+        workers : int, optional {None}
+            Number of worker processes computing element responses
+        threads : int, optional {None}
+            Number of threads computing element responses
+        matrix_free : bool, optional {False}
+            Keep the element stiffnesses in place of the global stiffness
+        banded : bool, optional {False}
+            Assemble the global stiffness in symmetric band storage
+        svx : list of ndarray, optional
+            The state variable indices of each element block, as returned by
+            ``svars_index(svtab)``
 
         Returns
         -------
-        K : ndarray
+        K : ndarray, scipy.sparse.csr_matrix, SymmetricBandMatrix, or
+            ElementOperator
             The (N,N) global stiffness array, where N is the total number of degrees
             of freedom in the probem.
         F : ndarray
             The (N,0) global RHS array, where N is the total number of degrees
             of freedom in the probem.
+        M : ndarray
+            The (N,) lumped global mass, assembled from the row summed element
+            masses, for cflag MASS_AND_RHS and MASS_ONLY.
 
         Notes
         -----
@@ -386,7 +993,43 @@ class FiniteElementModel(object):
 
         - nodes are ordered continuously from 0 to :math:`n-1`;
         - there are no multifreedom constraints; and
-        - the global stiffness matrix is stored as a full symmetric matrix.
+        - the global stiffness matrix is stored as a full symmetric matrix,
+          unless ``sparse`` is True.
+
+        When ``sparse`` is True, the element stiffnesses are scattered
+        directly in to the data array of the CSR sparsity pattern computed in
+        ``setup`` and the global stiffness is returned as a CSR matrix.  The
+        full (N,N) array is never formed.  The data array is owned by the
+        model and is reused by the next call to ``assemble``, so callers that
+        need to keep the stiffness beyond that must copy it.
+
+        When ``matrix_free`` is True, the global stiffness is not assembled at
+        all.  The element stiffnesses of each element block are kept and
+        returned as an ``ElementOperator``, whose product with a vector is
+        computed element by element.  It can only be solved iteratively.
+
+        When ``banded`` is True, the upper triangle of the element
+        stiffnesses is scattered directly in to LAPACK upper band storage,
+        whose half bandwidth is the largest DOF span of an element, and the
+        global stiffness is returned as a ``SymmetricBandMatrix``.  Memory is
+        proportional to N times the bandwidth, which is small for slender
+        meshes and for meshes renumbered by reverse Cuthill-McKee.
+
+        When ``workers`` is greater than 1, the elements of each element block
+        are split in to ``workers`` chunks of consecutive elements whose
+        responses are computed in a pool of forked worker processes.  Each
+        worker returns the stacked element arrays and state variables of its
+        chunk, which are scattered to the global arrays by this process in
+        chunk order.
+
+        When ``threads`` is greater than 1, the elements of each color of the
+        element coloring, computed on the first such assembly, are split
+        among a pool of threads that add the element arrays directly in to
+        the global arrays.
+        No two elements of a color share a DOF, so no locks are needed, and
+        colors are assembled in turn so that results do not depend on thread
+        scheduling.  The speed up comes from the vectorized ``block_response``
+        kernels, which release the GIL in NumPy.
 
         """
         procname = get_procname(procedure)
@@ -410,11 +1053,44 @@ class FiniteElementModel(object):
         compute_rhs = cflag in (STIFF_AND_RHS, RHS_ONLY, MASS_AND_RHS)
         compute_mass = cflag in (MASS_AND_RHS, MASS_ONLY)
 
-        if compute_stiff:
+        if sparse and not compute_stiff:
+            sparse = False
+
+        if matrix_free and not compute_stiff:
+            matrix_free = False
+
+        if banded and not compute_stiff:
+            banded = False
+
+        if len([x for x in (sparse, banded, matrix_free) if x]) > 1:
+            raise UserInputError('SPARSE, BANDED, AND MATRIX FREE ASSEMBLY '
+                                 'ARE MUTUALLY EXCLUSIVE')
+
+        if sparse and scisparse is None:
+            raise UserInputError('SPARSE ASSEMBLY REQUIRES SCIPY')
+
+        if sparse:
+            # REUSE THE DATA ARRAY OF THE CACHED SPARSITY PATTERN
+            if self._blknzmap is None:
+                self._sparsity_pattern()
+            Kv = self._nzdata
+            Kv[:] = 0.
+
+        elif matrix_free:
+            # ELEMENT STIFFNESSES OF EACH BLOCK
+            Ke = [empty(eft.shape + eft.shape[1:]) for eft in self._blkeft]
+
+        elif banded:
+            # FLATTENED BAND, PLUS ONE POSITION FOR THE DISCARDED ENTRIES
+            if self._blkbandmap is None:
+                self._band_pattern()
+            Kb = zeros((self._bandwidth + 1) * self.numdof + 1)
+
+        elif compute_stiff:
             K = zeros((self.numdof, self.numdof))
 
         if compute_mass:
-            M = zeros((self.numdof, self.numdof))
+            M = zeros(self.numdof)
 
         if compute_rhs:
             fext = zeros(self.numdof)
@@ -427,47 +1103,137 @@ class FiniteElementModel(object):
         xf = (1. - fac2) * predef[0] + fac2 * predef[1]
         predef_i = array([x0, xf-x0])
 
-        # COMPUTE THE ELEMENT STIFFNESS AND SCATTER TO GLOBAL ARRAY
+        if sparse:
+            A = Kv
+        elif matrix_free:
+            A = Ke
+        elif banded:
+            A = Kb
+        elif compute_stiff:
+            A = K
+        elif compute_mass:
+            A = M
+        else:
+            A = None
+
+        if not compute_rhs:
+            fext = fint = None
+
+        if (workers or 1) > 1 and (threads or 1) > 1:
+            raise UserInputError('WORKERS AND THREADS ARE MUTUALLY EXCLUSIVE')
+
+        # COMPUTE THE ELEMENT RESPONSES, ONE CHUNK OF ELEMENTS OF AN ELEMENT
+        # BLOCK AT A TIME, AND SCATTER THEM TO THE GLOBAL ARRAYS
+        args = (time, dtime, istep, iframe, procedure, nlgeom, cflag, step_type)
+        pool = None
+        if (threads or 1) > 1:
+            if self._blkcolors is None:
+                self._element_colors()
+            pool = self._thread_pool(threads)
+        elif (workers or 1) > 1:
+            pool = self._process_pool(workers)
+        else:
+            workers = 1
+
         for (ieb, eb) in enumerate(self.mesh.eleblx):
-            for (e, xel) in enumerate(eb.labels):
-
-                # ELEMENT STIFFNESS
-                iel = self.mesh.elemap[xel]
-                el = self.elements[iel]
-                eft = self.eftab[iel]
-                response = el.response(u[eft], du[eft], time, dtime, istep,
-                                       iframe, svars[:,svtab[iel]],
-                                       dltyp[iel], dload[iel],
-                                       predef_i[:,:,el.inodes], procedure, nlgeom,
-                                       cflag, step_type)
-
-                if cflag == STIFF_AND_RHS:
-                    K[IX(eft, eft)] += response[0]
-                    fext[eft] += response[1]
-                    fint[eft] += response[2]
-
-                elif cflag == MASS_AND_RHS:
-                    M[IX(eft, eft)] += response[0]
-                    fext[eft] += response[1]
-                    fint[eft] += response[2]
-
-                elif cflag == MASS_ONLY:
-                    M[IX(eft, eft)] += response
-
-                elif cflag == STIFF_ONLY:
-                    K[IX(eft, eft)] += response
-
-                elif cflag == RHS_ONLY:
-                    fext[eft] += response[0]
-                    fint[eft] += response[1]
+
+            ielems, eft = self._blkielx[ieb], self._blkeft[ieb]
+            if svx is None:
+                svx_b = self._svars_index(svtab, ielems)
+            else:
+                svx_b = svx[ieb]
+            predef_b = predef_i[:,:,eb.elecon]
+
+            if (self._geometry is not None and not nlgeom and
+                self._blkvec[ieb] and self._geometry[ieb] is None):
+                # FILL THE GEOMETRY CACHE OF THE BLOCK BEFORE ITS ELEMENTS
+                # ARE HANDED TO THREADS OR WORKERS
+                el = self.elements[ielems[0]]
+                c, B = el.block_geometry(self._blkxc[ieb])
+                dtype = self._geometry_dtype
+                self._geometry[ieb] = (asarray(c, dtype=dtype),
+                                       asarray(B, dtype=dtype))
+
+            # A SINGLE CHUNK WORKS ON A VIEW OF THE STATE VARIABLES, IF THE
+            # BLOCK'S ARE STORED CONTIGUOUSLY, AND UPDATES THEM IN PLACE
+            view = None
+            if pool is None:
+                view = self._svars_view(svars, svx_b)
+            gather = lambda ix: (u[eft[ix]], du[eft[ix]],
+                                 svars[:,svx_b[ix]] if view is None else view,
+                                 None if dltyp is None else dltyp[ielems[ix]],
+                                 None if dload is None else dload[ielems[ix]],
+                                 predef_b[:,:,ix])
+
+            if (threads or 1) > 1:
+                # ELEMENTS OF ONE COLOR SHARE NO DOF, SO THE THREADS WRITE IN
+                # TO THE GLOBAL ARRAYS WITHOUT LOCKS.  COLORS ARE ASSEMBLED
+                # ONE AFTER THE OTHER, GIVING A FIXED ORDER OF SUMMATION
+                for color in self._blkcolors[ieb]:
+                    futures = [pool.submit(self._color_response, ieb, ix,
+                                           gather(ix), args, svx_b, svars, A,
+                                           fext, fint, sparse, matrix_free,
+                                           banded)
+                               for ix in array_split(color, threads) if len(ix)]
+                    for future in futures:
+                        future.result()
+                continue
+
+            chunks = [ix for ix in array_split(arange(len(ielems)), workers)
+                      if len(ix)]
+            futures = []
+            for ix in chunks:
+                x = (ieb, ix) + gather(ix) + args
+                if pool is None:
+                    futures.append(self._block_response(*x))
+                else:
+                    futures.append(pool.submit(_block_response, *x))
+
+            for (ix, future) in zip(chunks, futures):
+                if pool is not None:
+                    future = future.result()
+                (Ae, xforce, eresid), sv1 = future
+                if view is None:
+                    svars[1,svx_b[ix]] = sv1
+                if xforce is not None:
+                    fext += bincount(eft[ix].ravel(), xforce.ravel(),
+                                     minlength=self.numdof)
+                    fint += bincount(eft[ix].ravel(), eresid.ravel(),
+                                     minlength=self.numdof)
+                if Ae is None:
+                    continue
+                if Ae.ndim == 2:
+                    # LUMPED MASS
+                    A += bincount(eft[ix].ravel(), Ae.ravel(),
+                                  minlength=self.numdof)
+                elif matrix_free:
+                    A[ieb][ix] = Ae
+                elif banded:
+                    A += bincount(self._blkbandmap[ieb][ix].ravel(),
+                                  Ae.ravel(), minlength=len(A))
+                elif sparse:
+                    # CHUNKS ARE CONSECUTIVE ELEMENTS, A SLICE OF THE SCATTER
+                    # MAP IS A VIEW, AND THE ENTRIES ARE ADDED TO THE DATA
+                    # ARRAY IN PLACE
+                    nzmap = self._blknzmap[ieb][ix[0]:ix[-1]+1]
+                    add.at(A, nzmap, Ae.reshape(len(ix), -1))
+                else:
+                    add.at(A, (eft[ix,:,newaxis], eft[ix,newaxis,:]), Ae)
+
+        if sparse:
+            K = scisparse.csr_matrix((Kv, self._nzindices, self._nzindptr),
+                                     shape=(self.numdof, self.numdof),
+                                     copy=False)
+
+        elif matrix_free:
+            K = ElementOperator(self.numdof, self._blkeft, Ke)
+
+        elif banded:
+            K = SymmetricBandMatrix(Kb[:-1].reshape(-1, self.numdof))
 
         if compute_rhs:
             fext += Q
 
-        if compute_mass:
-            # LUMPED MASS MATRIX
-            M = array([sum(row) for row in M])
-
         if cflag == STIFF_AND_RHS:
             if disp:
                 return K, fext, fint
@@ -489,6 +1255,85 @@ class FiniteElementModel(object):
                 return M, fext, fint
             return M, fext - fint
 
+    def internal_force(self, u, du, svtab, svars, predef, procedure,
+                       time=array([0.,0.]), dtime=1., period=1., istep=1,
+                       iframe=1, nlgeom=False, ninc=None, workers=None,
+                       threads=None, svx=None):
+        """Assemble the global internal force
+
+        The element responses are evaluated with ``cflag=RHS_ONLY`` and no
+        distributed loads, so that neither stiffness nor mass is computed.
+        This is the only element work done per increment by explicit
+        dynamics.  Arguments are as for ``assemble``.
+
+        Returns
+        -------
+        fint : ndarray
+            The (N,) global internal force
+
+        """
+        fext, fint = self.assemble(u, du, zeros(self.numdof), svtab, svars,
+                                   None, None, predef, procedure, GENERAL,
+                                   time=time, dtime=dtime, period=period,
+                                   istep=istep, iframe=iframe, nlgeom=nlgeom,
+                                   ninc=ninc, cflag=RHS_ONLY, disp=1,
+                                   workers=workers, threads=threads, svx=svx)
+        return fint
+
+    def stable_time_increment(self, u=None):
+        """Estimate the critical time increment of explicit dynamics
+
+        Parameters
+        ----------
+        u : ndarray, optional {None}
+            Nodal DOFs.  If given, the estimate is for the deformed mesh.
+
+        Returns
+        -------
+        dtime : float
+            The minimum over all elements of :math:`L_e/c`
+
+        Notes
+        -----
+        :math:`c` is the dilatational wave speed of the element's material.
+        The characteristic length :math:`L_e` of isoparametric elements is
+        the element area (volume) divided by (the square of) the largest
+        distance between two of its nodes, which is :math:`h/\\sqrt{2}` for a
+        square of side :math:`h`.  For other elements it is the smallest
+        distance between two nodes.
+
+        """
+        if self._wave_speed is None:
+            self._wave_speed = []
+            for ielems in self._blkielx:
+                material = self.elements[ielems[0]].material
+                self._wave_speed.append(full(len(ielems),
+                                             material.wave_speed()))
+
+        dtime = inf
+        for (ieb, ielems) in enumerate(self._blkielx):
+            el = self.elements[ielems[0]]
+            xc, eft = self._blkxc[ieb], self._blkeft[ieb]
+            nel, nnode, ndim = xc.shape
+            if u is not None and eft.shape[1] == nnode * ndim:
+                xc = xc + u[eft].reshape(nel, nnode, ndim)
+
+            # DISTANCES BETWEEN THE NODES OF EACH ELEMENT
+            d = xc[:,:,newaxis,:] - xc[:,newaxis,:,:]
+            d = sqrt(einsum('eabi,eabi->eab', d, d))
+
+            if getattr(el, 'gaussw', None) is not None:
+                dNdxi = array([el.shapegrad(xi) for xi in el.gaussp])
+                J = la.det(einsum('pia,eaj->epij', dNdxi, xc))
+                Le = abs(dot(J, el.gaussw)) / d.max(axis=(1,2)) ** (ndim - 1)
+            else:
+                d[:,arange(nnode),arange(nnode)] = inf
+                Le = d.min(axis=(1,2))
+
+            dtime = min(dtime, (Le / self._wave_speed[ieb]).min())
+
+        return dtime
+
     def apply_bc(self, K, F, doftags, dofvals, u=None, du=None):
         """
         .. _apply_bc:
@@ -498,7 +1343,7 @@ class FiniteElementModel(object):
 
         Parameters
         ----------
-        K : ndarray
+        K : ndarray or scipy sparse matrix
             Global stiffness
         F : ndarray
             Global force
@@ -506,33 +1351,216 @@ class FiniteElementModel(object):
         Returns
         -------
         Kbc, Fbc : ndarray
-            Boundary condition modified stiffness and force
+            Boundary condition modified stiffness and force.  If ``K`` is
+            sparse, ``Kbc`` is a sparse matrix in CSR format.
 
         Notes
         -----
         Boundary conditions are applied in such a way that ``K`` remains
         symmetric by transferring columns associated with known degrees of
-        freedom to ``F``. This method is intended to be called in the
-        application code's ``Solve`` method.
+        freedom to ``F``.
+
+        The solvers do not form ``Kbc``, but factor the stiffness of the free
+        DOFs only, see ``bc_solver``.
+
+        """
+        Fbc = self.bc_force(K, F, doftags, dofvals, u, du)
+        mask = ones(self.numdof)
+        mask[doftags] = 0.
+
+        if issparse(K):
+            # ZERO THE ROWS AND COLUMNS OF THE KNOWN DOFS WITH A DIAGONAL
+            # MASK SO THAT THE SPARSE STRUCTURE IS NEVER DENSIFIED
+            P = scisparse.diags(mask)
+            Kbc = P.dot(K).dot(P) + scisparse.diags(1. - mask)
+            return Kbc.tocsr(), Fbc
+
+        Kbc = K * mask[:,newaxis] * mask
+        Kbc[doftags,doftags] = 1.
+        return Kbc, Fbc
+
+    def free_dofs(self, doftags):
+        """The DOFs not in ``doftags``"""
+        mask = ones(self.numdof, dtype=bool)
+        mask[doftags] = False
+        return where(mask)[0]
+
+    def bc_solver(self, K, doftags, solver_options=None):
+        """Factor the global stiffness for the constrained DOFs ``doftags``
+
+        Parameters
+        ----------
+        K : ndarray or scipy sparse matrix
+            Global stiffness
+        doftags : ndarray
+            The constrained DOFs
+        solver_options : dict, optional
+            Method and options of the linear solver, see
+            ``pyfem2.linear_solvers.linear_solver`` [default: direct]
+
+        Returns
+        -------
+        solve : callable
+            ``solve(Fbc)`` returns the solution of the boundary condition
+            modified system, where ``Fbc`` is given by ``bc_force``.  ``Fbc``
+            may have several columns.  The solver of the free DOFs is
+            ``solve.solver``.
+
+        Notes
+        -----
+        The DOFs are partitioned in to free (f) and prescribed (p) sets.
+        Only :math:`K_{ff}` is extracted and factored.  ``bc_force`` has
+        already moved :math:`K_{fp} u_p` to the force and stored the
+        prescribed values :math:`u_p` at the prescribed DOFs, so that
+
+        .. math::
+
+           u_f = K_{ff}^{-1} F_f, \\quad u_p = F_p
+
+        A band stiffness is not partitioned.  Its prescribed rows and
+        columns are replaced by those of the identity instead, which gives
+        the same solution without leaving band storage.
+
+        """
+        free = self.free_dofs(doftags)
+        if issparse(K):
+            K = K.tocsr()
+            Kff = K[free][:,free]
+        elif isinstance(K, ElementOperator):
+            Kff = K.restrict(free)
+        elif isinstance(K, SymmetricBandMatrix):
+            # DECOUPLE THE PRESCRIBED DOFS IN PLACE, WHICH KEEPS THE BAND
+            free = arange(self.numdof)
+            Kff = K.constrain(doftags)
+        else:
+            Kff = K[ix_(free, free)]
+        options = dict(solver_options or {})
+        if ((self.renumber or '').lower() == 'mindegree' and issparse(K) and
+            options.get('method', 'direct') == 'direct'):
+            # THE DOFS ARE ALREADY IN A FILL REDUCING ORDER
+            options.setdefault('ordering', 'NATURAL')
+        if options.get('preconditioner') == 'amg':
+            # AGGREGATE THE DOFS OF A NODE, COARSEN THE RIGID BODY MODES
+            nodes, modes = self.rigid_body_modes()
+            options.setdefault('nodes', nodes[free])
+            options.setdefault('nullspace', modes[free])
+        solve_ff = linear_solver(Kff, **options)
+        def solve(Fbc):
+            x = array(Fbc, dtype=float)
+            x[free] = solve_ff(x[free])
+            return x
+        solve.solver = solve_ff
+        return solve
+
+    def rigid_body_modes(self):
+        """The node of each DOF and the rigid body modes of the model
+
+        Returns
+        -------
+        nodes : ndarray of int
+            The node of each DOF
+        modes : ndarray
+            The rigid body modes, one per column.  A constant mode is given
+            for each DOF label and a rotation about each coordinate axis for
+            the displacements (and rotations) of the nodes.
+
+        """
+        nodes, labels = self._dof_labels()
+        cols = []
+        for label in unique(labels):
+            cols.append((labels == label).astype(float))
+        x = self.mesh.coord[nodes]
+        if self.dimensions == 2:
+            axes = [(Z, X, Y)]
+        else:
+            axes = [(X, Y, Z), (Y, Z, X), (Z, X, Y)]
+        for (n, i, j) in axes:
+            # ROTATION ABOUT AXIS n: u_i = -x_j, u_j = x_i, theta_n = 1
+            mode = zeros(len(labels))
+            if j >= self.dimensions or i >= self.dimensions:
+                continue
+            mode[labels == i] = -x[labels == i, j]
+            mode[labels == j] = x[labels == j, i]
+            mode[labels == TX+n] = 1.
+            if any(mode):
+                cols.append(mode)
+        return nodes, array(cols).T
+
+    def bc_force(self, K, F, doftags, dofvals, u=None, du=None):
+        """Apply boundary conditions to the global force ``F`` only.
+
+        Returns the ``Fbc`` of ``apply_bc``, for use with a boundary
+        condition modified stiffness that is already known.
 
         """
         if  u is None:  u = zeros(self.numdof)
         if du is None: du = zeros(self.numdof)
-
-        # COPY THE GLOBAL ARRAYS
-        Kbc, Fbc = K.copy(), F.copy()
-
-        # DIRICHLET BOUNDARY CONDITIONS
-        ubc = []
-        for (i, I) in enumerate(doftags):
-            u_cur = u[I] + du[I]
-            ufac = dofvals[i] - u_cur
-            ubc.append(ufac)
-            Fbc -= [K[k,I] * ufac for k in range(self.numdof)]
-            Kbc[I,:] = Kbc[:,I] = 0.
-            Kbc[I,I] = 1.
+        ubc = dofvals - u[doftags] - du[doftags]
+        if issparse(K) or isinstance(K, ndarray):
+            Fbc = F - K[:,doftags].dot(ubc)
+        else:
+            x = zeros(self.numdof)
+            x[doftags] = ubc
+            Fbc = F - K.dot(x)
         Fbc[doftags] = ubc
-        return Kbc, Fbc
+        return Fbc
+
+    def is_linear(self, nlgeom=False):
+        """Whether the global stiffness is independent of the DOFs, that is,
+        the geometry is linear and every element and its material is
+        linear"""
+        if nlgeom:
+            return False
+        self._check_revision()
+        if self._linear is None:
+            self._linear = all([data.eletyp.linear and
+                                data.material is not None and
+                                data.material.linear
+                                for data in self.elements.blocks])
+        return self._linear
+
+    def _check_revision(self):
+        """Discard the linearity and factored stiffnesses cached for earlier
+        materials and element properties.  The model revision is incremented
+        by ``setup``, ``Material`` and ``AssignProperties``, and each
+        material's by the assignment of its properties."""
+        revision = (self._revision,) + tuple(m.revision for m in
+                                             self.materials.values())
+        if revision != self._cached_revision:
+            self._cached_revision = revision
+            self._linear = None
+            self._factored.clear()
+        return revision
+
+    def factored_stiffness(self, doftags, sparse=False, solver_options=None,
+                           banded=False, matrix_free=False):
+        """The cached global stiffness and solver of the boundary condition
+        modified stiffness for the constrained DOFs ``doftags``, or None.
+        See ``cache_factored_stiffness``."""
+        return self._factored.get(self._factored_key(
+            doftags, sparse, solver_options, banded, matrix_free))
+
+    def cache_factored_stiffness(self, doftags, sparse, K, solve,
+                                 solver_options=None, banded=False,
+                                 matrix_free=False):
+        """Cache the global stiffness ``K`` and the ``solve`` function of
+        its boundary condition modified factorization (see ``bc_solver``)
+        for the constrained DOFs ``doftags``.  Only the stiffness of a linear
+        model (see ``is_linear``) may be cached, since it is reused for every
+        later frame and step with the same constrained DOFs and solver."""
+        if issparse(K):
+            # THE DATA OF THE ASSEMBLED SPARSE STIFFNESS IS REUSED BY assemble
+            K = K.copy()
+        key = self._factored_key(doftags, sparse, solver_options, banded,
+                                 matrix_free)
+        self._factored[key] = (K, solve)
+
+    def _factored_key(self, doftags, sparse, solver_options, banded,
+                      matrix_free):
+        revision = self._check_revision()
+        options = sorted((solver_options or {}).items())
+        return (revision, tuple(doftags), bool(sparse), bool(banded),
+                bool(matrix_free), repr(options))
 
     # ----------------------------------------------------------------------- #
     # --- MATERIAL MODELS --------------------------------------------------- #
@@ -558,6 +1586,7 @@ class FiniteElementModel(object):
         if name in self.materials:
             raise UserInputError('DUPLICATE MATERIAL {0!r}'.format(name))
         self.materials[name] = Material(name, **kwargs)
+        self._revision += 1
         return self.materials[name]
 
     def PrescribedBC(self, nodes, dof):
@@ -662,6 +1691,24 @@ class FiniteElementModel(object):
         step = self.steps.StaticStep(name, period, **kwds)
         return step
 
+    def LoadCaseStep(self, name=None, period=1., **kwds):
+
+        if self.steps is None:
+            self.setup()
+            self.initialize_steps()
+
+        # VALIDATE INPUT
+        self._validate_step1(nlgeom=kwds.get('nlgeom',False))
+
+        if name is None:
+            name = self.unique_step_name()
+
+        if name in self.steps:
+            raise UserInputError('Duplicate step name {0!r}'.format(name))
+
+        step = self.steps.LoadCaseStep(name, period, **kwds)
+        return step
+
     def DynamicStep(self, name=None, period=1., **kwds):
 
         if period is None:
@@ -683,7 +1730,7 @@ class FiniteElementModel(object):
         step = self.steps.DynamicStep(name, period, **kwds)
         return step
 
-    def HeatTransferStep(self, name=None, period=1.):
+    def HeatTransferStep(self, name=None, period=1., **kwds):
         if self.steps is None:
             self.setup()
             self.initialize_steps()
@@ -697,7 +1744,7 @@ class FiniteElementModel(object):
         if name in self.steps:
             raise UserInputError('Duplicate step name {0!r}'.format(name))
 
-        step = self.steps.HeatTransferStep(name, period=period)
+        step = self.steps.HeatTransferStep(name, period=period, **kwds)
         return step
 
     # ----------------------------------------------------------------------- #
@@ -765,23 +1812,14 @@ class FiniteElementModel(object):
         if eletyp.nodes != blk.elecon.shape[1]:
             raise UserInputError('NODE TYPE NOT CONSISTENT WITH ELEMENT BLOCK')
 
-        if elefab:
-            # ELEMENT FABRICATION PROPERTIES GIVEN, MAKE SURE THERE IS ONE
-            # PROPERTY PER ELEMENT
-            for (key, val) in elefab.items():
-                if not is_listlike(val) or len(val) != len(blk.labels):
-                    elefab[key] = [val] * len(blk.labels)
-                else:
-                    elefab[key] = val
-
-        for (i, xel) in enumerate(blk.labels):
-            iel = self.mesh.elemap[xel]
-            elenod = blk.elecon[i]
-            elecoord = self.mesh.coord[elenod]
-            kwds = {}
-            for (key, val) in elefab.items():
-                kwds[key] = val[i]
-            self.elements[iel] = eletyp(xel, elenod, elecoord, elemat, **kwds)
+        # THE ELEMENTS OF THE BLOCK ARE STORED AS ARRAYS, SELF.ELEMENTS[IEL]
+        # IS A VIEW OF ONE OF THEM.  THE NODAL COORDINATES ARE GATHERED AT
+        # ONCE AND FABRICATION PROPERTIES ARE KEPT AS ARRAYS, SCALARS BEING
+        # BROADCAST TO ALL ELEMENTS
+        data = ElementBlockData(eletyp, blk.labels, blk.elecon,
+                                self.mesh.coord[blk.elecon], elemat, **elefab)
+        self.elements.assign(self._block_ielems(blk), data)
+        self._revision += 1
 
     def NodeSet(self, name, region):
         """Create a node set
@@ -886,7 +1924,7 @@ class FiniteElementModel(object):
             raise UserInputError('Plot2D IS ONLY APPLICABLE TO 2D PROBLEMS')
         xy = array(self.mesh.coord)
         if deformed:
-            xy += scale * self.steps.last.dofs.reshape(xy.shape)
+            xy += scale * self.format_dof(self.steps.last.dofs)[0]
         elecon = []
         for blk in self.mesh.eleblx:
             if (blk.eletyp.dimensions, blk.eletyp.nodes) == (2,8):
@@ -0,0 +1,502 @@
+"""Solvers of the boundary condition modified global system
+
+Linear solvers are registered by name with ``register_solver`` and selected
+with the ``solver_options`` of a step, eg::
+
+    step = V.StaticStep(solver_options={'method': 'cg',
+                                        'preconditioner': 'amg',
+                                        'tol': 1e-10})
+
+A solver is a factory ``factory(A, **options)`` returning a callable
+``solve(b)`` that returns the solution x of A x = b.  ``b`` may have several
+columns.  Preconditioners of the conjugate gradient solver are registered
+with ``register_preconditioner`` and are factories ``factory(A, **options)``
+returning a callable ``M(r)`` that applies the inverse of the
+preconditioner to the residual ``r``.
+
+"""
+import logging
+from numpy import *
+
+from .utilities import *
+from numpy.linalg import norm
+
+__all__ = ['SOLVERS', 'PRECONDITIONERS', 'register_solver',
+           'register_preconditioner', 'linear_solver', 'ConjugateGradient',
+           'SmoothedAggregation', 'ElementOperator', 'jacobi',
+           'incomplete_cholesky']
+
+SOLVERS = {}
+PRECONDITIONERS = {}
+
+def register_solver(name, factory):
+    """Register the linear solver ``factory`` as ``name``"""
+    SOLVERS[name.lower()] = factory
+
+def register_preconditioner(name, factory):
+    """Register the preconditioner ``factory`` as ``name``"""
+    PRECONDITIONERS[name.lower()] = factory
+
+def linear_solver(A, method='direct', **options):
+    """Prepare the solution of A x = b
+
+    Parameters
+    ----------
+    A : ndarray or sparse matrix
+        Real, symmetric matrix (the boundary condition modified stiffness)
+    method : str, optional
+        Name of a registered solver [default: 'direct']
+    options : dict
+        Options of the solver
+
+    Returns
+    -------
+    solve : callable
+        ``solve(b)`` returns the solution x of A x = b
+
+    """
+    try:
+        factory = SOLVERS[method.lower()]
+    except KeyError:
+        raise UserInputError('UNKNOWN LINEAR SOLVER {0!r}'.format(method))
+    return factory(A, **options)
+
+def direct(A, ordering=None, **options):
+    """Direct solution by factorization, see ``factorize``"""
+    if not isinstance(A, SymmetricBandMatrix):
+        _require_matrix(A, 'DIRECT SOLUTION')
+    return factorize(A, ordering)
+
+def _require_matrix(A, what):
+    if not (issparse(A) or isinstance(A, ndarray)):
+        raise UserInputError('{0} REQUIRES A DENSE OR SPARSE STIFFNESS, USE '
+                             'AN ITERATIVE SOLVER AND JACOBI '
+                             'PRECONDITIONER'.format(what))
+
+class ElementOperator(object):
+    """Global matrix stored as its unassembled element matrices
+
+    Parameters
+    ----------
+    n : int
+        Size of the global matrix
+    efts : list of ndarray
+        The (nel, m) element freedom table of each element block
+    Aes : list of ndarray
+        The (nel, m, m) element matrices of each element block
+    free : ndarray of int, optional
+        Restrict the operator to the rows and columns ``free``
+
+    Notes
+    -----
+    The product A x is computed element by element: the element DOFs are
+    gathered from x, multiplied by the element matrices, and scattered back
+    with ``bincount``.  The global matrix is never formed, so that memory is
+    proportional to the number of elements only.
+
+    """
+    def __init__(self, n, efts, Aes, free=None):
+        self.n = n
+        self.efts = efts
+        self.Aes = Aes
+        self.free = free
+        m = n if free is None else len(free)
+        self.shape = (m, m)
+
+    def restrict(self, free):
+        """The operator of the rows and columns ``free``"""
+        return ElementOperator(self.n, self.efts, self.Aes, free)
+
+    def dot(self, x):
+        x = asarray(x, dtype=float)
+        if x.ndim == 2:
+            y = empty((self.shape[0], x.shape[1]))
+            for i in range(x.shape[1]):
+                y[:,i] = self.dot(x[:,i])
+            return y
+        if self.free is not None:
+            x, xf = zeros(self.n), x
+            x[self.free] = xf
+        y = zeros(self.n)
+        for (eft, Ae) in zip(self.efts, self.Aes):
+            ye = matmul(Ae, x[eft][:,:,newaxis])
+            y += bincount(eft.ravel(), ye.ravel(), minlength=self.n)
+        if self.free is not None:
+            return y[self.free]
+        return y
+
+    def diagonal(self):
+        d = zeros(self.n)
+        for (eft, Ae) in zip(self.efts, self.Aes):
+            d += bincount(eft.ravel(), diagonal(Ae, axis1=1, axis2=2).ravel(),
+                          minlength=self.n)
+        if self.free is not None:
+            return d[self.free]
+        return d
+
+    def toarray(self):
+        """The assembled matrix"""
+        A = zeros((self.n, self.n))
+        for (eft, Ae) in zip(self.efts, self.Aes):
+            add.at(A, (eft[:,:,newaxis], eft[:,newaxis,:]), Ae)
+        if self.free is not None:
+            return A[ix_(self.free, self.free)]
+        return A
+
+class ConjugateGradient(object):
+    """Preconditioned conjugate gradient solver
+
+    Parameters
+    ----------
+    A : ndarray or sparse matrix
+        Real, symmetric, positive definite matrix
+    preconditioner : str, optional
+        Name of a registered preconditioner, one of 'jacobi', 'ic0', 'amg',
+        or None [default: 'jacobi']
+    tol : float, optional
+        Tolerance of the residual, relative to the norm of the right hand
+        side [default: 1e-8]
+    maxiter : int, optional
+        Maximum number of iterations [default: 10 times the size of A]
+    options : dict
+        Options of the preconditioner
+
+    Notes
+    -----
+    The number of iterations of every solution is appended to
+    ``iterations`` and logged.
+
+    """
+    def __init__(self, A, preconditioner='jacobi', tol=1e-8, maxiter=None,
+                 **options):
+        if issparse(A):
+            A = A.tocsr()
+        elif isinstance(A, ndarray) and scisparse is not None:
+            A = scisparse.csr_matrix(A)
+        self.A = A
+        self.tol = tol
+        self.maxiter = maxiter or 10 * A.shape[0]
+        self.iterations = []
+        if preconditioner is None:
+            preconditioner = 'none'
+        try:
+            factory = PRECONDITIONERS[preconditioner.lower()]
+        except KeyError:
+            raise UserInputError('UNKNOWN PRECONDITIONER '
+                                 '{0!r}'.format(preconditioner))
+        self.M = factory(A, **options)
+
+    def __call__(self, b):
+        b = asarray(b, dtype=float)
+        if b.ndim == 1:
+            return self.solve(b)
+        x = zeros_like(b)
+        for i in range(b.shape[1]):
+            x[:,i] = self.solve(b[:,i])
+        return x
+
+    def solve(self, b):
+        x = zeros_like(b)
+        bnorm = norm(b)
+        if bnorm == 0.:
+            self.iterations.append(0)
+            return x
+        r = b.copy()
+        z = self.M(r)
+        p = z.copy()
+        rz = dot(r, z)
+        for it in range(1, self.maxiter+1):
+            Ap = self.A.dot(p)
+            alpha = rz / dot(p, Ap)
+            x += alpha * p
+            r -= alpha * Ap
+            res = norm(r) / bnorm
+            if res <= self.tol:
+                break
+            z = self.M(r)
+            rz, rz0 = dot(r, z), rz
+            p *= rz / rz0
+            p += z
+        else:
+            logging.warn('CG DID NOT CONVERGE IN {0} ITERATIONS, RELATIVE '
+                         'RESIDUAL {1:.2e}'.format(it, res))
+        logging.info('CG: {0} ITERATIONS, RELATIVE RESIDUAL '
+                     '{1:.2e}'.format(it, res))
+        self.iterations.append(it)
+        return x
+
+# --------------------------------------------------------------------------- #
+# ----------------------------- PRECONDITIONERS ----------------------------- #
+# --------------------------------------------------------------------------- #
+def identity(A, **options):
+    """No preconditioning"""
+    return lambda r: r
+
+def jacobi(A, **options):
+    """Jacobi (diagonal) preconditioner"""
+    d = A.diagonal()
+    if any(d <= 0.):
+        raise RuntimeError('JACOBI PRECONDITIONER REQUIRES POSITIVE DIAGONAL')
+    dinv = 1. / d
+    return lambda r: dinv * r
+
+def incomplete_cholesky(A, shift=0., max_size=20000, **options):
+    """Incomplete Cholesky preconditioner with no fill, IC(0)
+
+    Parameters
+    ----------
+    A : sparse matrix
+        Real, symmetric, positive definite matrix
+    shift : float, optional
+        The diagonal of A is scaled by 1 + shift before factoring.  If the
+        factorization breaks down, the shift is increased until it succeeds.
+    max_size : int, optional
+        Size of the largest A factored [default: 20000]
+
+    Notes
+    -----
+    L L^T approximates A, where L has the sparsity of the lower triangle of
+    A.  The triangular solves are done by SuperLU, which does not fill in
+    the already triangular factor.
+
+    The factorization is sequential, row by row, and is done by a Python
+    loop over the nonzeros of L: about a second for 20000 DOFs of a plane
+    mesh, and more per DOF in three dimensions.  It is meant for small
+    systems, larger ones are rejected unless ``max_size`` is raised.  Use
+    the 'amg' preconditioner, whose setup is vectorized, for large systems.
+
+    """
+    _require_matrix(A, 'IC(0) PRECONDITIONER')
+    if A.shape[0] > max_size:
+        raise UserInputError('IC(0) PRECONDITIONER IS LIMITED TO {0} DOFS, '
+                             'USE THE AMG PRECONDITIONER OR RAISE '
+                             'MAX_SIZE'.format(max_size))
+    A = scisparse.csr_matrix(A)
+    L = scisparse.tril(A, format='csr')
+    L.sum_duplicates()
+    L.sort_indices()
+    d = A.diagonal()
+    if any(d <= 0.):
+        raise RuntimeError('IC(0) PRECONDITIONER REQUIRES POSITIVE DIAGONAL')
+    diagonal = L.indptr[1:] - 1
+    while 1:
+        data = L.data.copy()
+        data[diagonal] *= 1. + shift
+        if _ic0(L.indptr, L.indices, data):
+            break
+        shift = max(2. * shift, 1e-3)
+        logging.debug('IC(0) BREAKDOWN, SHIFTING DIAGONAL BY {0}'.format(shift))
+    L = scisparse.csc_matrix((data, L.indices, L.indptr), shape=A.shape)
+    # THE CSR FACTOR READ AS CSC IS ITS TRANSPOSE
+    lu = spla.splu(L, permc_spec='NATURAL', diag_pivot_thresh=0.,
+                   options=dict(SymmetricMode=True))
+    return lambda r: lu.solve(lu.solve(r, trans='T'))
+
+def _ic0(indptr, indices, data):
+    """Factor the lower triangle (CSR, sorted, diagonal last) in place"""
+    w = zeros(len(indptr)-1)
+    for i in range(len(indptr)-1):
+        start, end = indptr[i], indptr[i+1] - 1
+        cols = indices[start:end]
+        w[cols] = data[start:end]
+        for k in range(start, end):
+            j = indices[k]
+            js, je = indptr[j], indptr[j+1] - 1
+            data[k] = (data[k] - dot(w[indices[js:je]], data[js:je])) / data[je]
+            w[j] = data[k]
+        dii = data[end] - dot(data[start:end], data[start:end])
+        w[cols] = 0.
+        if dii <= 0.:
+            return False
+        data[end] = sqrt(dii)
+    return True
+
+class SmoothedAggregation(object):
+    """Smoothed aggregation algebraic multigrid preconditioner
+
+    One V-cycle with damped Jacobi smoothing is applied per iteration.
+
+    Parameters
+    ----------
+    A : sparse matrix
+        Real, symmetric, positive definite matrix
+    nodes : ndarray of int, optional
+        The node of each row of A.  The DOFs of a node are aggregated
+        together [default: each DOF is its own node]
+    nullspace : ndarray, optional
+        Near null space of A, one mode per column, eg the rigid body modes
+        of the model [default: a constant vector]
+    theta : float, optional
+        Strength of connection threshold [default: .08]
+    max_coarse : int, optional
+        Size below which the coarsest level is solved directly [default: 300]
+    max_levels : int, optional
+        Maximum number of levels [default: 10]
+    sweeps : int, optional
+        Number of pre- and post-smoothing sweeps [default: 1]
+
+    """
+    def __init__(self, A, nodes=None, nullspace=None, theta=.08,
+                 max_coarse=300, max_levels=10, sweeps=1, **options):
+        _require_matrix(A, 'AMG PRECONDITIONER')
+        A = scisparse.csr_matrix(A)
+        n = A.shape[0]
+        nodes = arange(n) if nodes is None else unique(nodes, return_inverse=1)[1]
+        B = ones((n, 1)) if nullspace is None else asarray(nullspace, dtype=float)
+        if B.ndim == 1:
+            B = B[:,newaxis]
+        self.sweeps = sweeps
+        self.levels = []
+        while A.shape[0] > max_coarse and len(self.levels) < max_levels - 1:
+            agg = self.aggregate(A, nodes, theta)
+            T, B, nodes = self.tentative_prolongator(agg[nodes], B)
+            if T.shape[1] >= A.shape[0]:
+                break
+            dinv = 1. / A.diagonal()
+            omega = 4. / 3. / self.spectral_radius(A, dinv)
+            # SMOOTHED PROLONGATOR P = (I - OMEGA D^-1 A) T
+            DA = scisparse.diags(omega * dinv).dot(A)
+            P = (T - DA.dot(T)).tocsr()
+            self.levels.append((A, P, P.T.tocsr(), omega * dinv))
+            A = P.T.dot(A.dot(P)).tocsr()
+        if A.shape[0] <= max_coarse:
+            A = A.toarray()
+        self.coarse_solve = factorize(A)
+        logging.debug('AMG: {0} LEVELS, COARSE SIZE {1}'.format(
+            len(self.levels)+1, A.shape[0]))
+
+    def __call__(self, b):
+        return self.cycle(0, b)
+
+    def cycle(self, level, b):
+        if level == len(self.levels):
+            return self.coarse_solve(b)
+        A, P, R, wdinv = self.levels[level]
+        x = wdinv * b
+        for i in range(self.sweeps-1):
+            x += wdinv * (b - A.dot(x))
+        x += P.dot(self.cycle(level+1, R.dot(b - A.dot(x))))
+        for i in range(self.sweeps):
+            x += wdinv * (b - A.dot(x))
+        return x
+
+    @staticmethod
+    def spectral_radius(A, dinv, iterations=20):
+        """Estimate the spectral radius of D^-1 A by power iteration"""
+        x = random.RandomState(0).rand(A.shape[0])
+        rho = 1.
+        for i in range(iterations):
+            y = dinv * A.dot(x)
+            rho = norm(y) / norm(x)
+            x = y / norm(y)
+        return rho
+
+    @staticmethod
+    def aggregate(A, nodes, theta):
+        """Aggregate the strongly connected nodes of A
+
+        Returns
+        -------
+        agg : ndarray of int
+            The aggregate of each node
+
+        """
+        # NODAL STRENGTH: FROBENIUS NORM OF THE NODE TO NODE BLOCKS OF A
+        n, nn = A.shape[0], nodes.max() + 1
+        N = scisparse.csr_matrix((ones(n), (nodes, arange(n))), shape=(nn, n))
+        S = N.dot(abs(A).power(2)).dot(N.T).tocoo()
+        S.data = sqrt(S.data)
+        d = S.diagonal()
+        strong = ((S.row != S.col) &
+                  (S.data >= theta * sqrt(d[S.row] * d[S.col])))
+        G = scisparse.csr_matrix((ones(count_nonzero(strong)),
+                                  (S.row[strong], S.col[strong])),
+                                 shape=(nn, nn))
+
+        # PASS 1: THE ROOTS ARE A MAXIMAL INDEPENDENT SET OF THE DISTANCE 2
+        # STRONG GRAPH, SO THAT THEIR NEIGHBORHOODS ARE DISJOINT.  EACH ROOT
+        # AND ITS NEIGHBORS ARE AN AGGREGATE
+        roots = SmoothedAggregation.independent_set(G)
+        na = len(roots)
+        agg = -ones(nn, dtype=int)
+        agg[roots] = arange(na)
+        G = G.tocoo()
+        ix = agg[G.col] >= 0
+        agg[G.row[ix]] = agg[G.col[ix]]
+
+        # PASS 2: ADD REMAINING NODES TO A NEIGHBORING AGGREGATE.  EVERY NODE
+        # IS WITHIN DISTANCE 2 OF A ROOT, SO NONE IS LEFT
+        agg1 = agg.copy()
+        ix = (agg1[G.row] < 0) & (agg1[G.col] >= 0)
+        agg[G.row[ix]] = agg1[G.col[ix]]
+
+        return agg
+
+    @staticmethod
+    def independent_set(G):
+        """Maximal independent set of the distance 2 graph of the symmetric
+        graph ``G``
+
+        The set is built in rounds.  An undecided node whose (random) rank
+        is the largest within distance 2 joins the set, and undecided nodes
+        within distance 2 of a member leave it.  A round is two maxima over
+        the neighbors of every node.
+
+        """
+        n = G.shape[0]
+        # WITH THE DIAGONAL NO ROW IS EMPTY, AS REQUIRED BY REDUCEAT
+        G = (G + scisparse.identity(n, format='csr')).tocsr()
+        indptr, indices = G.indptr, G.indices
+        nbrmax = lambda x: maximum.reduceat(x[indices], indptr[:-1])
+        # KEY: 0 LEFT THE SET, 1 TO N UNDECIDED (RANK), N+1 MEMBER
+        key = random.RandomState(0).permutation(n) + 1
+        undecided = ones(n, dtype=bool)
+        while any(undecided):
+            m = nbrmax(nbrmax(key))
+            member = undecided & (m == key)
+            key[undecided & (m > n)] = 0
+            key[member] = n + 1
+            undecided &= (key > 0) & (key <= n)
+        return where(key > n)[0]
+
+    @staticmethod
+    def tentative_prolongator(agg, B):
+        """Tentative prolongator of the DOF aggregates ``agg``, the coarse
+        near null space, and the aggregate (coarse node) of each coarse
+        DOF
+
+        The near null space of each aggregate is factored B = Q R by
+        modified Gram-Schmidt, all aggregates at once: the inner products
+        over the DOFs of each aggregate are sums by ``bincount``.  Modes
+        dependent on the previous modes of an aggregate are dropped.
+
+        """
+        n, k = B.shape
+        na = agg.max() + 1
+        scale = sqrt(bincount(agg, (B ** 2).sum(axis=1), minlength=na))
+        Q = zeros((n, k))
+        R = zeros((na, k, k))
+        keep = zeros((na, k), dtype=bool)
+        for j in range(k):
+            v = B[:,j].copy()
+            for i in range(j):
+                R[:,i,j] = bincount(agg, Q[:,i] * v, minlength=na)
+                v -= R[agg,i,j] * Q[:,i]
+            R[:,j,j] = sqrt(bincount(agg, v * v, minlength=na))
+            keep[:,j] = R[:,j,j] > 1e-10 * maximum(scale, 1e-300)
+            rjj = where(keep[:,j], R[:,j,j], 1.)
+            Q[:,j] = where(keep[agg,j], v / rjj[agg], 0.)
+        # THE COARSE DOFS ARE THE KEPT MODES, NUMBERED BY AGGREGATE
+        coarse = cumsum(keep.ravel()).reshape(na, k) - 1
+        rows, cols = nonzero(keep[agg])
+        T = scisparse.csr_matrix((Q[rows, cols],
+                                  (rows, coarse[agg[rows], cols])),
+                                 shape=(n, count_nonzero(keep)))
+        return T, R[keep], nonzero(keep)[0]
+
+register_solver('direct', direct)
+register_solver('cg', ConjugateGradient)
+register_preconditioner('none', identity)
+register_preconditioner('jacobi', jacobi)
+register_preconditioner('ic0', incomplete_cholesky)
+register_preconditioner('amg', SmoothedAggregation)
@@ -46,6 +46,10 @@ class Material(object):
         self.name = name
         self._model = None
 
+        # INCREMENTED WHENEVER A PROPERTY IS ASSIGNED, SO THAT MODELS CAN
+        # DISCARD DATA CACHED FOR EARLIER PROPERTIES
+        self.revision = 0
+
         # YOUNG'S MODULUS AND POISSON'S RATIO
         self.E, self.Nu = None, None
 
@@ -89,9 +93,15 @@ class Material(object):
     @model.setter
     def model(self, m):
         self._model = m
+        self.revision += 1
         if not hasattr(self._model, 'requires'):
             self._model.requires = None
 
+    @property
+    def linear(self):
+        """Whether the material stiffness is independent of the strain"""
+        return getattr(self._model, 'linear', False)
+
     def Density(self, rho):
         """Assign mass density
 
@@ -103,6 +113,7 @@ class Material(object):
         """
         assert rho > 0
         self.density = rho
+        self.revision += 1
 
     def Elastic(self, **kwds):
         """Assign elastic properties
@@ -181,6 +192,23 @@ class Material(object):
         # ADD PROPERTIES TO SELF
         self.__dict__.update(props)
 
+    def wave_speed(self):
+        """The dilatational (longitudinal) elastic wave speed
+
+        .. math::
+
+           c = \\sqrt{\\frac{E(1-\\nu)}{(1+\\nu)(1-2\\nu)\\rho}}
+
+        """
+        if self.E is None or self.Nu is None:
+            raise UserInputError('MATERIAL {0!r} REQUIRES ELASTIC '
+                                 'PROPERTIES'.format(self.name))
+        if self.density is None:
+            raise UserInputError('MATERIAL {0!r} REQUIRES DENSITY'.format(
+                self.name))
+        E, Nu = self.E, self.Nu
+        return sqrt(E * (1. - Nu) / ((1. + Nu) * (1. - 2. * Nu) * self.density))
+
     def ThermalConductivity(self, k):
         """Assign the coefficient of thermal conductivity
 
@@ -199,3 +227,10 @@ class Material(object):
         return self.model.response(
             stress, statev, strain, dstrain, time, dtime, temp, dtemp,
             predef, dpred, ndir, nshr, ntens, coords, F0, F, noel, kstep, kinc)
+
+    def block_response(self, stress, statev, strain, dstrain, time, dtime,
+                       temp, dtemp, predef, dpred, ndir, nshr, ntens,
+                       coords, F0, F, noel, kstep, kinc):
+        return self.model.block_response(
+            stress, statev, strain, dstrain, time, dtime, temp, dtemp,
+            predef, dpred, ndir, nshr, ntens, coords, F0, F, noel, kstep, kinc)
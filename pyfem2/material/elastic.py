@@ -4,12 +4,27 @@ from numpy.linalg import inv
 class Elastic(object):
     """Linear elastic material """
     name = 'Elastic'
+    linear = True
     def __init__(self, Lambda, Mu):
         self.Lambda, self.Mu = Lambda, Mu
     def response(self, stress, statev, strain, dstrain, time, dtime,
                  temp, dtemp, predef, dpred, ndir, nshr, ntens,
                  coords, F0, F, noel, kstep, kinc):
+        D = self.stiffness(ndir, nshr)
+        stress += dot(D, dstrain)
+        return stress, statev, D
+
+    def block_response(self, stress, statev, strain, dstrain, time, dtime,
+                       temp, dtemp, predef, dpred, ndir, nshr, ntens,
+                       coords, F0, F, noel, kstep, kinc):
+        """Response at many points at once.  ``stress``, ``strain``, and
+        ``dstrain`` have shape (..., ntens).  The stiffness is the same at
+        every point and is returned as a single (ntens, ntens) array"""
+        D = self.stiffness(ndir, nshr)
+        stress += einsum('ij,...j->...i', D, dstrain)
+        return stress, statev, D
 
+    def stiffness(self, ndir, nshr):
         C11 = self.Lambda + 2*self.Mu
         C12 = self.Lambda
         C44 = self.Mu
@@ -37,5 +52,4 @@ class Elastic(object):
                 idx = [[[0], [1], [2], [3]], [0, 1, 2, 3]]
                 D = D[idx]
 
-        stress += dot(D, dstrain)
-        return stress, statev, D
+        return D
@@ -17,13 +17,15 @@ def is_stringlike(s):
     return hasattr(s, 'strip')
 
 class ElementBlock:
-    def __init__(self, name, id, labels, elefam, elecon):
+    def __init__(self, name, id, labels, elefam, elecon, ielems=None):
         self.name = name.upper()
         self.id = id
         self.labels = labels
         self.elefam = elefam
         self.numele = len(labels)
         self.elecon = elecon
+        # INTERNAL ELEMENT IDS OF THE ELEMENTS, IN BLOCK ORDER
+        self.ielems = ielems
     @property
     def eletyp(self):
         return self.elefam
@@ -451,7 +453,8 @@ class Mesh(object):
                                  'connectivity:\n   {0}'.format(badel))
         blkcon = array(blkcon, dtype=int)
         elefam = ElementFamily(self.dimensions, blkcon.shape[1])
-        blk = ElementBlock(name, len(self.eleblx)+1, xelems, elefam, blkcon)
+        blk = ElementBlock(name, len(self.eleblx)+1, xelems, elefam, blkcon,
+                           ielems=ielems)
         self.eleblx.append(blk)
         self.element_blocks[blk.name] = blk
         self.num_assigned += len(ielems)
@@ -604,7 +604,8 @@ class EXOFileReader(EXOFile):
             blkcon = self.fh.variables[VAR_BLKCON(ieb+1)][:]-1
             ix = arange(k, k+blkcon.shape[0])
             elefam = ElementFamily(numdim, blkcon.shape[1])
-            blk = ElementBlock(name, len(eleblx)+1, elemap1[ix], elefam, blkcon)
+            blk = ElementBlock(name, len(eleblx)+1, elemap1[ix], elefam, blkcon,
+                               ielems=ix)
             eleblx.append(blk)
             elemsets[name] = ix
             k += ix.shape[0]
@@ -6,6 +6,7 @@ from ..constants import *
 from .data_wharehouse import *
 
 class Step(object):
+    memory_limit = None
     def __init__(self, model, number, name, previous, period):
         self.model = model
         self.written = 0
@@ -67,11 +68,42 @@ class Step(object):
     def __len__(self):
         return len(self.frames)
 
+    def select_solver(self):
+        """Set the storage of the global stiffness and the linear solver to
+        those chosen by the model for ``memory_limit`` (see
+        ``FiniteElementModel.select_solver``)
+
+        Returns
+        -------
+        estimate : float
+            Estimated peak memory in bytes
+        peak : float or None
+            Peak resident memory of the process before the solution, for
+            ``report_memory``
+
+        """
+        settings, estimate = self.model.select_solver(self.memory_limit)
+        for (key, val) in settings.items():
+            setattr(self, key, val)
+        return estimate, peak_memory()
+
+    def report_memory(self, estimate, peak):
+        """Log the estimated peak memory of the solution against the increase
+        of the peak resident memory of the process"""
+        msg = 'ESTIMATED PEAK MEMORY {0:.1f} MB'.format(estimate / 1e6)
+        if peak is not None:
+            msg += ', PEAK RESIDENT MEMORY INCREASED BY {0:.1f} MB'.format(
+                (peak_memory() - peak) / 1e6)
+        logging.info(msg)
+
     @property
     def doftags(self):
         return array(sorted(self.dofx), dtype=int)
 
-    def dofvals(self, step_time):
+    def dofvals(self, step_time, ramp=False):
+        """Prescribed DOF values at ``step_time``.  The values of this step
+        are applied at once, or, if ``ramp`` is True, interpolated from the
+        values at the end of the last step"""
 
         ix = self.doftags
 
@@ -82,14 +114,17 @@ class Step(object):
         Xf = array([self.dofx[I] for I in ix])
 
         # INTERPOLATE CONCENTRATED LOAD TO CURRENT TIME
-        fac = max(1., step_time / self.period)
+        fac = min(1., step_time / self.period) if ramp else 1.
         return (1. - fac) * X0 + fac * Xf
 
     @property
     def cltags(self):
         return array(sorted(self.cloadx), dtype=int)
 
-    def cload(self, step_time):
+    def cload(self, step_time, ramp=False):
+        """Concentrated loads at ``step_time``.  The loads of this step are
+        applied at once, or, if ``ramp`` is True, interpolated from the loads
+        at the end of the last step"""
         # CONCENTRATED LOAD AT END OF LAST STEP
         ix = self.previous.cltags
         Q0 = zeros_like(self.dofs)
@@ -101,7 +136,7 @@ class Step(object):
         Qf[ix] = [self.cloadx[key] for key in ix]
 
         # INTERPOLATE CONCENTRATED LOAD TO CURRENT TIME
-        fac = max(1., step_time / self.period)
+        fac = min(1., step_time / self.period) if ramp else 1.
         return (1. - fac) * Q0 + fac * Qf
 
     def dload(self, step_time):
@@ -1,4 +1,5 @@
 from numpy import *
+from timeit import default_timer as timer
 
 from ..constants import *
 from ..utilities import *
@@ -6,6 +7,19 @@ from ._step import SDStep
 
 class DynamicStep(SDStep):
     procedure = DYNAMIC
+    workers = None
+    threads = None
+    mass = None
+    explicit = False
+    frequency = 1
+    safety_factor = .9
+    estimate_frequency = 100
+    # CACHE THE SMALL STRAIN ELEMENT GEOMETRY FOR THE EXPLICIT INCREMENTS
+    geometry_cache = True
+    # ACCEPTED FOR SYMMETRY WITH THE OTHER STEPS, BUT THE LUMPED MASS
+    # INTEGRATION FORMS NO GLOBAL STIFFNESS: solver=AUTO CHOOSES NOTHING AND
+    # memory_limit ONLY BOUNDS THE GEOMETRY CACHE OF THE EXPLICIT INCREMENTS
+    solver = None
     def __init__(self, model, number, name, previous, period, **kwds):
         super(DynamicStep, self).__init__(model, number, name, previous, period)
         for (key, val) in kwds.items():
@@ -14,10 +28,23 @@ class DynamicStep(SDStep):
     # ----------------------------------------------------------------------- #
     # --- RUN --------------------------------------------------------------- #
     # ----------------------------------------------------------------------- #
-    def run(self, period=1., increments=10, alpha=.5, beta=0.):
+    def run(self, period=1., increments=None, alpha=.5, beta=0.):
+
+        if self.solver == AUTO:
+            # WITH THE LUMPED MASS NO GLOBAL SYSTEM IS SOLVED, THERE IS NO
+            # STORAGE OR LINEAR SOLVER TO CHOOSE
+            logging.info('DYNAMIC STEP WITH LUMPED MASS, NO GLOBAL STIFFNESS '
+                         'IS FORMED, SOLVER=AUTO IS IGNORED')
+
+        if self.explicit:
+            self.explicit_solve(period, increments)
+            self.model.close()
+            return
 
         period = getattr(self, 'period', period)
         increments = getattr(self, 'increments', increments)
+        if increments is None:
+            increments = 10
 
         time = array([0., self.start])
         dtime = period / float(increments)
@@ -27,15 +54,17 @@ class DynamicStep(SDStep):
         vn = zeros(shape)
         an = zeros(shape)
 
-        # GET MASS AND RHS AT TIME 0
+        # GET MASS AND RHS AT TIME 0.  THE LUMPED MASS DOES NOT CHANGE
+        # BETWEEN INCREMENTS AND IS ASSEMBLED ONLY ONCE
         Q = self.cload(time[0])
         dltyp, dload = self.dload(time[0])
 
-        mass, rhs = self.model.assemble(
+        self.mass, rhs = self.model.assemble(
             self.dofs, un[:,0], Q, self.svtab, self.svars, dltyp, dload,
-            self.predef, self.procedure, GENERAL, cflag=MASS_AND_RHS, time=time)
+            self.predef, self.procedure, GENERAL, cflag=MASS_AND_RHS, time=time,
+            workers=self.workers, threads=self.threads)
 
-        an[:,0] = rhs / mass
+        an[:,0] = rhs / self.mass
 
         for n in range(increments):
 
@@ -44,13 +73,14 @@ class DynamicStep(SDStep):
             X = self.dofvals(time[0]+dtime)
             dltyp, dload = self.dload(time[0]+dtime)
 
-            mass, rhs = self.model.assemble(
+            rhs = self.model.assemble(
                 self.dofs, un[:,0], Q, self.svtab, self.svars, dltyp, dload,
-                self.predef, self.procedure, GENERAL, cflag=MASS_AND_RHS,
-                time=time, istep=self.number, iframe=n+1)
+                self.predef, self.procedure, GENERAL, cflag=RHS_ONLY,
+                time=time, istep=self.number, iframe=n+1,
+                workers=self.workers, threads=self.threads)
 
             # UPDATE ACCELERATION
-            an[:,1] = rhs / mass
+            an[:,1] = rhs / self.mass
 
             # UPDATE VELOCITY
             dv = ((1. - alpha) * an[:,0] + alpha * an[:,1]) * dtime
@@ -74,4 +104,147 @@ class DynamicStep(SDStep):
 
             self.advance(dtime, self.dofs)
 
+        self.model.close()
         return
+
+    def explicit_solve(self, period=1., increments=None):
+        """Explicit central difference integration
+
+        The lumped mass is assembled once.  Each increment then evaluates
+        only the internal force, with the vectorized element kernels, and
+        updates the displacement, velocity and acceleration arrays in place.
+        A frame is written every ``frequency`` increments and at the end of
+        the step.
+
+        If ``increments`` is not given, the time increment is chosen
+        automatically as ``safety_factor`` times the stable time increment of
+        the (deformed) mesh, re-estimated every ``estimate_frequency``
+        increments.
+
+        The state variable indices of the elements are computed once for
+        the step and, if ``geometry_cache`` is True, the model's geometry
+        cache (see ``FiniteElementModel.cache_geometry``) is enabled for the
+        step, so that an increment does not recompute the Jacobians and B
+        matrices.
+
+        """
+        period = getattr(self, 'period', period)
+        increments = getattr(self, 'increments', increments)
+
+        time = array([0., self.start])
+        kwds = {'workers': self.workers, 'threads': self.threads}
+
+        un = array(self.dofs)
+        vn = zeros_like(un)
+        an = zeros_like(un)
+        du = zeros_like(un)
+        ix = self.doftags
+
+        # LUMPED MASS
+        if self.mass is None:
+            dltyp, dload = self.dload(time[0])
+            self.mass = self.model.assemble(
+                self.dofs, du, zeros_like(un), self.svtab, self.svars, dltyp,
+                dload, self.predef, self.procedure, GENERAL, cflag=MASS_ONLY,
+                time=time, **kwds)
+
+        # EXTERNAL FORCE AND PRESCRIBED DOFS AT THE BEGINNING AND END OF THE
+        # STEP.  LOADS ARE INTERPOLATED LINEARLY IN BETWEEN, SO THE ELEMENT
+        # LOADS NEED NOT BE INTEGRATED AGAIN
+        dltyp, dload = self.dload(time[0]+period)
+        fextf, fint = self.model.assemble(
+            self.dofs, du, self.cload(time[0]+period), self.svtab, self.svars,
+            dltyp, dload, self.predef, self.procedure, GENERAL,
+            cflag=RHS_ONLY, disp=1, time=time, **kwds)
+        dltyp, dload = self.dload(time[0])
+        fext0, fint = self.model.assemble(
+            self.dofs, du, self.cload(time[0]), self.svtab, self.svars, dltyp,
+            dload, self.predef, self.procedure, GENERAL, cflag=RHS_ONLY,
+            disp=1, time=time, **kwds)
+        dfext = fextf - fext0
+        X0 = self.dofvals(time[0])
+        dX = self.dofvals(time[0]+period) - X0
+
+        # STATE VARIABLE INDICES AND SMALL STRAIN GEOMETRY, THE SAME FOR EVERY
+        # INCREMENT
+        kwds['svx'] = self.model.svars_index(self.svtab)
+        cache = self.geometry_cache and not self.model.geometry_cached
+        if cache:
+            try:
+                self.model.cache_geometry(memory_limit=self.memory_limit)
+            except UserInputError as e:
+                logging.warn('GEOMETRY NOT CACHED: {0}'.format(e))
+                cache = False
+
+        # TIME INCREMENT
+        if increments is None:
+            dtime = self.safety_factor * self.model.stable_time_increment(un)
+            dtime = min(dtime, period)
+            logging.debug('STABLE TIME INCREMENT: {0}'.format(dtime))
+        else:
+            dtime = period / float(increments)
+
+        # INITIAL ACCELERATION AND VELOCITY AT THE FIRST HALF INCREMENT
+        subtract(fext0, fint, out=an)
+        an /= self.mass
+        an[ix] = 0.
+        vn += .5 * dtime * an
+
+        tic = timer()
+        t, n, dt = 0., 0, 0.
+        eps = 1e-9 * period
+        while period - t > eps:
+            n += 1
+
+            # DISPLACEMENT INCREMENT, ENFORCING PRESCRIBED DOFS
+            fac = min(1., (t + dtime) / period)
+            multiply(vn, dtime, out=du)
+            du[ix] = X0 + fac * dX - un[ix]
+
+            # INTERNAL FORCE AT THE END OF THE INCREMENT
+            fint = self.model.internal_force(
+                un, du, self.svtab, self.svars, self.predef, self.procedure,
+                time=time, dtime=dtime, istep=self.number, iframe=n, **kwds)
+            un += du
+
+            # UPDATE ACCELERATION
+            multiply(dfext, fac, out=an)
+            an += fext0
+            an -= fint
+            an /= self.mass
+            an[ix] = 0.
+
+            time += dtime
+            t += dtime
+            dt += dtime
+
+            # NEXT TIME INCREMENT, ENDING EXACTLY AT THE END OF THE STEP
+            dtime1 = dtime
+            if increments is None and n % self.estimate_frequency == 0:
+                dtime1 = self.model.stable_time_increment(un)
+                dtime1 *= self.safety_factor
+                logging.debug('STABLE TIME INCREMENT: {0}'.format(dtime1))
+            if period - t > eps:
+                dtime1 = min(dtime1, period - t)
+
+            # UPDATE VELOCITY AT THE NEXT HALF INCREMENT
+            vn += .5 * (dtime + dtime1) * an
+            dtime = dtime1
+
+            if n % self.frequency and period - t > eps:
+                self.svars[0] = self.svars[1]
+                continue
+
+            self.dofs[:] = un
+            self.advance(dt, self.dofs)
+            dt = 0.
+
+        if cache:
+            self.model.cache_geometry(enable=False)
+
+        toc = timer() - tic
+        if toc > 0.:
+            rate = self.model.numele * n / toc
+            logging.info('EXPLICIT STEP {0}: {1} INCREMENTS, {2:.4g} '
+                         'ELEMENT UPDATES PER SECOND'.format(
+                             self.number, n, rate))
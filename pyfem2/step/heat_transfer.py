@@ -7,9 +7,18 @@ from ._step import Step
 
 class HeatTransferStep(Step):
     procedure = HEAT_TRANSFER
-    def __init__(self, model, number, name, previous, period):
+    sparse = False
+    workers = None
+    threads = None
+    solver_options = None
+    banded = False
+    matrix_free = False
+    solver = None
+    def __init__(self, model, number, name, previous, period, **kwds):
         super(HeatTransferStep, self).__init__(model, number, name, previous,
                                                period)
+        for (key, val) in kwds.items():
+            setattr(self, key, val)
 
         # CHECK ELEMENTS
         eletyp = (PlaneDiffussiveHeatTransferTria3,)
@@ -63,6 +72,12 @@ class HeatTransferStep(Step):
     # --- RUN --------------------------------------------------------------- #
     # ----------------------------------------------------------------------- #
     def run(self):
+        memory = None
+        if self.solver == AUTO:
+            memory = self.select_solver()
+        options = self.solver_options
+        if self.matrix_free and options is None:
+            options = {'method': 'cg'}
         time = array([0., self.start])
         du = zeros(self.model.numdof)
         qe = zeros_like(self.dofs)
@@ -70,8 +85,14 @@ class HeatTransferStep(Step):
         X = self.dofvals(self.period)
         K, rhs = self.model.assemble(self.dofs, du, qe, self.svtab, self.svars,
                                      dltyp, dload, self.predef,
-                                     self.procedure, DIRECT, time=time)
-        Kbc, Fbc = self.model.apply_bc(K, rhs, self.doftags, X)
-        self.dofs[:] = linsolve(Kbc, Fbc)
-        react = dot(K, self.dofs) - rhs
+                                     self.procedure, DIRECT, time=time,
+                                     sparse=self.sparse, workers=self.workers,
+                                     threads=self.threads, banded=self.banded,
+                                     matrix_free=self.matrix_free)
+        Fbc = self.model.bc_force(K, rhs, self.doftags, X)
+        self.dofs[:] = self.model.bc_solver(K, self.doftags, options)(Fbc)
+        react = K.dot(self.dofs) - rhs
         self.advance(self.period, self.dofs, react)
+        if memory is not None:
+            self.report_memory(*memory)
+        self.model.close()
@@ -0,0 +1,137 @@
+from numpy import *
+from copy import deepcopy
+
+from ..constants import *
+from ..utilities import *
+from ._step import SDStep
+from .static import StaticStep
+
+class LoadCase(SDStep):
+    """Loads and boundary conditions of one load case of a ``LoadCaseStep``
+
+    Loads and boundary conditions are assigned with the usual step methods.
+    A load case starts with the loads and boundary conditions assigned to
+    its step when it is created.
+
+    """
+    def __init__(self, step, name):
+        # A LOAD CASE ONLY HOLDS LOAD AND BOUNDARY CONDITION DEFINITIONS, ITS
+        # SOLUTION IS STORED IN A FRAME OF ITS STEP
+        self.model = step.model
+        self.name = name
+        self.previous = step.previous
+        self.period = step.period
+        self.dofs = step.dofs
+        self.dofx = deepcopy(step.dofx)
+        self.cloadx = deepcopy(step.cloadx)
+        self.dloadx = deepcopy(step.dloadx)
+        self.sloadx = deepcopy(step.sloadx)
+        self.sfluxx = deepcopy(step.sfluxx)
+        self.sfilmx = deepcopy(step.sfilmx)
+        self.hsrcx = deepcopy(step.hsrcx)
+
+class LoadCaseStep(StaticStep):
+    """A linear static step solving many independent load cases
+
+    The stiffness is assembled and factored once and the boundary condition
+    modified forces of all load cases are solved together.  The solution of
+    each load case is written to its own frame, in the order the cases were
+    created.  Every load case must constrain the same DOFs.
+
+    """
+    def __init__(self, model, number, name, previous, period=1., **kwds):
+        super(LoadCaseStep, self).__init__(model, number, name, previous,
+                                           period, **kwds)
+        self.load_cases = []
+
+    def LoadCase(self, name=None):
+        """Create a load case
+
+        Parameters
+        ----------
+        name : str, optional
+            Name of the load case
+
+        Returns
+        -------
+        case : LoadCase
+            The load case, to which loads and boundary conditions are
+            assigned
+
+        """
+        if name is None:
+            name = 'Case-{0}'.format(len(self.load_cases)+1)
+        if name in [case.name for case in self.load_cases]:
+            raise UserInputError('Duplicate load case name {0!r}'.format(name))
+        case = LoadCase(self, name)
+        self.load_cases.append(case)
+        return case
+
+    # ----------------------------------------------------------------------- #
+    # --- RUN --------------------------------------------------------------- #
+    # ----------------------------------------------------------------------- #
+    def run(self):
+
+        if self.ran:
+            raise RuntimeError('STEP ALREADY RUN')
+
+        if not self.load_cases:
+            raise UserInputError('LOAD CASE STEP REQUIRES LOAD CASES')
+
+        doftags = self.load_cases[0].doftags
+        for case in self.load_cases[1:]:
+            if not array_equal(case.doftags, doftags):
+                raise UserInputError('LOAD CASES MUST CONSTRAIN THE SAME DOFS')
+        self.dofx = self.load_cases[0].dofx
+
+        time = array([0., self.start])
+        dofs0 = self.dofs.copy()
+        svars0 = self.svars[0].copy()
+        u = zeros_like(self.dofs)
+        Fbc, rhs, X = [], [], []
+        for (i, case) in enumerate(self.load_cases):
+
+            Q = case.cload(self.period)
+            dltyp, dload = case.dload(self.period)
+            X.append(case.dofvals(self.period))
+
+            if not i:
+                # ASSEMBLE AND FACTOR THE STIFFNESS ONCE
+                K, r, solve = self.assemble_and_factor(u, Q, dltyp, dload,
+                                                       DIRECT, time=time)
+
+            else:
+                r = self.model.assemble(
+                    self.dofs, u, Q, self.svtab, self.svars, dltyp, dload,
+                    self.predef, self.procedure, DIRECT, cflag=RHS_ONLY,
+                    time=time, workers=self.workers, threads=self.threads)
+
+            rhs.append(r)
+            Fbc.append(self.model.bc_force(K, r, doftags, X[i]))
+
+        # SOLVE ALL LOAD CASES AT ONCE
+        U = solve(array(Fbc).T)
+        if U.ndim == 1:
+            U = U[:,newaxis]
+        react = K.dot(U) - array(rhs).T
+
+        noloads = emptywithlists(self.model.numele)
+        dtime = self.period / float(len(self.load_cases))
+        for (i, case) in enumerate(self.load_cases):
+
+            # SANITY CHECK
+            if not allclose(U[doftags,i], X[i]):
+                logging.warn('INCORRECT SOLUTION TO DOFS')
+
+            # UPDATE THE STRESS IN THE ELEMENTS TO THE COMPUTED DISPLACEMENT
+            self.svars[0] = self.svars[1] = svars0
+            self.model.assemble(
+                dofs0, U[:,i], zeros_like(u), self.svtab, self.svars,
+                noloads, noloads, self.predef, self.procedure, DIRECT,
+                cflag=LP_OUTPUT, workers=self.workers, threads=self.threads)
+
+            self.dofs = array(U[:,i])
+            self.advance(dtime, self.dofs, react=react[:,i])
+
+        self.model.close()
+        self.ran = True
@@ -5,6 +5,7 @@ from ..constants import *
 from ._step import Step
 from .heat_transfer import HeatTransferStep
 from .static import StaticStep
+from .load_case import LoadCaseStep
 from .dynamic import DynamicStep
 
 __all__ = ['StepRepository']
@@ -63,6 +64,18 @@ class StepRepository(object):
         self[name] = step
         return self.last
 
+    def LoadCaseStep(self, name, period=1., **kwds):
+        last = self._values[-1].frames[-1]
+        if not last.converged:
+            raise RuntimeError('PREVIOUS STEP HAS UNCONVERGED FRAMES')
+        step = LoadCaseStep(self.model, len(self), name, self.last, period,
+                            **kwds)
+        if copy:
+            step.copy_from(self.last)
+        step.frames[0].converged = True
+        self[name] = step
+        return self.last
+
     def DynamicStep(self, name, period=1., **kwds):
         last = self._values[-1].frames[-1]
         if not last.converged:
@@ -74,11 +87,12 @@ class StepRepository(object):
         self[name] = step
         return self.last
 
-    def HeatTransferStep(self, name, period):
+    def HeatTransferStep(self, name, period, **kwds):
         last = self._values[-1].frames[-1]
         if not last.converged:
             raise RuntimeError('PREVIOUS STEP HAS UNCONVERGED FRAMES')
-        step = HeatTransferStep(self.model, len(self), name, self.last, period)
+        step = HeatTransferStep(self.model, len(self), name, self.last, period,
+                                **kwds)
         if copy:
             step.copy_from(self.last)
         step.frames[0].converged = True
@@ -6,8 +6,16 @@ from ._step import SDStep
 
 class StaticStep(SDStep):
     procedure = STATIC
+    sparse = False
+    workers = None
+    threads = None
+    solver_options = None
+    matrix_free = False
+    banded = False
     def __init__(self, model, number, name, previous, period=1., **kwds):
         super(StaticStep, self).__init__(model, number, name, previous, period)
+        self.factorizations = 0
+        self.assemblies = 0
         for (key, val) in kwds.items():
             setattr(self, key, val)
 
@@ -21,15 +29,24 @@ class StaticStep(SDStep):
 
         solver = kwargs.pop('solver', getattr(self, 'solver', None))
         increments = kwargs.get('increments', getattr(self, 'increments', None))
+        initial_inc = kwargs.get('initial_inc',
+                                 getattr(self, 'initial_inc', None))
 
-        if solver is None and increments:
+        memory = None
+        if solver == AUTO:
+            # CHOOSE THE STIFFNESS STORAGE AND LINEAR SOLVER, THE NONLINEAR
+            # SOLVER IS CHOSEN AS USUAL
+            memory = self.select_solver()
+            solver = None
+
+        if solver is None and (increments or initial_inc):
             solver = NEWTON
 
         if solver is None:
             self.direct_solve()
 
-        elif solver == NEWTON:
-            self.newton_solve(**kwargs)
+        elif solver in (NEWTON, MODIFIED_NEWTON, BFGS):
+            self.newton_solve(solver=solver, **kwargs)
 
         elif solver == RIKS:
             self.riks_solve(**kwargs)
@@ -37,8 +54,66 @@ class StaticStep(SDStep):
         else:
             raise NotImplementedError
 
+        if memory is not None:
+            self.report_memory(*memory)
+
+        self.model.close()
         self.ran = True
 
+    def assemble_and_factor(self, u, Q, dltyp, dload, step_type, **kwds):
+        """Assemble the global stiffness and force and factor the boundary
+        condition modified stiffness
+
+        The stiffness of a linear model (see ``FiniteElementModel.is_linear``)
+        is the same on every frame and step.  It is assembled and factored
+        once for each set of constrained DOFs and cached by the model; later
+        calls only assemble the force.
+
+        If ``matrix_free`` is True, the element stiffnesses are kept in
+        place of the global stiffness and the system is solved by conjugate
+        gradients, unless another iterative solver is given by
+        ``solver_options``.
+
+        Returns
+        -------
+        K : ndarray, scipy.sparse.csr_matrix, or ElementOperator
+            The global stiffness
+        rhs : ndarray or tuple of ndarray
+            The global force, or the external and internal forces
+            ``(fext, fint)`` if ``disp`` is given
+        solve : callable
+            ``solve(Fbc)`` solves the boundary condition modified system
+
+        """
+        args = (self.dofs, u, Q, self.svtab, self.svars, dltyp, dload,
+                self.predef, self.procedure, step_type)
+        kwds.update(sparse=self.sparse, workers=self.workers,
+                    threads=self.threads, banded=self.banded)
+        options = self.solver_options
+        if self.matrix_free:
+            kwds['matrix_free'] = True
+            if options is None:
+                options = {'method': 'cg'}
+        linear = self.model.is_linear(getattr(self, 'nlgeom', False))
+        if linear:
+            cached = self.model.factored_stiffness(
+                self.doftags, self.sparse, options, self.banded,
+                self.matrix_free)
+            if cached is not None:
+                K, solve = cached
+                rhs = self.model.assemble(*args, cflag=RHS_ONLY, **kwds)
+                return K, rhs, solve
+
+        r = self.model.assemble(*args, cflag=STIFF_AND_RHS, **kwds)
+        K, rhs = r[0], r[1] if len(r) == 2 else r[1:]
+        solve = self.model.bc_solver(K, self.doftags, options)
+        self.factorizations += 1
+        if linear:
+            self.model.cache_factored_stiffness(
+                self.doftags, self.sparse, K, solve, options, self.banded,
+                self.matrix_free)
+        return K, rhs, solve
+
     def direct_solve(self):
 
         time = array([0., self.start])
@@ -50,183 +125,552 @@ class StaticStep(SDStep):
 
         # ASSEMBLE THE GLOBAL STIFFNESS AND FORCE
         u = zeros_like(self.dofs)
-        K, rhs = self.model.assemble(
-            self.dofs, u, Qf, self.svtab, self.svars, dltyp, dload,
-            self.predef, self.procedure, DIRECT, cflag=STIFF_AND_RHS, time=time)
+        K, rhs, solve = self.assemble_and_factor(u, Qf, dltyp, dload, DIRECT,
+                                                 time=time)
 
         # ENFORCE BOUNDARY CONDITIONS
-        Kbc, Fbc = self.model.apply_bc(K, rhs, self.doftags, X)
+        Fbc = self.model.bc_force(K, rhs, self.doftags, X)
 
         # SOLVE FOR UNKNOWN DOFS
-        u[:] = linsolve(Kbc, Fbc)
+        u[:] = solve(Fbc)
 
         # SANITY CHECK
         if not allclose(u[self.doftags], X):
             logging.warn('INCORRECT SOLUTION TO DOFS')
 
         # TOTAL FORCE, INCLUDING REACTION, AND REACTION
-        react = dot(K, u) - rhs
+        react = K.dot(u) - rhs
 
         # ASSEMBLE AGAIN - ONLY TO UPDATE STRESS IN ELEMENTS TO COMPUTED
         # DISPLACEMENT
         self.model.assemble(
             self.dofs, u, Qf, self.svtab, self.svars, dltyp, dload,
-            self.predef, self.procedure, DIRECT, cflag=LP_OUTPUT)
+            self.predef, self.procedure, DIRECT, cflag=LP_OUTPUT,
+            workers=self.workers, threads=self.threads)
 
         self.dofs = u
         self.advance(self.period, self.dofs, react=react)
 
     def newton_solve(self, period=1., increments=5, maxiters=20,
-                     tolerance=1e-4, relax=1., tolerance1=1e-6):
-
+                     tolerance=1e-4, relax=1., tolerance1=1e-6, solver=NEWTON,
+                     refactor=None, initial_inc=None, min_inc=None,
+                     max_inc=None, line_search=0):
+        """Solve the nonlinear step by Newton iterations
+
+        Parameters
+        ----------
+        solver : str, optional
+            NEWTON assembles and factors the tangent stiffness on every
+            iteration.  MODIFIED_NEWTON factors the tangent stiffness at the
+            start of each increment and reuses it for the remaining
+            iterations.  BFGS also reuses the factored stiffness, corrected
+            by the (limited memory) BFGS rank two updates of the iterations
+            since it was factored.
+        refactor : int, optional
+            For MODIFIED_NEWTON and BFGS, factor the tangent stiffness again
+            every ``refactor`` iterations of an increment.
+        initial_inc : float, optional
+            If given, the step is incremented automatically starting with
+            this time increment, otherwise the period is divided in to
+            ``increments`` equal increments.
+        min_inc, max_inc : float, optional
+            The smallest and largest time increments of automatic
+            incrementation.  Defaults are ``1e-5*period`` and ``period``.
+        line_search : int, optional
+            The largest number of residual assemblies of the line search
+            along each correction.  The default, 0, applies the full
+            correction (scaled by ``relax``).
+
+        Notes
+        -----
+        Iterations that reuse the factored stiffness only assemble the
+        residual (``cflag=RHS_ONLY``).
+
+        With automatic incrementation, an increment that does not converge
+        is discarded, the state variables are restored to the start of the
+        increment, and the increment is retried with a time increment cut
+        back by a factor of 4.  The step fails only if the time increment
+        falls below ``min_inc``.  After an increment converges in few
+        iterations, the time increment grows by a factor of 1.5, up to
+        ``max_inc``.
+
+        The line search is a secant search for the step length along the
+        correction that makes the residual orthogonal to the correction,
+        that is, that minimizes the energy for a conservative problem.  It
+        stops when the projected residual is a quarter of its value at the
+        start of the search.  The residual at the accepted step length is
+        reused by the next iteration, if it does not reassemble the
+        stiffness.  The search is therefore cheapest with MODIFIED_NEWTON
+        and BFGS, for which a full step costs no extra assembly.
+
+        """
         period = getattr(self, 'period', period)
         increments = getattr(self, 'increments', increments)
         maxiters = getattr(self, 'maxiters', maxiters)
+        refactor = getattr(self, 'refactor', refactor)
+        initial_inc = getattr(self, 'initial_inc', initial_inc)
+        min_inc = getattr(self, 'min_inc', min_inc)
+        max_inc = getattr(self, 'max_inc', max_inc)
+        line_search = getattr(self, 'line_search', line_search)
+
+        automatic = initial_inc is not None
+        if automatic:
+            if min_inc is None:
+                min_inc = 1e-5 * period
+            if max_inc is None:
+                max_inc = period
+            if not 0. < min_inc <= initial_inc <= max_inc:
+                raise UserInputError('EXPECTED 0 < MIN_INC <= INITIAL_INC '
+                                     '<= MAX_INC')
+            dtime = float(initial_inc)
+        else:
+            dtime = period / float(increments)
 
         # TIME IS:
         # TIME[0]: VALUE OF STEP TIME AT BEGINNING OF INCREMENT
         # TIME[1]: VALUE OF TOTAL TIME AT BEGINNING OF INCREMENT
         time = array([0., self.start])
-        dtime = period / float(increments)
 
-        maxit2 = int(maxiters)
-        maxit1 = max(int(maxit2/2.),1)
+        factorizations, iterations, cutbacks = self.factorizations, 0, 0
+        assemblies = self.assemblies
+        iframe = 0
+        while period - time[0] > 1e-10 * period:
 
-        for iframe in range(increments):
-
-            # GET LOADS AND PRESCRIBED DISPLACEMENTS
-            Q = self.cload(time[0]+dtime)
-            X = self.dofvals(time[0]+dtime)
-            dltyp, dload = self.dload(time[0]+dtime)
-
-            # NEWTON-RAPHSON LOOP
-            err1 = 1.
-            u = zeros(self.model.numdof)
-            for nit in range(maxit2):
-
-                K, rhs = self.model.assemble(
-                    self.dofs, u, Q, self.svtab, self.svars, dltyp, dload,
-                    self.predef, self.procedure, GENERAL, cflag=STIFF_AND_RHS,
-                    time=time, istep=self.number, iframe=iframe+1, ninc=nit+1)
-
-                # ENFORCE BOUNDARY CONDITIONS
-                Kbc, Fbc = self.model.apply_bc(K, rhs, self.doftags, X, self.dofs, u)
-
-                # --- SOLVE FOR THE NODAL DISPLACEMENT
-                w = linsolve(Kbc, Fbc)
-
-                # --- UPDATE DISPLACEMENT INCREMENT
-                u += relax * w
-
-                # --- CHECK CONVERGENCE
-                err1 = sqrt(dot(w, w))
-                dnom = sqrt(dot(u, u))
-                if dnom > 1e-8:
-                    err1 /= dnom
-                err2 = sqrt(dot(rhs, rhs)) / float(self.model.numdof)
-
-                if nit < maxit1:
-                    if err1 < tolerance1:
-                        break
-                else:
-                    if err1 < tolerance:
-                        break
-                    elif err2 < 5e-2:
-                        logging.debug('CONVERGING TO LOSER TOLERANCE ON STEP '
-                                      '{0}, FRAME {1}'.format(self.number, iframe+1))
-                        break
+            # DO NOT STEP PAST THE END OF THE STEP
+            dtime = min(dtime, period - time[0])
 
-                continue
+            u, nit = self.newton_increment(time, dtime, iframe, maxiters,
+                                           tolerance, relax, tolerance1,
+                                           solver, refactor, line_search)
+            iterations += nit
 
-            else:
+            if u is None:
                 message  = 'FAILED TO CONVERGE ON STEP '
                 message += '{0}, FRAME {1}'.format(self.number, iframe+1)
-                logging.error(message)
-                raise RuntimeError(message)
+                if not automatic or dtime / 4. < min_inc:
+                    logging.error(message)
+                    raise RuntimeError(message)
+
+                # DISCARD THE INCREMENT AND CUT BACK THE TIME INCREMENT
+                self.svars[1] = self.svars[0]
+                dtime /= 4.
+                cutbacks += 1
+                logging.info(message + ', CUTTING BACK THE TIME INCREMENT '
+                             'TO {0}'.format(dtime))
+                continue
 
-            logging.debug('STEP {0}, FRAME {1}, '
-                          'COMPLETE.'.format(self.number, iframe+1))
+            logging.debug('STEP {0}, FRAME {1}, COMPLETE IN {2} '
+                          'ITERATIONS.'.format(self.number, iframe+1, nit))
             time += dtime
+            iframe += 1
             self.dofs += u
             self.advance(dtime, self.dofs)
 
+            if automatic and nit <= maxiters // 4:
+                # CONVERGED QUICKLY, INCREASE THE TIME INCREMENT
+                dtime = min(1.5 * dtime, max_inc)
+
+        logging.info('{0} SOLVE OF STEP {1}: {2} INCREMENTS, {3} CUTBACKS, '
+                     '{4} ITERATIONS, {5} STIFFNESS FACTORIZATIONS, {6} '
+                     'ASSEMBLIES'.format(solver.upper(), self.number, iframe,
+                                         cutbacks, iterations,
+                                         self.factorizations-factorizations,
+                                         self.assemblies-assemblies))
+
         return
 
-    def riks_solve(self, period=1., increments=5, maxiters=20,
-                   tolerance=1e-4, relax=1., tolerance1=1e-6):
-        raise NotImplementedError("THIS FUNCTION IS STILL A NEWTON SOLVER")
+    def newton_increment(self, time, dtime, iframe, maxiters, tolerance,
+                         relax, tolerance1, solver=NEWTON, refactor=None,
+                         line_search=0):
+        """Iterate to equilibrium at the end of one increment
+
+        Returns
+        -------
+        u : ndarray
+            The converged DOF increment, or None if the iterations did not
+            converge
+        nit : int
+            The number of iterations
+
+        """
+        # GET LOADS AND PRESCRIBED DISPLACEMENTS, RAMPED OVER THE STEP
+        Q = self.cload(time[0]+dtime, ramp=True)
+        X = self.dofvals(time[0]+dtime, ramp=True)
+        dltyp, dload = self.dload(time[0]+dtime)
+
+        maxit2 = int(maxiters)
+        maxit1 = max(int(maxit2/2.),1)
+
+        free = ones(self.model.numdof, dtype=bool)
+        free[self.doftags] = False
+
+        def residual(u, ninc):
+            self.assemblies += 1
+            return self.model.assemble(
+                self.dofs, u, Q, self.svtab, self.svars, dltyp, dload,
+                self.predef, self.procedure, GENERAL, cflag=RHS_ONLY,
+                time=time, dtime=dtime, istep=self.number, iframe=iframe+1,
+                ninc=ninc, workers=self.workers, threads=self.threads)
+
+        # NEWTON-RAPHSON LOOP
+        err1 = 1.
+        u = zeros(self.model.numdof)
+        rhs_next = None
+        for nit in range(maxit2):
+
+            factor = (not nit or solver == NEWTON or
+                      (refactor and not nit % refactor))
+            if factor:
+                K, rhs, solve = self.assemble_and_factor(
+                    u, Q, dltyp, dload, GENERAL, time=time, dtime=dtime,
+                    istep=self.number, iframe=iframe+1, ninc=nit+1)
+                self.assemblies += 1
+                # BFGS UPDATES SINCE THE LAST FACTORIZATION
+                updates = []
+
+            elif rhs_next is not None:
+                # RESIDUAL ALREADY ASSEMBLED BY THE LINE SEARCH
+                rhs = rhs_next
 
+            else:
+                # REUSE THE FACTORED STIFFNESS, ONLY THE RESIDUAL IS NEEDED
+                rhs = residual(u, nit+1)
+
+            # ENFORCE BOUNDARY CONDITIONS
+            Fbc = self.model.bc_force(K, rhs, self.doftags, X, self.dofs, u)
+            if not all(isfinite(Fbc)):
+                # DIVERGED
+                break
+
+            # --- SOLVE FOR THE NODAL DISPLACEMENT
+            if solver == BFGS:
+                r = where(free, Fbc, 0.)
+                if not factor:
+                    # THE CHANGE OF THE RESIDUAL OVER THE LAST ITERATION
+                    # UPDATES THE INVERSE STIFFNESS
+                    y = r0 - r
+                    ys = dot(y, s)
+                    if ys > 0.:
+                        updates.append((s, y, 1. / ys))
+                w = self.bfgs_solve(solve, r, updates)
+                w[self.doftags] = Fbc[self.doftags]
+                r0 = r
+            else:
+                w = solve(Fbc)
+
+            du = relax * w
+
+            # --- CHECK CONVERGENCE
+            err1 = sqrt(dot(w, w))
+            dnom = sqrt(dot(u+du, u+du))
+            if dnom > 1e-8:
+                err1 /= dnom
+            err2 = sqrt(dot(rhs, rhs)) / float(self.model.numdof)
+
+            if nit < maxit1:
+                if err1 < tolerance1:
+                    return u + du, nit+1
+            else:
+                if err1 < tolerance:
+                    return u + du, nit+1
+                elif err2 < 5e-2:
+                    logging.debug('CONVERGING TO LOSER TOLERANCE ON STEP '
+                                  '{0}, FRAME {1}'.format(self.number, iframe+1))
+                    return u + du, nit+1
+
+            # --- LINE SEARCH ALONG THE CORRECTION OF THE FREE DOFS
+            rhs_next = None
+            if line_search:
+                eta, rhs_next, n = self.secant_line_search(
+                    lambda eta: residual(u + where(free, eta * du, du), nit+1),
+                    dot(du[free], Fbc[free]), du, free, line_search)
+                du[free] *= eta
+                logging.debug('LINE SEARCH ON STEP {0}, FRAME {1}, ITERATION '
+                              '{2}: STEP LENGTH {3:.4f}, {4} RESIDUAL '
+                              'ASSEMBLIES'.format(self.number, iframe+1,
+                                                  nit+1, eta, n))
+
+            # --- UPDATE DISPLACEMENT INCREMENT
+            u += du
+            s = where(free, du, 0.)
+
+        return None, nit+1
+
+    @staticmethod
+    def secant_line_search(residual, g0, du, free, maxiters, ratio=.25,
+                           bounds=(.1, 4.)):
+        """Secant search for the step length along the correction ``du``
+
+        Parameters
+        ----------
+        residual : callable
+            ``residual(eta)`` assembles the residual at step length ``eta``
+        g0 : float
+            The residual projected on the correction at zero step length
+        du : ndarray
+            The correction
+        free : ndarray of bool
+            The free DOFs, only they are projected
+        maxiters : int
+            The largest number of residual assemblies
+        ratio : float
+            The search stops when the projected residual falls below
+            ``ratio*abs(g0)``
+        bounds : tuple of float
+            The smallest and largest step lengths
+
+        Returns
+        -------
+        eta : float
+            The step length
+        rhs : ndarray
+            The residual at step length ``eta``
+        n : int
+            The number of residual assemblies
+
+        """
+        eta0, g_0 = 0., g0
+        eta = 1.
+        for n in range(1, maxiters+1):
+            rhs = residual(eta)
+            g = dot(du[free], rhs[free])
+            if abs(g) <= ratio * abs(g0) or n == maxiters:
+                break
+            if not isfinite(g):
+                # BACKTRACK
+                eta1 = .5 * eta
+            elif g == g_0:
+                break
+            else:
+                eta1 = eta - g * (eta - eta0) / (g - g_0)
+                eta0, g_0 = eta, g
+            eta1 = min(max(eta1, bounds[0]), bounds[1])
+            if eta1 == eta:
+                break
+            eta = eta1
+        return eta, rhs, n
+
+    @staticmethod
+    def bfgs_solve(solve, r, updates):
+        """Apply the BFGS inverse stiffness to the residual ``r``
+
+        The inverse stiffness is that of the factored stiffness, ``solve``,
+        corrected by the rank two ``updates``, a list of ``(s, y, 1/y.s)``
+        from the oldest to the newest, where ``s`` is a displacement
+        correction and ``y`` the resulting decrease of the residual.  The
+        product is evaluated by the two loop recursion without forming the
+        updated inverse.
+
+        """
+        q = array(r)
+        alpha = []
+        for (s, y, rho) in reversed(updates):
+            a = rho * dot(s, q)
+            q -= a * y
+            alpha.append(a)
+        z = solve(q)
+        for ((s, y, rho), a) in zip(updates, reversed(alpha)):
+            b = rho * dot(y, z)
+            z += (a - b) * s
+        return z
+
+    def riks_solve(self, period=1., increments=100, maxiters=20,
+                   tolerance=1e-4, initial_inc=None, min_inc=None,
+                   max_inc=None, max_lpf=1.):
+        """Solve the nonlinear step by the (Crisfield) arc length method
+
+        The loads of the step are applied proportionally, the external
+        force is ``P0 + lpf*(P - P0)`` where ``P0`` are the loads at the end
+        of the previous step, ``P`` the loads of this step, and ``lpf`` the
+        load proportionality factor.  ``lpf`` is an unknown that is solved
+        for, together with the DOFs, on the cylindrical arc
+
+        .. math::
+
+           \\Delta u \\cdot \\Delta u = \\Delta l^2
+
+        of each increment, so that the equilibrium path is traced past limit
+        points where load control fails.
+
+        Parameters
+        ----------
+        increments : int, optional
+            The largest number of increments
+        maxiters : int, optional
+            The largest number of iterations of an increment
+        tolerance : float, optional
+            An increment converges when the norm of the residual falls below
+            ``tolerance`` times the norm of the load ``P - P0``
+        initial_inc : float, optional
+            The load proportionality factor of the first increment, that
+            fixes the initial arc length [default: ``period/10``].  The step
+            time of each increment is its arc length in units of the initial
+            arc length times ``initial_inc``
+        min_inc, max_inc : float, optional
+            The smallest and largest increments of step time (arc length),
+            defaults are ``1e-5*period`` and ``period``
+        max_lpf : float, optional
+            The step ends when the load proportionality factor reaches
+            ``max_lpf``, or after ``increments`` increments
+
+        Notes
+        -----
+        Each iteration assembles the stiffness, the external and the
+        internal forces at once (``disp=1``) and solves for the corrections
+        due to the reference load and to the residual with the same
+        factorization.  The arc length of the next increment is scaled by
+        ``sqrt(n/nit)``, bounded to [.5, 2], where ``nit`` is the number of
+        iterations of the last increment and ``n=maxiters/4``.  If an
+        increment does not converge, or the arc does not intersect the
+        equilibrium path, the increment is retried with a quarter of the arc
+        length.
+
+        The load proportionality factor of each frame is its
+        ``load_factor``.
+
+        """
         period = getattr(self, 'period', period)
         increments = getattr(self, 'increments', increments)
         maxiters = getattr(self, 'maxiters', maxiters)
+        initial_inc = getattr(self, 'initial_inc', initial_inc)
+        min_inc = getattr(self, 'min_inc', min_inc)
+        max_inc = getattr(self, 'max_inc', max_inc)
+        max_lpf = getattr(self, 'max_lpf', max_lpf)
+
+        if initial_inc is None:
+            initial_inc = .1 * period
+        if min_inc is None:
+            min_inc = 1e-5 * period
+        if max_inc is None:
+            max_inc = period
+        if not 0. < min_inc <= initial_inc <= max_inc:
+            raise UserInputError('EXPECTED 0 < MIN_INC <= INITIAL_INC '
+                                 '<= MAX_INC')
+
+        X = self.dofvals(period)
+        if not allclose(X, self.dofs[self.doftags]):
+            raise UserInputError('RIKS STEP CANNOT CHANGE PRESCRIBED DOFS')
+
+        free = ones(self.model.numdof, dtype=bool)
+        free[self.doftags] = False
+
+        # EXTERNAL FORCE AT THE END OF THE PREVIOUS STEP AND LOADS OF THIS STEP
+        u = zeros(self.model.numdof)
+        dltyp, dload = self.dload(0.)
+        fext0, fint = self.model.assemble(
+            self.dofs, u, self.cload(0., ramp=True), self.svtab, self.svars,
+            dltyp, dload, self.predef, self.procedure, GENERAL, cflag=RHS_ONLY,
+            disp=1, workers=self.workers, threads=self.threads)
+        self.assemblies += 1
+        Q = self.cload(period)
+        dltyp, dload = self.dload(period)
 
         # TIME IS:
         # TIME[0]: VALUE OF STEP TIME AT BEGINNING OF INCREMENT
         # TIME[1]: VALUE OF TOTAL TIME AT BEGINNING OF INCREMENT
         time = array([0., self.start])
-        dtime = period / float(increments)
-
-        maxit2 = int(maxiters)
-        maxit1 = max(int(maxit2/2.),1)
-
-        for iframe in range(increments):
-
-            # GET LOADS AND PRESCRIBED DISPLACEMENTS
-            Q = self.cload(time[0]+dtime)
-            X = self.dofvals(time[0]+dtime)
-            dltyp, dload = self.dload(time[0]+dtime)
-
-            # NEWTON-RAPHSON LOOP
-            err1 = 1.
-            u = zeros(self.model.numdof)
-            for nit in range(maxit2):
-
-                K, fext, fint = self.model.assemble(
-                    self.dofs, u, Q, self.svtab, self.svars, dltyp, dload,
-                    self.predef, self.procedure, GENERAL, cflag=STIFF_AND_RHS,
-                    time=time, istep=self.number, iframe=iframe+1, ninc=nit+1,
-                    disp=1)
-                rhs = fext - fint
-
-                # ENFORCE BOUNDARY CONDITIONS
-                Kbc, Fbc = self.model.apply_bc(K, rhs, self.doftags, X, self.dofs, u)
-
-                # --- SOLVE FOR THE NODAL DISPLACEMENT
-                w = linsolve(Kbc, Fbc)
-
-                # --- UPDATE DISPLACEMENT INCREMENT
-                u += relax * w
-
-                # --- CHECK CONVERGENCE
-                err1 = sqrt(dot(w, w))
-                dnom = sqrt(dot(u, u))
-                if dnom > 1e-8:
-                    err1 /= dnom
-                err2 = sqrt(dot(rhs, rhs)) / float(self.model.numdof)
-
-                if nit < maxit1:
-                    if err1 < tolerance1:
-                        break
-                else:
-                    if err1 < tolerance:
-                        break
-                    elif err2 < 5e-2:
-                        logging.debug('CONVERGING TO LOSER TOLERANCE ON STEP '
-                                      '{0}, FRAME {1}'.format(self.number, iframe+1))
-                        break
-
-                continue
-
-            else:
+        self.frames[-1].load_factor = lpf = 0.
+
+        factorizations, assemblies = self.factorizations, self.assemblies
+        iterations, cutbacks = 0, 0
+        arc, dtime, direction = None, float(initial_inc), zeros_like(u)
+        iframe = 0
+        while iframe < increments and lpf < max_lpf:
+
+            # ARC LENGTH ITERATIONS
+            du, dlpf = zeros_like(u), 0.
+            for nit in range(maxiters+1):
+                K, (fext, fint), solve = self.assemble_and_factor(
+                    du, Q, dltyp, dload, GENERAL, time=time, dtime=dtime,
+                    istep=self.number, iframe=iframe+1, ninc=nit+1, disp=1)
+                self.assemblies += 1
+
+                # REFERENCE LOAD AND RESIDUAL
+                P = where(free, fext - fext0, 0.)
+                R = where(free, fext0 + (lpf + dlpf) * P - fint, 0.)
+                if nit and sqrt(dot(R, R)) <= tolerance * sqrt(dot(P, P)):
+                    break
+                if nit == maxiters or not all(isfinite(R)):
+                    nit = None
+                    break
+
+                # CORRECTIONS DUE TO THE REFERENCE LOAD AND THE RESIDUAL, WITH
+                # ONE FACTORIZATION
+                U = solve(array([P, R]).T)
+                ut, ur = U[:,0], U[:,1]
+
+                if not nit:
+                    # PREDICTOR, TANGENT TO THE EQUILIBRIUM PATH IN THE
+                    # DIRECTION OF THE LAST INCREMENT
+                    if arc is None:
+                        arc = initial_inc / period * sqrt(dot(ut, ut))
+                    d = 1. if dot(ut, direction) >= 0. else -1.
+                    dlpf = d * arc / sqrt(dot(ut, ut))
+                    du = dlpf * ut
+                    continue
+
+                # CORRECTOR, THE LOAD FACTOR CORRECTION KEEPS THE INCREMENT
+                # ON THE ARC
+                a = du + ur
+                c2, c1, c0 = dot(ut, ut), 2. * dot(ut, a), dot(a, a) - arc ** 2
+                disc = c1 ** 2 - 4. * c2 * c0
+                if disc < 0.:
+                    logging.debug('ARC DOES NOT INTERSECT THE EQUILIBRIUM '
+                                  'PATH ON STEP {0}, FRAME {1}'.format(
+                                      self.number, iframe+1))
+                    nit = None
+                    break
+                roots = (-c1 + array([1., -1.]) * sqrt(disc)) / (2. * c2)
+                # THE ROOT THAT KEEPS THE INCREMENT CLOSEST TO ITS DIRECTION
+                x = [dot(a + root * ut, du) for root in roots]
+                root = roots[argmax(x)]
+                du = a + root * ut
+                dlpf += root
+
+            iterations += nit or maxiters
+            if nit is None:
                 message  = 'FAILED TO CONVERGE ON STEP '
                 message += '{0}, FRAME {1}'.format(self.number, iframe+1)
-                logging.error(message)
-                raise RuntimeError(message)
+                if arc is None:
+                    # THE FIRST ASSEMBLY FAILED BEFORE THE ARC LENGTH WAS
+                    # SET, THERE IS NO ARC LENGTH TO CUT BACK
+                    logging.error(message)
+                    raise RuntimeError(message + ', RESIDUAL OF THE FIRST '
+                                       'ITERATION IS NOT FINITE')
+                if dtime / 4. < min_inc:
+                    logging.error(message)
+                    raise RuntimeError(message)
+
+                # DISCARD THE INCREMENT AND CUT BACK THE ARC LENGTH
+                self.svars[1] = self.svars[0]
+                arc /= 4.
+                dtime /= 4.
+                cutbacks += 1
+                logging.info(message + ', CUTTING BACK THE ARC LENGTH')
+                continue
 
-            logging.debug('STEP {0}, FRAME {1}, '
-                          'COMPLETE.'.format(self.number, iframe+1))
             time += dtime
-            self.dofs += u
+            iframe += 1
+            lpf += dlpf
+            direction = du
+            self.dofs += du
             self.advance(dtime, self.dofs)
+            self.frames[-1].load_factor = lpf
+            logging.debug('STEP {0}, FRAME {1}, COMPLETE IN {2} ITERATIONS, '
+                          'LOAD PROPORTIONALITY FACTOR {3}'.format(
+                              self.number, iframe, nit, lpf))
+
+            # ADAPT THE ARC LENGTH TO THE ITERATIONS OF THIS INCREMENT
+            scale = min(max(sqrt(max(maxiters//4, 1) / float(nit)), .5), 2.)
+            scale = min(scale, max_inc / dtime)
+            arc *= scale
+            dtime *= scale
+
+        logging.info('RIKS SOLVE OF STEP {0}: {1} INCREMENTS, {2} CUTBACKS, '
+                     '{3} ITERATIONS, {4} STIFFNESS FACTORIZATIONS, {5} '
+                     'ASSEMBLIES, LOAD PROPORTIONALITY FACTOR {6}'.format(
+                         self.number, iframe, cutbacks, iterations,
+                         self.factorizations-factorizations,
+                         self.assemblies-assemblies, lpf))
 
         return
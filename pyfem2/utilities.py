@@ -1,12 +1,27 @@
+import os
 import sys
+import heapq
 import logging
 from numpy import *
 from numpy.linalg import solve, lstsq, LinAlgError
 from math import log as logm
+try:
+    import resource
+except ImportError:
+    resource = None
 try:
     import scipy.linalg.flapack as flapack
 except ImportError:
     flapack = None
+try:
+    import scipy.linalg as scilinalg
+except ImportError:
+    scilinalg = None
+try:
+    import scipy.sparse as scisparse
+    import scipy.sparse.linalg as spla
+except ImportError:
+    scisparse = spla = None
 
 from .constants import *
 
@@ -75,12 +90,75 @@ def normal2d(xc):
         n = array([dy, -1.], dtype=float)
     return n / sqrt(dot(n, n))
 
+def issparse(a):
+    return scisparse is not None and scisparse.issparse(a)
+
+class SymmetricBandMatrix(object):
+    """Real, symmetric matrix in LAPACK upper band storage
+
+    Parameters
+    ----------
+    ab : ndarray
+        The (u+1, N) band, ``ab[u+i-j, j] = A[i, j]`` for
+        ``max(0, j-u) <= i <= j``, where u is the half bandwidth
+
+    Notes
+    -----
+    Memory is proportional to N times the half bandwidth.  Boundary
+    conditions are applied with ``constrain``, which keeps the band.
+
+    """
+    def __init__(self, ab):
+        self.ab = ab
+        self.bandwidth = ab.shape[0] - 1
+        self.shape = (ab.shape[1], ab.shape[1])
+
+    def _entries(self):
+        """Row and column of each entry of the band"""
+        u, n = self.ab.shape[0] - 1, self.ab.shape[1]
+        j = tile(arange(n), (u+1, 1))
+        i = j - u + arange(u+1)[:,newaxis]
+        return i, j
+
+    def dot(self, x):
+        x = asarray(x, dtype=float)
+        u, n = self.bandwidth, self.shape[0]
+        y = self.ab[u][(slice(None),) + (newaxis,) * (x.ndim-1)] * x
+        for d in range(1, u+1):
+            # THE dTH SUPERDIAGONAL AND, BY SYMMETRY, SUBDIAGONAL
+            a = self.ab[u-d, d:][(slice(None),) + (newaxis,) * (x.ndim-1)]
+            y[:-d] += a * x[d:]
+            y[d:] += a * x[:-d]
+        return y
+
+    def diagonal(self):
+        return self.ab[-1].copy()
+
+    def constrain(self, doftags):
+        """The matrix with the rows and columns ``doftags`` replaced by
+        those of the identity"""
+        mask = ones(self.shape[0])
+        mask[doftags] = 0.
+        i, j = self._entries()
+        keep = (i >= 0) & (mask[clip(i, 0, None)] * mask[j] > 0.)
+        ab = where(keep, self.ab, 0.)
+        ab[-1, doftags] = 1.
+        return SymmetricBandMatrix(ab)
+
+    def toarray(self):
+        A = zeros(self.shape)
+        i, j = self._entries()
+        inband = i >= 0
+        A[i[inband], j[inband]] = self.ab[inband]
+        A[j[inband], i[inband]] = self.ab[inband]
+        return A
+
 def linsolve(A, b, symmetric=True):
     """Interface to the lapack dposv solve function in scipy.linalg
 
     Parameters
     ----------
-    A : ndarray
+    A : ndarray or sparse matrix
         Real, symmetric, positive-definite matrix (the stiffness matrix)
     b : ndarray
         RHS of system of equations
@@ -101,12 +179,29 @@ def linsolve(A, b, symmetric=True):
     procedure. This interface function is used to avoid the overhead of
     calling down in to scipy, converting arrays to fortran order, etc.
 
+    If ``A`` is a scipy sparse matrix, the system is solved with the sparse
+    direct solver in scipy.sparse.linalg and is never densified.  If ``A``
+    is a ``SymmetricBandMatrix``, the system is solved in band storage by
+    lapack's dpbsv.
+
     """
     try:
         F = b.asarray()
     except AttributeError:
         F = asarray(b)
 
+    if isinstance(A, SymmetricBandMatrix):
+        try:
+            return scilinalg.solveh_banded(A.ab, F)
+        except LinAlgError:
+            raise RuntimeError('ATTEMPTING TO SOLVE UNDER CONSTRAINED SYSTEM')
+
+    if issparse(A):
+        x = spla.spsolve(A.tocsc(), F)
+        if any(isnan(x)):
+            raise RuntimeError('ATTEMPTING TO SOLVE UNDER CONSTRAINED SYSTEM')
+        return x
+
     use_np_solve = not symmetric or flapack == None
     x, info = None, 1
     if not use_np_solve:
@@ -131,6 +226,120 @@ def linsolve(A, b, symmetric=True):
 
     return x
 
+def factorize(A, ordering=None):
+    """Factor ``A`` once for repeated solutions of A x = b
+
+    Parameters
+    ----------
+    A : ndarray or sparse matrix
+        Real, symmetric matrix (the boundary condition modified stiffness)
+    ordering : str, optional
+        Column ordering of the sparse LU factorization, one of the
+        ``permc_spec`` of scipy.sparse.linalg.splu.  'NATURAL' keeps the
+        order of the DOFs [default: COLAMD]
+
+    Returns
+    -------
+    solve : callable
+        ``solve(b)`` returns the solution x of A x = b.  ``b`` may have
+        several columns.
+
+    Notes
+    -----
+    Dense matrices are Cholesky factored, or LU factored if not positive
+    definite.  Sparse matrices are LU factored by scipy.sparse.linalg.  Band
+    matrices are Cholesky factored in band storage (dpbtrf).  If scipy is
+    not available, ``solve`` is ``linsolve`` with ``A`` bound.
+
+    """
+    if isinstance(A, SymmetricBandMatrix):
+        if scilinalg is None:
+            raise UserInputError('BANDED SOLUTION REQUIRES SCIPY')
+        try:
+            c = scilinalg.cholesky_banded(A.ab)
+        except LinAlgError:
+            raise RuntimeError('ATTEMPTING TO SOLVE UNDER CONSTRAINED SYSTEM')
+        return lambda b: scilinalg.cho_solve_banded((c, False), b)
+
+    if issparse(A):
+        try:
+            lu = spla.splu(A.tocsc(), permc_spec=ordering)
+        except RuntimeError:
+            raise RuntimeError('ATTEMPTING TO SOLVE UNDER CONSTRAINED SYSTEM')
+        return lu.solve
+
+    if scilinalg is None:
+        return lambda b: linsolve(A, b)
+
+    try:
+        c = scilinalg.cho_factor(A)
+        return lambda b: scilinalg.cho_solve(c, b)
+    except LinAlgError:
+        lu = scilinalg.lu_factor(A)
+        if any(diag(lu[0]) == 0.):
+            raise RuntimeError('ATTEMPTING TO SOLVE UNDER CONSTRAINED SYSTEM')
+        return lambda b: scilinalg.lu_solve(lu, b)
+
+def minimum_degree_ordering(indptr, indices):
+    """Minimum degree ordering of the vertices of a graph
+
+    Parameters
+    ----------
+    indptr, indices : ndarray of int
+        The neighbors of vertex i are indices[indptr[i]:indptr[i+1]]
+
+    Returns
+    -------
+    order : ndarray of int
+        The vertices in elimination order
+
+    Notes
+    -----
+    The vertex of least degree in the elimination graph is eliminated
+    first, its neighbors becoming a clique.  Ties go to the lowest vertex.
+    The elimination graph is stored explicitly, which is adequate for the
+    node graphs of moderately sized meshes.
+
+    """
+    n = len(indptr) - 1
+    adj = [set(indices[indptr[i]:indptr[i+1]].tolist()) for i in range(n)]
+    heap = [(len(adj[i]), i) for i in range(n)]
+    heapq.heapify(heap)
+    eliminated = zeros(n, dtype=bool)
+    order = []
+    while heap:
+        degree, i = heapq.heappop(heap)
+        if eliminated[i] or degree != len(adj[i]):
+            # STALE ENTRY
+            continue
+        eliminated[i] = True
+        order.append(i)
+        nbrs = adj[i]
+        for j in nbrs:
+            adj[j].discard(i)
+            adj[j] |= nbrs
+            adj[j].discard(j)
+            heapq.heappush(heap, (len(adj[j]), j))
+        adj[i] = None
+    return array(order, dtype=int)
+
+def available_memory():
+    """Available physical memory in bytes, or inf if it cannot be
+    determined"""
+    try:
+        return float(os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE'))
+    except (AttributeError, ValueError, OSError):
+        return inf
+
+def peak_memory():
+    """Peak resident memory of this process in bytes, or None if it cannot
+    be determined"""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # KILOBYTES ON LINUX, BYTES ON MAC OS
+    return float(rss) if sys.platform == 'darwin' else 1024. * rss
+
 def iso_dev_split1(ndir, nshr, numdim, D):
     ntens = ndir + nshr
     D1, D2 = zeros((ntens, ntens)), eye(ntens)
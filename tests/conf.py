@@ -2,6 +2,7 @@ import os
 import glob
 import shutil
 from os.path import join, dirname, realpath, isfile, isdir, basename
+from pyfem2 import FiniteElementModel, PlaneStrainQuad4, ALL, ILO
 D = dirname(dirname(realpath(__file__)))
 def teardown_module(module):
     def remove(a):
@@ -20,3 +21,16 @@ def teardown_module(module):
                 remove(join(dirname, filename))
             if filename == '.DS_Store':
                 remove(join(dirname, filename))
+
+def cantilever(nx=20, ny=4, eletyp=PlaneStrainQuad4):
+    """Elastic cantilever, 10 long and 2 deep, of nx by ny elements of type
+    eletyp and material 'Material-1', fixed at its left end"""
+    V = FiniteElementModel()
+    V.RectilinearMesh(nx=nx, ny=ny, lx=10, ly=2)
+    V.Material('Material-1')
+    V.materials['Material-1'].Density(1.)
+    V.materials['Material-1'].Elastic(E=1e6, Nu=.3)
+    V.ElementBlock('Block1', ALL)
+    V.AssignProperties('Block1', eletyp, 'Material-1', t=1)
+    V.FixNodes(ILO)
+    return V
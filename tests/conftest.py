@@ -0,0 +1,16 @@
+MARKERS = (
+    ('beamcol', 'beam-column element tests'),
+    ('plane', 'plane element tests'),
+    ('heat', 'heat transfer tests'),
+    ('truss', 'truss element tests'),
+    ('demos', 'runs the demo scripts in data/'),
+    ('sparse', 'sparse global assembly'),
+    ('parallel', 'assembly by worker processes or threads'),
+    ('vectorized', 'vectorized element kernels'),
+)
+
+def pytest_configure(config):
+    # REGISTER THE TEST CATEGORIES, SELECTED WITH -m
+    for (name, description) in MARKERS:
+        config.addinivalue_line('markers',
+                                '{0}: {1}'.format(name, description))
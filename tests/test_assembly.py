@@ -0,0 +1,398 @@
+import pytest
+from numpy import allclose, sqrt, mean, zeros, shares_memory, random, nan, arange
+from conf import *
+from pyfem2 import *
+from pyfem2.utilities import UserInputError
+
+def static_cantilever(nx=20, ny=4, eletyp=PlaneStrainQuad4, **kwds):
+    """The cantilever and a static step with a tip load and gravity"""
+    V = cantilever(nx, ny, eletyp)
+    step = V.StaticStep(**kwds)
+    step.ConcentratedLoad(IHI, Y, -10.)
+    step.GravityLoad(ALL, [0, -1.])
+    return V, step
+
+@pytest.mark.sparse
+def test_sparse_static():
+    V1, step1 = static_cantilever()
+    step1.run()
+    V2, step2 = static_cantilever(sparse=True)
+    step2.run()
+    for key in ('U', 'RF', 'S'):
+        if key == 'S':
+            key = ('BLOCK1', 'S')
+        a = step1.frames[-1].field_outputs[key].data
+        b = step2.frames[-1].field_outputs[key].data
+        assert allclose(a, b)
+
+@pytest.mark.sparse
+def test_sparse_heat_transfer():
+    dofs = []
+    for sparse in (False, True):
+        V = FiniteElementModel()
+        V.GenesisMesh(join(D, 'data/UniformPlateTria3.g'))
+        V.Material('Material-1')
+        V.materials['Material-1'].IsotropicThermalConductivity(1.)
+        V.AssignProperties('ElementBlock1', DiffussiveHeatTransfer2D3,
+                           'Material-1')
+        step = V.HeatTransferStep(sparse=sparse)
+        step.HeatGeneration(ALL, 1)
+        step.PrescribedBC(BOUNDARY, T, 0)
+        step.run()
+        dofs.append(step.dofs.copy())
+    assert allclose(dofs[0], dofs[1])
+
+@pytest.mark.sparse
+def test_sparse_pattern_reuse():
+    V, step = static_cantilever(nx=6, ny=3)
+    u, Q = zeros(V.numdof), zeros(V.numdof)
+    dltyp, dload = step.dload(step.period)
+    args = (step.dofs, u, Q, step.svtab, step.svars, dltyp, dload,
+            step.predef, step.procedure, DIRECT)
+    K = V.assemble(*args, cflag=STIFF_ONLY)
+    # THE PATTERN IS ONLY COMPUTED FOR THE FIRST SPARSE ASSEMBLY
+    assert V._blknzmap is None
+    Ks = V.assemble(*args, cflag=STIFF_ONLY, sparse=True)
+    assert V._blknzmap is not None
+    assert allclose(K, Ks.toarray())
+    # THE DATA ARRAY OF THE CACHED PATTERN IS REUSED, NOT REALLOCATED
+    data = Ks.data
+    Ks = V.assemble(*args, cflag=STIFF_ONLY, sparse=True)
+    assert shares_memory(Ks.data, data)
+    assert allclose(K, Ks.toarray())
+
+@pytest.mark.vectorized
+def test_block_response():
+    # THE VECTORIZED BLOCK KERNEL MUST REPRODUCE THE ELEMENT BY ELEMENT LOOP
+    for (filename, eletyp) in (('PlateWithHoleTria3.g', PlaneStrainTria3),
+                               ('PlateWithHoleQuad4.g', PlaneStrainQuad4),
+                               ('QuarterCylinderQuad8.g', PlaneStrainQuad8)):
+        V = FiniteElementModel()
+        V.GenesisMesh(join(D, 'data', filename))
+        V.Material('Material-1')
+        V.materials['Material-1'].Density(2.)
+        V.materials['Material-1'].Elastic(E=1e6, Nu=.3)
+        V.AssignProperties('ElementBlock1', eletyp, 'Material-1', t=1)
+        V.FixNodes(ILO)
+        step = V.StaticStep()
+        step.GravityLoad(ALL, [0, -1.])
+        step.SurfaceLoad(IHI, [1., 2.])
+        assert all(V._blkvec)
+        du = random.rand(V.numdof) * 1e-3
+        Q = zeros(V.numdof)
+        dltyp, dload = step.dload(step.period)
+        for cflag in (STIFF_AND_RHS, RHS_ONLY, MASS_AND_RHS):
+            out = []
+            for vec in (True, False):
+                V._blkvec = [vec] * len(V._blkvec)
+                svars = step.svars.copy()
+                r = V.assemble(step.dofs, du, Q, step.svtab, svars, dltyp,
+                               dload, step.predef, step.procedure, GENERAL,
+                               cflag=cflag, disp=1)
+                out.append((r, svars))
+            (r1, svars1), (r2, svars2) = out
+            for (a, b) in zip(r1, r2):
+                assert allclose(a, b)
+            assert allclose(svars1, svars2)
+
+@pytest.mark.parallel
+def test_parallel_assembly():
+    # ELEMENT RESPONSES COMPUTED BY WORKER PROCESSES MUST MATCH THE SERIAL ONES
+    V1, step1 = static_cantilever()
+    step1.run()
+    V2, step2 = static_cantilever(workers=3)
+    step2.run()
+    for key in ('U', 'RF'):
+        a = step1.frames[-1].field_outputs[key].data
+        b = step2.frames[-1].field_outputs[key].data
+        assert allclose(a, b)
+    a = step1.frames[-1].field_outputs['BLOCK1', 'S'].data
+    b = step2.frames[-1].field_outputs['BLOCK1', 'S'].data
+    assert allclose(a, b)
+
+@pytest.mark.parallel
+def test_parallel_assembly_model_change():
+    # WORKERS ARE FORKED WITH THE MODEL AS IT WAS, CHANGING THE MATERIAL
+    # REPLACES THEM AND THE ASSEMBLY STILL MATCHES THE SERIAL ONE
+    V, step = static_cantilever()
+    du = random.rand(V.numdof) * 1e-3
+    Q = zeros(V.numdof)
+    dltyp, dload = step.dload(step.period)
+    def assemble(workers):
+        return V.assemble(step.dofs, du, Q, step.svtab, step.svars.copy(),
+                          dltyp, dload, step.predef, step.procedure, GENERAL,
+                          workers=workers)
+    for E in (1e6, 2e6):
+        V.materials['Material-1'].Elastic(E=E, Nu=.3)
+        K1, r1 = assemble(None)
+        K2, r2 = assemble(2)
+        assert allclose(K1, K2) and allclose(r1, r2)
+    # THE STEP SHUTS DOWN ITS WORKERS WHEN IT ENDS
+    step.workers = 2
+    step.run()
+    assert V._pool is None
+
+@pytest.mark.parallel
+def test_colored_thread_assembly():
+    V, step = static_cantilever(nx=12, ny=4)
+    du = random.rand(V.numdof) * 1e-3
+    Q = zeros(V.numdof)
+    dltyp, dload = step.dload(step.period)
+    # THE ELEMENTS ARE COLORED FOR THE FIRST THREADED ASSEMBLY
+    assert V._blkcolors is None
+    for sparse in (False, True):
+        out = []
+        for threads in (None, 3):
+            svars = step.svars.copy()
+            r = V.assemble(step.dofs, du, Q, step.svtab, svars, dltyp, dload,
+                           step.predef, step.procedure, GENERAL, disp=1,
+                           sparse=sparse, threads=threads)
+            out.append((r, svars))
+        (r1, svars1), (r2, svars2) = out
+        if sparse:
+            r1, r2 = (r1[0].toarray(),) + r1[1:], (r2[0].toarray(),) + r2[1:]
+        for (a, b) in zip(r1, r2):
+            assert allclose(a, b)
+        assert allclose(svars1, svars2)
+    # NO TWO ELEMENTS OF A COLOR SHARE A DOF
+    for (eft, colors) in zip(V._blkeft, V._blkcolors):
+        for color in colors:
+            dofs = eft[color].ravel()
+            assert len(set(dofs)) == len(dofs)
+        assert sum(len(color) for color in colors) == len(eft)
+
+def test_lumped_mass():
+    V, step = static_cantilever(nx=10, ny=3)
+    dltyp, dload = step.dload(step.period)
+    M = V.assemble(step.dofs, zeros(V.numdof), zeros(V.numdof), step.svtab,
+                   step.svars, dltyp, dload, step.predef, step.procedure,
+                   DIRECT, cflag=MASS_ONLY)
+    assert M.shape == (V.numdof,)
+    # EACH DISPLACEMENT COMPONENT CARRIES THE TOTAL MASS OF THE 10X2 BEAM
+    assert allclose(M.sum(), 2 * 20.)
+    # THE CORNER NODE CARRIES A QUARTER OF THE MASS OF ITS 1X2/3 ELEMENT
+    assert allclose(M[:2], 1. / 6.)
+    step = V.DynamicStep(period=1e-3, increments=5)
+    step.ConcentratedLoad(IHI, Y, -1.)
+    step.run()
+    assert allclose(step.mass, M)
+
+def test_repeated_assembly_state():
+    # ASSEMBLING THE SAME INCREMENT TWICE, AS EACH NEWTON ITERATION DOES,
+    # GIVES THE SAME UPDATED STATE: THE STRAIN IS SVARS[0] PLUS THE STRAIN
+    # INCREMENT, NOT ACCUMULATED OVER THE CALLS
+    V, step = static_cantilever(nx=6, ny=2)
+    du = random.rand(V.numdof) * 1e-3
+    Q = zeros(V.numdof)
+    dltyp, dload = step.dload(step.period)
+    svars0 = random.rand(*step.svars.shape)
+    for vec in (True, False):
+        V._blkvec = [vec] * len(V._blkvec)
+        svars = svars0.copy()
+        out = []
+        for i in range(2):
+            V.assemble(step.dofs, du, Q, step.svtab, svars, dltyp, dload,
+                       step.predef, step.procedure, GENERAL)
+            out.append(svars[1].copy())
+        assert allclose(out[0], out[1])
+        assert allclose(svars[0], svars0[0])
+
+def test_load_ramp():
+    # STEPS APPLY THEIR CONCENTRATED LOADS AND PRESCRIBED DOFS AT ONCE.  THE
+    # NEWTON SOLVE RAMPS THEM OVER ITS INCREMENTS, SO THE LINEAR RESPONSE
+    # GROWS LINEARLY IN TIME
+    for prescribed in (False, True):
+        V = FiniteElementModel()
+        V.RectilinearMesh(nx=10, ny=2, lx=10, ly=2)
+        V.Material('Material-1')
+        V.materials['Material-1'].Elastic(E=1e6, Nu=.3)
+        V.ElementBlock('Block1', ALL)
+        V.AssignProperties('Block1', PlaneStrainQuad4, 'Material-1', t=1)
+        V.FixNodes(ILO)
+        step = V.StaticStep()
+        if prescribed:
+            step.PrescribedBC(IHI, Y, -.01)
+        else:
+            step.ConcentratedLoad(IHI, Y, -10.)
+        assert allclose(step.cload(0.), step.cload(step.period))
+        assert allclose(step.dofvals(0.), step.dofvals(step.period))
+        assert allclose(step.cload(.25, ramp=True), .25 * step.cload(1.))
+        step.run(increments=4)
+        u = step.frames[-1].field_outputs['U'].data
+        for (i, frame) in enumerate(step.frames[1:]):
+            ui = frame.field_outputs['U'].data
+            assert allclose(ui, (i + 1) / 4. * u, atol=1e-10)
+
+@pytest.mark.parametrize('renumber', ['rcm', 'mindegree'])
+def test_dof_renumbering(renumber):
+    V1, step1 = static_cantilever(nx=40, ny=4, sparse=True)
+    step1.run()
+    V2 = FiniteElementModel(renumber=renumber)
+    V2.RectilinearMesh(nx=40, ny=4, lx=10, ly=2)
+    V2.Material('Material-1')
+    V2.materials['Material-1'].Density(1.)
+    V2.materials['Material-1'].Elastic(E=1e6, Nu=.3)
+    V2.ElementBlock('Block1', ALL)
+    V2.AssignProperties('Block1', PlaneStrainQuad4, 'Material-1', t=1)
+    V2.FixNodes(ILO)
+    step2 = V2.StaticStep(sparse=True)
+    step2.ConcentratedLoad(IHI, Y, -10.)
+    step2.GravityLoad(ALL, [0, -1.])
+    step2.run()
+    if renumber == 'rcm':
+        assert V2.bandwidth()[0] < V1.bandwidth()[0]
+        assert V2.bandwidth()[1] < V1.bandwidth()[1]
+    for key in ('U', 'RF', ('BLOCK1', 'S')):
+        a = step1.frames[-1].field_outputs[key].data
+        b = step2.frames[-1].field_outputs[key].data
+        assert allclose(a, b)
+
+def test_dof_tables():
+    # BEAM COLUMNS (X, Y, TZ) AND LINKS (X, Y) SHARING NODES, NODE 4 UNUSED
+    nodtab = [[1,-4,3], [2,0,0], [3,0,3], [4,nan,nan], [5,4,3]]
+    eletab = [[1,1,3], [2,3,5], [3,1,2], [4,2,3], [5,2,5]]
+    V = FiniteElementModel()
+    V.Mesh(nodtab=nodtab, eletab=eletab)
+    V.Material('Material-1')
+    V.materials['Material-1'].Elastic(E=30000, Nu=.3)
+    V.ElementBlock('B1', (1,2))
+    V.ElementBlock('B2', (3,4,5))
+    V.AssignProperties('B1', PlaneBeamColumn, 'Material-1', A=.02, Izz=.004)
+    V.AssignProperties('B2', ElasticLink2D2, 'Material-1', A=.001)
+    V.setup()
+    assert V.nodfat.tolist() == [[1,1,0,0,0,1,0], [1,1,0,0,0,0,0],
+                                 [1,1,0,0,0,1,0], [0,0,0,0,0,0,0],
+                                 [1,1,0,0,0,1,0]]
+    assert V.active_dof.tolist() == [X, Y, TZ]
+    assert V.numdof == 11
+    assert V.nodfmt.tolist() == [0, 3, 5, 8, 8]
+    assert V.dofmap(2, TZ) == 7
+    assert V.dofmap(1, TZ) is None
+    assert V.dofmap(3, X) is None
+    assert V.eftab[0].tolist() == [[0,1,2,5,6,7], [5,6,7,8,9,10]]
+    assert V.eftab[1].tolist() == [[0,1,3,4], [3,4,5,6], [3,4,8,9]]
+    u, r, temp = V.format_dof(arange(11.))
+    assert u.tolist() == [[0,1], [3,4], [5,6], [0,0], [8,9]]
+    assert r.tolist() == [[2], [0], [7], [0], [10]]
+    assert temp is None
+
+def test_element_block_data():
+    V, step = static_cantilever(nx=4, ny=2)
+    ielems = V._blkielx[0]
+    data = V.elements[ielems[0]].block
+    assert data.coord.shape == (8, 4, 2)
+    for (e, el) in enumerate(V.elements[ielems]):
+        # ELEMENTS ARE VIEWS OF THE BLOCK DATA
+        assert isinstance(el, PlaneStrainQuad4)
+        assert el.block is data and el.index == e
+        assert el.label == V.mesh.eleblx[0].labels[e]
+        assert allclose(el.xc, V.mesh.coord[el.inodes])
+        assert el.t == 1 and el.material is V.materials['Material-1']
+    with pytest.raises(AttributeError):
+        el.Izz
+    # AN ELEMENT CREATED DIRECTLY IS A BLOCK OF ONE
+    el = PlaneStrainQuad4(1, [0,1,2,3], [[0,0],[1,0],[1,1],[0,1]],
+                          V.materials['Material-1'], t=2.)
+    assert el.label == 1 and el.t == 2. and len(el.block) == 1
+    with pytest.raises(UserInputError):
+        PlaneStrainQuad4(1, [0,1,2,3], [[0,0],[1,0],[1,1],[0,1]],
+                         V.materials['Material-1'], A=2.)
+
+def test_element_view_slots():
+    # ELEMENT VIEWS HOLD ONLY THEIR BLOCK AND INDEX, NO INSTANCE DICT, FOR
+    # EVERY ELEMENT TYPE
+    from pyfem2.elemlib.element import Element
+    V, step = static_cantilever(nx=2, ny=1)
+    assert not hasattr(V.elements[0], '__dict__')
+    subclasses, stack = [], [Element]
+    while stack:
+        cls = stack.pop()
+        subclasses.append(cls)
+        stack.extend(cls.__subclasses__())
+    assert len(subclasses) > 20
+    for cls in subclasses:
+        if cls.__module__.startswith('pyfem2'):
+            assert not hasattr(cls.view(None, 0), '__dict__'), cls
+
+def test_fabrication_properties():
+    V = FiniteElementModel()
+    V.RectilinearMesh(nx=4, ny=1, lx=4, ly=1)
+    V.Material('Material-1')
+    V.materials['Material-1'].Elastic(E=1e6, Nu=.3)
+    V.ElementBlock('Block1', ALL)
+    with pytest.raises(UserInputError):
+        V.AssignProperties('Block1', PlaneStressQuad4, 'Material-1',
+                           t=[1., 2.])
+    # ONE THICKNESS PER ELEMENT
+    t = [1., 2., 3., 4.]
+    V.AssignProperties('Block1', PlaneStressQuad4, 'Material-1', t=t)
+    ielems = V.mesh.eleblx[0].ielems
+    assert [el.t for el in V.elements[ielems]] == t
+    # A SCALAR IS SHARED BY ALL ELEMENTS
+    V.AssignProperties('Block1', PlaneStressQuad4, 'Material-1', t=2.)
+    data = V.elements[ielems[0]].block
+    assert data.elefab['t'].shape == (4,) and data.elefab['t'].strides == (0,)
+    assert len(V.elements.blocks) == 1
+
+def test_shape_tables():
+    for eletyp in (PlaneStrainTria3, PlaneStrainQuad4Reduced,
+                   PlaneStrainQuad4SelectiveReduced, PlaneStrainQuad8):
+        tables = eletyp.shape_tables()
+        # COMPUTED ONCE PER ELEMENT TYPE
+        assert eletyp.shape_tables() is tables
+        N, dNdxi = tables['gauss']
+        assert N.shape == (eletyp.integration, eletyp.nodes)
+        for (p, xi) in enumerate(eletyp.gaussp):
+            assert allclose(N[p], eletyp.shape(xi))
+            assert allclose(dNdxi[p], eletyp.shapegrad(xi))
+        assert allclose(N.sum(axis=1), 1.)
+        assert allclose(tables['centroid'][0][0], eletyp.shape(eletyp.cp))
+        assert len(tables['edges']) == len(eletyp.edges)
+        for (edge, (N, dNdxi, w)) in enumerate(tables['edges']):
+            # ONLY THE NODES OF THE EDGE CONTRIBUTE ON THE EDGE
+            other = [a for a in range(eletyp.nodes)
+                     if a not in eletyp.edges[edge]]
+            assert allclose(N[:,other], 0.)
+    assert 'hglass' in PlaneStrainQuad4Reduced.shape_tables()
+    assert 'sri' in PlaneStrainQuad4SelectiveReduced.shape_tables()
+    assert 'sri' not in PlaneStrainQuad4.shape_tables()
+
+@pytest.mark.vectorized
+def test_geometry_cache():
+    V, step = static_cantilever(nx=10, ny=3)
+    ntens, n = 4, 8
+    assert V.geometry_cache_size() == 30 * 4 * (1 + ntens * n) * 8
+    with pytest.raises(UserInputError):
+        V.cache_geometry(memory_limit=1000.)
+    du = random.rand(V.numdof) * 1e-3
+    Q = zeros(V.numdof)
+    dltyp, dload = step.dload(step.period)
+    def assemble(cflag, nlgeom=False):
+        svars = step.svars.copy()
+        r = V.assemble(step.dofs, du, Q, step.svtab, svars, dltyp, dload,
+                       step.predef, step.procedure, GENERAL, cflag=cflag,
+                       disp=1, nlgeom=nlgeom)
+        return r + (svars,)
+    for cflag in (STIFF_AND_RHS, MASS_AND_RHS):
+        V.cache_geometry(enable=False)
+        r1 = assemble(cflag)
+        V.cache_geometry()
+        assert V._geometry == [None]
+        r2 = assemble(cflag)
+        # FILLED ON THE FIRST ASSEMBLY AND REUSED
+        c, B = V._geometry[0]
+        assert c.shape == (30, 4) and B.shape == (30, 4, ntens, n)
+        r3 = assemble(cflag)
+        assert V._geometry[0][1] is B
+        for (a, b, c) in zip(r1, r2, r3):
+            assert allclose(a, b) and allclose(a, c)
+        V.cache_geometry(dtype='float32')
+        r4 = assemble(cflag)
+        assert V._geometry[0][1].dtype == 'float32'
+        # SINGLE PRECISION ROUND OFF IS RELATIVE TO THE LARGEST ENTRY
+        for (a, b) in zip(r1, r4):
+            assert allclose(a, b, rtol=1e-5, atol=1e-5 * abs(a).max())
+    # LARGE DEFORMATION ASSEMBLIES DO NOT FILL THE CACHE
+    V.cache_geometry()
+    assemble(STIFF_AND_RHS, nlgeom=True)
+    assert V._geometry == [None]
@@ -0,0 +1,63 @@
+from numpy import array, sqrt, allclose
+from conf import *
+from pyfem2 import *
+
+def test_explicit_suddenly_applied_load():
+    V = cantilever(nx=10, ny=2)
+    step = V.StaticStep()
+    step.ConcentratedLoad(IHI, Y, -10.)
+    step.run()
+    ust = step.frames[-1].field_outputs['U'].data[:,1].min()
+
+    # A SUDDENLY APPLIED LOAD DEFLECTS THE UNDAMPED BEAM TWICE AS FAR AS THE
+    # SAME LOAD APPLIED STATICALLY
+    V = cantilever(nx=10, ny=2)
+    step = V.DynamicStep(period=.3, increments=600, explicit=True,
+                         frequency=10)
+    step.ConcentratedLoad(IHI, Y, -10.)
+    step.run()
+    assert len(step.frames) == 61
+    u = array([f.field_outputs['U'].data[:,1].min() for f in step.frames])
+    assert abs(u.min() / ust - 2.) < .05
+
+def test_explicit_automatic_time_increment():
+    V = cantilever(nx=10, ny=2)
+    step = V.StaticStep()
+    step.ConcentratedLoad(IHI, Y, -10.)
+    step.run()
+    ust = step.frames[-1].field_outputs['U'].data[:,1].min()
+
+    # THE CRITICAL TIME INCREMENT OF A SQUARE ELEMENT IS H/SQRT(2)/C
+    V = cantilever(nx=10, ny=2)
+    step = V.DynamicStep(period=.3, explicit=True, frequency=10)
+    step.ConcentratedLoad(IHI, Y, -10.)
+    c = V.materials['Material-1'].wave_speed()
+    assert abs(V.stable_time_increment() * c * sqrt(2.) - 1.) < 1e-8
+    step.run()
+    assert abs(step.frames[-1].value - .3) < 1e-12
+    u = array([f.field_outputs['U'].data[:,1].min() for f in step.frames])
+    assert abs(u.min() / ust - 2.) < .05
+
+def test_explicit_run_increments():
+    # THE INCREMENTS GIVEN TO RUN SET THE TIME INCREMENT OF THE EXPLICIT
+    # SOLVE, AS THEY DO WHEN GIVEN TO THE STEP
+    V = cantilever(nx=10, ny=2)
+    step = V.DynamicStep(period=.3, explicit=True, frequency=10)
+    step.ConcentratedLoad(IHI, Y, -10.)
+    step.run(increments=600)
+    assert len(step.frames) == 61
+    assert abs(step.frames[-1].value - .3) < 1e-12
+
+def test_explicit_geometry_cache():
+    # THE EXPLICIT STEP CACHES THE ELEMENT GEOMETRY FOR ITS INCREMENTS ONLY,
+    # WITHOUT CHANGING THE SOLUTION
+    u = []
+    for cache in (False, True):
+        V = cantilever(nx=10, ny=2)
+        step = V.DynamicStep(period=.01, increments=20, explicit=True,
+                             geometry_cache=cache)
+        step.ConcentratedLoad(IHI, Y, -10.)
+        step.run()
+        assert not V.geometry_cached
+        u.append(step.frames[-1].field_outputs['U'].data)
+    assert allclose(u[0], u[1])
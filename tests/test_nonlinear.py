@@ -0,0 +1,132 @@
+import pytest
+from numpy import allclose, dot, outer
+from conf import *
+from pyfem2 import *
+from pyfem2.material.elastic import Elastic
+
+class NonlinearElastic(object):
+    """Hyperelastic material with energy W = q/2 + a q**2/4, q = e.D.e,
+    stiffening for a > 0 and softening for a < 0"""
+    linear = False
+    def __init__(self, Lambda, Mu, a):
+        self.stiffness = Elastic(Lambda, Mu).stiffness
+        self.a = a
+    def response(self, stress, statev, strain, dstrain, time, dtime,
+                 temp, dtemp, predef, dpred, ndir, nshr, ntens,
+                 coords, F0, F, noel, kstep, kinc):
+        D = self.stiffness(ndir, nshr)
+        De = dot(D, strain + dstrain)
+        c = 1. + self.a * dot(strain + dstrain, De)
+        return c * De, statev, c * D + 2. * self.a * outer(De, De)
+
+def nonlinear_cantilever(a=.01, load=100., nx=10, ny=2, **kwds):
+    """The cantilever of a NonlinearElastic material and a static step with
+    a tip load"""
+    V = cantilever(nx, ny)
+    material = V.materials['Material-1']
+    material.model = NonlinearElastic(material.Lame, material.G, a)
+    step = V.StaticStep(**kwds)
+    step.ConcentratedLoad(IHI, Y, -load)
+    return V, step
+
+def test_newton_solvers():
+    V, step = nonlinear_cantilever(increments=4)
+    step.run(solver=NEWTON, tolerance1=1e-8)
+    assert not V.is_linear()
+    assert step.factorizations > 4
+    u = step.frames[-1].field_outputs['U'].data
+    for (solver, refactor) in ((MODIFIED_NEWTON, None), (MODIFIED_NEWTON, 3),
+                               (BFGS, None)):
+        V1, step1 = nonlinear_cantilever(increments=4, maxiters=40,
+                                         refactor=refactor)
+        step1.run(solver=solver, tolerance1=1e-8)
+        if refactor is None:
+            # ONE FACTORIZATION PER INCREMENT
+            assert step1.factorizations == 4
+        assert step1.factorizations < step.factorizations
+        u1 = step1.frames[-1].field_outputs['U'].data
+        assert allclose(u, u1, rtol=1e-5, atol=1e-8)
+
+def test_automatic_incrementation():
+    V, step = nonlinear_cantilever(load=1000., increments=1)
+    step.run(solver=NEWTON)
+    u = step.frames[-1].field_outputs['U'].data
+
+    # THE FULL LOAD IN ONE INCREMENT IS TOO MUCH FOR MODIFIED NEWTON
+    V1, step1 = nonlinear_cantilever(load=1000., increments=1)
+    with pytest.raises(RuntimeError):
+        step1.run(solver=MODIFIED_NEWTON)
+
+    # ... BUT AUTOMATIC INCREMENTATION CUTS BACK AND COMPLETES THE STEP
+    V1, step1 = nonlinear_cantilever(load=1000., initial_inc=1.)
+    step1.run(solver=MODIFIED_NEWTON)
+    assert len(step1.frames) > 2
+    assert allclose(step1.frames[-1].value, 1.)
+    u1 = step1.frames[-1].field_outputs['U'].data
+    assert allclose(u, u1, rtol=1e-5, atol=1e-8)
+
+    # EASY INCREMENTS GROW THE TIME INCREMENT
+    V1, step1 = nonlinear_cantilever(load=1000., initial_inc=.1)
+    step1.run(solver=NEWTON)
+    assert len(step1.frames) - 1 < 10
+    u1 = step1.frames[-1].field_outputs['U'].data
+    assert allclose(u, u1, rtol=1e-5, atol=1e-8)
+
+def test_line_search():
+    V, step = nonlinear_cantilever(load=1000., increments=1)
+    step.run(solver=NEWTON)
+    u = step.frames[-1].field_outputs['U'].data
+
+    # MODIFIED NEWTON OVERSHOOTS WITH THE FULL LOAD IN ONE INCREMENT AND
+    # HAS TO CUT BACK, THE LINE SEARCH KEEPS IT CONVERGING
+    V1, step1 = nonlinear_cantilever(load=1000., initial_inc=1., maxiters=40)
+    step1.run(solver=MODIFIED_NEWTON)
+    assert len(step1.frames) > 2
+    V2, step2 = nonlinear_cantilever(load=1000., initial_inc=1., maxiters=40,
+                                     line_search=5)
+    step2.run(solver=MODIFIED_NEWTON)
+    assert len(step2.frames) == 2
+    assert step2.assemblies < step1.assemblies
+    assert step2.factorizations < step1.factorizations
+    u2 = step2.frames[-1].field_outputs['U'].data
+    assert allclose(u, u2, rtol=1e-5, atol=1e-8)
+
+def bar(a=-1/300., load=1e4, **kwds):
+    V = FiniteElementModel()
+    V.RectilinearMesh(nx=4, ny=1, lx=10, ly=2)
+    V.Material('Material-1')
+    V.materials['Material-1'].Elastic(E=1e6, Nu=.3)
+    material = V.materials['Material-1']
+    material.model = NonlinearElastic(material.Lame, material.G, a)
+    V.ElementBlock('Block1', ALL)
+    V.AssignProperties('Block1', PlaneStrainQuad4, 'Material-1', t=1)
+    V.FixNodes(ILO)
+    step = V.StaticStep(**kwds)
+    step.ConcentratedLoad(IHI, X, load)
+    return V, step
+
+def test_riks():
+    # THE SOFTENING BAR CANNOT CARRY THE FULL LOAD, THE ARC LENGTH SOLVER
+    # TRACES THE LOAD PAST THE LIMIT POINT
+    V, step = bar(increments=8)
+    step.run(solver=RIKS)
+    lpf = [frame.load_factor for frame in step.frames]
+    assert len(lpf) == 9
+    peak = lpf.index(max(lpf))
+    assert 0 < peak < 8
+    assert lpf[-1] < lpf[peak]
+    assert max(lpf) < 1.
+
+    # BEFORE THE LIMIT POINT THE PATH IS THAT OF LOAD CONTROL
+    u = step.frames[peak-1].field_outputs['U'].data
+    V1, step1 = bar(load=float(1e4*lpf[peak-1]), initial_inc=.5)
+    step1.run(solver=NEWTON, tolerance1=1e-8)
+    u1 = step1.frames[-1].field_outputs['U'].data
+    assert allclose(u, u1, rtol=1e-3, atol=1e-8)
+
+def test_riks_nonfinite_first_residual():
+    # A NON FINITE RESIDUAL BEFORE THE FIRST ARC LENGTH IS SET CANNOT BE CUT
+    # BACK, THE SOLVE FAILS
+    V, step = bar(load=float('nan'))
+    with pytest.raises(RuntimeError):
+        step.run(solver=RIKS)
@@ -0,0 +1,308 @@
+import pytest
+from numpy import (allclose, zeros, ones, random, ndarray, arange, eye,
+                   concatenate, repeat, array_equal)
+from numpy.linalg import solve
+from conf import *
+from pyfem2 import *
+from pyfem2.utilities import UserInputError, linsolve, scisparse
+from pyfem2.linear_solvers import SmoothedAggregation, ConjugateGradient
+
+@pytest.mark.parametrize('sparse', [False, True])
+def test_linear_stiffness_reuse(sparse):
+    # THE SECOND STEP ONLY DIFFERS IN ITS LOADS AND REUSES THE FACTORED
+    # STIFFNESS OF THE FIRST
+    V1 = cantilever()
+    assert V1.is_linear()
+    step = V1.StaticStep(sparse=sparse)
+    step.ConcentratedLoad(IHI, Y, -10.)
+    step.run()
+    assert len(V1._factored) == 1
+    K, solve = V1.factored_stiffness(step.doftags, sparse)
+    step = V1.StaticStep(sparse=sparse)
+    step.GravityLoad(ALL, [0, -1.])
+    step.run()
+    assert len(V1._factored) == 1
+    assert V1.factored_stiffness(step.doftags, sparse)[1] is solve
+
+    V2 = cantilever()
+    step2 = V2.StaticStep(sparse=sparse)
+    step2.ConcentratedLoad(IHI, Y, -10.)
+    step2.GravityLoad(ALL, [0, -1.])
+    step2.run()
+    a = step.frames[-1].field_outputs['U'].data
+    b = step2.frames[-1].field_outputs['U'].data
+    assert allclose(a, b)
+
+@pytest.mark.parametrize('sparse', [False, True])
+def test_linear_stiffness_material_change(sparse):
+    # CHANGING THE MATERIAL BETWEEN STEPS DISCARDS THE CACHED FACTORED
+    # STIFFNESS.  DOUBLING E HALVES THE DISPLACEMENT OF THE SECOND STEP
+    V = cantilever()
+    step1 = V.StaticStep(sparse=sparse)
+    step1.ConcentratedLoad(IHI, Y, -10.)
+    step1.run()
+    V.materials['Material-1'].Elastic(E=2e6, Nu=.3)
+    step2 = V.StaticStep(sparse=sparse)
+    step2.ConcentratedLoad(IHI, Y, -10.)
+    step2.run()
+    assert len(V._factored) == 1
+    a = step1.frames[-1].field_outputs['U'].data
+    b = step2.frames[-1].field_outputs['U'].data
+    assert allclose(b, a / 2.)
+
+    # AND A NONLINEAR MATERIAL MAKES THE MODEL NONLINEAR
+    V.materials['Material-1'].NeoHooke(E=2e6, Nu=.3)
+    assert not V.is_linear()
+    assert not V._factored
+
+@pytest.mark.parametrize('sparse', [False, True])
+def test_load_cases(sparse):
+    V1 = cantilever()
+    step = V1.LoadCaseStep(sparse=sparse)
+    case = step.LoadCase()
+    case.ConcentratedLoad(IHI, Y, -10.)
+    case = step.LoadCase()
+    case.GravityLoad(ALL, [0, -1.])
+    case = step.LoadCase()
+    case.ConcentratedLoad(IHI, X, 5.)
+    step.run()
+    assert len(step.frames) == 4
+
+    # EACH LOAD CASE MATCHES ITS OWN STATIC STEP
+    for (i, load) in enumerate(('cload', 'gravity', 'xload')):
+        V2 = cantilever()
+        step2 = V2.StaticStep(sparse=sparse)
+        if load == 'cload':
+            step2.ConcentratedLoad(IHI, Y, -10.)
+        elif load == 'gravity':
+            step2.GravityLoad(ALL, [0, -1.])
+        else:
+            step2.ConcentratedLoad(IHI, X, 5.)
+        step2.run()
+        for key in ('U', 'RF', ('BLOCK1', 'S')):
+            a = step.frames[i+1].field_outputs[key].data
+            b = step2.frames[-1].field_outputs[key].data
+            assert allclose(a, b)
+
+def test_load_cases_after_loaded_step():
+    # AFTER A LOADED STEP, EACH LOAD CASE, WITH OR WITHOUT ELEMENT LOADS,
+    # MATCHES THE STATIC STEP WITH THE SAME LOADS FOLLOWING THE SAME STEP
+    def prestressed():
+        V = cantilever()
+        step = V.StaticStep()
+        step.ConcentratedLoad(IHI, Y, -10.)
+        step.run()
+        return V
+    loads = (('cload', X, 5.), ('cload', X, -3.), ('gravity', 0, -2.))
+    V1 = prestressed()
+    step = V1.LoadCaseStep()
+    for (load, dof, a) in loads:
+        case = step.LoadCase()
+        if load == 'cload':
+            case.ConcentratedLoad(IHI, dof, a)
+        else:
+            case.GravityLoad(ALL, [0, a])
+    step.run()
+    for (i, (load, dof, a)) in enumerate(loads):
+        V2 = prestressed()
+        step2 = V2.StaticStep()
+        if load == 'cload':
+            step2.ConcentratedLoad(IHI, dof, a)
+        else:
+            step2.GravityLoad(ALL, [0, a])
+        step2.run()
+        for key in ('U', 'RF', ('BLOCK1', 'S')):
+            a = step.frames[i+1].field_outputs[key].data
+            b = step2.frames[-1].field_outputs[key].data
+            assert allclose(a, b)
+
+def test_bc_elimination():
+    V = cantilever(nx=8, ny=2)
+    step = V.StaticStep()
+    step.PrescribedBC(IHI, Y, -.1)
+    dltyp, dload = step.dload(step.period)
+    u, Q = zeros(V.numdof), random.rand(V.numdof)
+    args = (step.dofs, u, Q, step.svtab, step.svars, dltyp, dload,
+            step.predef, step.procedure, DIRECT)
+    doftags, X = step.doftags, step.dofvals(step.period)
+    for sparse in (False, True):
+        K, F = V.assemble(*args, sparse=sparse)
+        Kbc, Fbc = V.apply_bc(K, F, doftags, X)
+        if sparse:
+            Kbc = Kbc.toarray()
+        # THE REDUCED SYSTEM OF THE FREE DOFS GIVES THE SOLUTION OF THE FULL
+        # BOUNDARY CONDITION MODIFIED SYSTEM
+        x = V.bc_solver(K, doftags)(V.bc_force(K, F, doftags, X))
+        assert allclose(x, solve(Kbc, Fbc))
+        assert allclose(x[doftags], X)
+        free = V.free_dofs(doftags)
+        assert allclose(Kbc[doftags][:,free], 0.)
+
+@pytest.mark.parametrize('preconditioner', ['jacobi', 'ic0', 'amg'])
+def test_preconditioned_cg(preconditioner):
+    V1 = cantilever()
+    step1 = V1.StaticStep(sparse=True)
+    step1.ConcentratedLoad(IHI, Y, -10.)
+    step1.run()
+    V2 = cantilever()
+    options = {'method': 'cg', 'preconditioner': preconditioner, 'tol': 1e-10}
+    step2 = V2.StaticStep(sparse=True, solver_options=options)
+    step2.ConcentratedLoad(IHI, Y, -10.)
+    step2.run()
+    for key in ('U', 'RF'):
+        a = step1.frames[-1].field_outputs[key].data
+        b = step2.frames[-1].field_outputs[key].data
+        assert allclose(a, b)
+    solver = V2.factored_stiffness(step2.doftags, True, options)[1].solver
+    assert len(solver.iterations) == 1
+    assert 0 < solver.iterations[0] < V2.numdof
+
+def test_amg_coarsening():
+    # LARGE ENOUGH FOR THE AMG PRECONDITIONER TO COARSEN
+    V1 = cantilever(nx=40, ny=8)
+    step1 = V1.StaticStep(sparse=True)
+    step1.ConcentratedLoad(IHI, Y, -10.)
+    step1.run()
+    V2 = cantilever(nx=40, ny=8)
+    options = {'method': 'cg', 'preconditioner': 'amg', 'tol': 1e-10}
+    step2 = V2.StaticStep(sparse=True, solver_options=options)
+    step2.ConcentratedLoad(IHI, Y, -10.)
+    step2.run()
+    a = step1.frames[-1].field_outputs['U'].data
+    b = step2.frames[-1].field_outputs['U'].data
+    assert allclose(a, b)
+    solver = V2.factored_stiffness(step2.doftags, True, options)[1].solver
+    assert len(solver.M.levels) > 0
+
+def test_tentative_prolongator():
+    # EACH AGGREGATE IS FACTORED B = T BC, THE COLUMNS OF T ORTHONORMAL.
+    # THE THIRD MODE IS DEPENDENT AND SINGLETON AGGREGATES KEEP ONE MODE
+    rng = random.RandomState(0)
+    agg = concatenate((rng.randint(0, 20, 300), arange(20, 25)))
+    B = rng.rand(len(agg), 3)
+    B[:,2] = B[:,0] + 2. * B[:,1]
+    T, Bc, cnodes = SmoothedAggregation.tentative_prolongator(agg, B)
+    assert T.shape == (len(agg), 2 * 20 + 5)
+    assert allclose(T.dot(Bc), B)
+    assert allclose(T.T.dot(T).toarray(), eye(T.shape[1]))
+    assert array_equal(cnodes, repeat(arange(25), [2] * 20 + [1] * 5))
+
+def test_ic0_size_limit():
+    A = scisparse.diags([-ones(99), 2. * ones(100), -ones(99)], [-1, 0, 1])
+    with pytest.raises(UserInputError):
+        ConjugateGradient(A, preconditioner='ic0', max_size=50)
+    b = ones(100)
+    solver = ConjugateGradient(A, preconditioner='ic0', tol=1e-12)
+    assert allclose(A.dot(solver(b)), b)
+
+def test_unknown_linear_solver():
+    V = cantilever(nx=4, ny=2)
+    step = V.StaticStep(solver_options={'method': 'gmres'})
+    step.ConcentratedLoad(IHI, Y, -10.)
+    with pytest.raises(UserInputError):
+        step.run()
+
+def test_matrix_free():
+    V1 = cantilever()
+    step1 = V1.StaticStep()
+    step1.ConcentratedLoad(IHI, Y, -10.)
+    step1.GravityLoad(ALL, [0, -1.])
+    step1.run()
+    V2 = cantilever()
+    step2 = V2.StaticStep(matrix_free=True,
+                          solver_options={'method': 'cg', 'tol': 1e-10})
+    step2.ConcentratedLoad(IHI, Y, -10.)
+    step2.GravityLoad(ALL, [0, -1.])
+    step2.run()
+    for key in ('U', 'RF', ('BLOCK1', 'S')):
+        a = step1.frames[-1].field_outputs[key].data
+        b = step2.frames[-1].field_outputs[key].data
+        assert allclose(a, b)
+    # THE ELEMENT BY ELEMENT OPERATOR IS THE GLOBAL STIFFNESS
+    K1 = V1.factored_stiffness(step1.doftags)[0]
+    K2 = V2.factored_stiffness(step2.doftags, False, step2.solver_options,
+                               matrix_free=True)[0]
+    assert allclose(K1, K2.toarray())
+    x = random.rand(V1.numdof)
+    assert allclose(K1.dot(x), K2.dot(x))
+    assert allclose(K1.diagonal(), K2.diagonal())
+    step = V2.StaticStep(matrix_free=True, solver_options={'method': 'direct'})
+    step.ConcentratedLoad(IHI, Y, -10.)
+    with pytest.raises(UserInputError):
+        step.run()
+
+def test_matrix_free_stiffness_cache():
+    # A MATRIX FREE STEP AND A DENSE STEP WITH THE SAME ITERATIVE SOLVER
+    # OPTIONS CACHE THEIR OWN STIFFNESS
+    V = cantilever()
+    options = {'method': 'cg', 'tol': 1e-10}
+    u = []
+    for matrix_free in (False, True, False):
+        step = V.StaticStep(matrix_free=matrix_free, solver_options=options)
+        step.ConcentratedLoad(IHI, Y, -10.)
+        step.run()
+        u.append(step.frames[-1].field_outputs['U'].data)
+        K = V.factored_stiffness(step.doftags, False, options,
+                                 matrix_free=matrix_free)[0]
+        assert isinstance(K, ndarray) != matrix_free
+    assert len(V._factored) == 2
+    assert allclose(u[0], u[1]) and allclose(u[0], u[2])
+
+def test_banded():
+    V1 = cantilever()
+    step1 = V1.StaticStep()
+    step1.ConcentratedLoad(IHI, Y, -10.)
+    step1.PrescribedBC(IHI, X, .01)
+    step1.run()
+    V2 = cantilever()
+    step2 = V2.StaticStep(banded=True)
+    step2.ConcentratedLoad(IHI, Y, -10.)
+    step2.PrescribedBC(IHI, X, .01)
+    step2.run()
+    for key in ('U', 'RF', ('BLOCK1', 'S')):
+        a = step1.frames[-1].field_outputs[key].data
+        b = step2.frames[-1].field_outputs[key].data
+        assert allclose(a, b)
+    K1 = V1.factored_stiffness(step1.doftags)[0]
+    K2 = V2.factored_stiffness(step2.doftags, banded=True)[0]
+    assert K2.ab.shape == (V2.bandwidth()[0] + 1, V2.numdof)
+    assert allclose(K1, K2.toarray())
+    x = random.rand(V1.numdof, 2)
+    assert allclose(K1.dot(x), K2.dot(x))
+    Kbc, Fbc = V1.apply_bc(K1, x[:,0], step1.doftags, step1.dofvals(1.))
+    assert allclose(Kbc, K2.constrain(step2.doftags).toarray())
+    assert allclose(linsolve(Kbc, Fbc), linsolve(K2.constrain(step2.doftags),
+                                                 Fbc))
+
+def test_auto_solver():
+    V1 = cantilever()
+    step1 = V1.StaticStep()
+    step1.ConcentratedLoad(IHI, Y, -10.)
+    step1.run()
+    a = step1.frames[-1].field_outputs['U'].data
+    # THE DENSE STIFFNESS ALONE TAKES 8 N^2 BYTES
+    N = V1.numdof
+    for limit in (None, 8. * N ** 2, 1e5):
+        V2 = cantilever()
+        step2 = V2.StaticStep(solver=AUTO, memory_limit=limit)
+        step2.ConcentratedLoad(IHI, Y, -10.)
+        step2.run()
+        if limit is not None:
+            assert step2.sparse or step2.banded or step2.matrix_free
+        b = step2.frames[-1].field_outputs['U'].data
+        assert allclose(a, b)
+    V2 = cantilever()
+    step2 = V2.StaticStep(solver=AUTO, memory_limit=1e3)
+    step2.ConcentratedLoad(IHI, Y, -10.)
+    with pytest.raises(UserInputError):
+        step2.run()
+
+def test_auto_solver_pattern():
+    # THE CHOICE DOES NOT FORM THE SPARSITY PATTERN, ITS NONZERO COUNT IS
+    # THAT OF THE PATTERN FORMED BY THE FIRST SPARSE ASSEMBLY
+    V = cantilever()
+    V.StaticStep()
+    V.select_solver()
+    assert V._blknzmap is None
+    V._sparsity_pattern()
+    assert V._nonzeros() == len(V._nzindices)